@@ -35,6 +35,11 @@ type SensorRow = {
   reg_date: string;
 };
 
+type SensorSnapshot = Record<
+  "Temp" | "Humi" | "Vib" | "Prox" | "Dust" | "Light" | "Rain" | "WDir" | "BDir",
+  SensorRow | null
+>;
+
 type SensorData = {
   dust: number;
   rain: boolean;
@@ -89,6 +94,8 @@ const pseudoRandom = (seed: number) => {
 
 // const API_BASE = "http://127.0.0.1:8000/sensor";
 const API_BASE = `http://172.17.100.187:8000/sensor`;
+// 스트림이 이 시간(ms) 안에 열리지 않으면 폴링을 시작
+const STREAM_OPEN_TIMEOUT = 3000;
 
 const SmartWindowDashboard = () => {
   const [windowOpen, setWindowOpen] = useState<boolean | null>(null);
@@ -204,128 +211,155 @@ const SmartWindowDashboard = () => {
     }));
   }, []);
 
-  // 백엔드에서 실시간 센서 데이터 폴링
+  // 백엔드에서 실시간 센서 데이터 수신 (SSE, 실패 시 폴링)
   useEffect(() => {
+    let current: SensorSnapshot | null = null;
+
+    const applySnapshot = (snap: SensorSnapshot) => {
+      const latestTemp = snap.Temp?.value ?? 0;
+      const latestHumi = snap.Humi?.value ?? 0;
+      const latestDust = snap.Dust?.value ?? 0;
+      const latestLightRaw = snap.Light?.value ?? 0;
+      const latestRain = snap.Rain?.value ?? 0;
+      const latestWDir = snap.WDir?.value ?? 1;
+      const latestBDir = snap.BDir?.value ?? 1;
+
+      // 조도 수치 → 등급 매핑 (임시 기준값)
+      const lightLevel: "상" | "중" | "하" =
+        latestLightRaw > 4000 ? "상" : latestLightRaw > 2000 ? "중" : "하";
+
+      const newData = {
+        dust: latestDust,
+        rain: latestRain > 0, // rain 값이 0보다 크면 비 감지
+        temperature: latestTemp,
+        humidity: latestHumi,
+        lightLevel,
+        timestamp: new Date().toLocaleTimeString("ko-KR"),
+      };
+      setSensorData(newData);
+      const derivedWeather = newData.rain ? "rainy" : "sunny";
+      setWeatherType((prev) =>
+        prev === derivedWeather ? prev : derivedWeather
+      );
+
+      const now = new Date();
+      const minuteKey = `${now.getHours()}:${now.getMinutes()}`;
+      const minuteLabel = now.toLocaleTimeString("ko-KR", {
+        hour: "2-digit",
+        minute: "2-digit",
+      });
+      const minuteAcc = minuteAccumulatorRef.current;
+      if (
+        minuteAcc.key &&
+        minuteAcc.key !== minuteKey &&
+        minuteAcc.count > 0
+      ) {
+        setMinuteHistory((prev) => [
+          ...prev.slice(-95),
+          {
+            time: minuteAcc.label,
+            dust: Math.round(minuteAcc.dust / minuteAcc.count),
+            temp: Math.round(minuteAcc.temp / minuteAcc.count),
+            humidity: Math.round(minuteAcc.humidity / minuteAcc.count),
+          },
+        ]);
+      }
+      if (minuteAcc.key !== minuteKey) {
+        minuteAcc.key = minuteKey;
+        minuteAcc.label = minuteLabel;
+        minuteAcc.count = 0;
+        minuteAcc.dust = 0;
+        minuteAcc.temp = 0;
+        minuteAcc.humidity = 0;
+      }
+      minuteAcc.count += 1;
+      minuteAcc.dust += newData.dust;
+      minuteAcc.temp += newData.temperature;
+      minuteAcc.humidity += newData.humidity;
+
+      const hourKey = `${now.getFullYear()}-${now.getMonth()}-${now.getDate()}-${now.getHours()}`;
+      const hourLabel = `${now.getHours().toString().padStart(2, "0")}시`;
+      const hourAcc = hourAccumulatorRef.current;
+      if (hourAcc.key && hourAcc.key !== hourKey && hourAcc.count > 0) {
+        setHourHistory((prev) => [
+          ...prev.slice(-23),
+          {
+            time: hourAcc.label,
+            dust: Math.round(hourAcc.dust / hourAcc.count),
+            temp: Math.round(hourAcc.temp / hourAcc.count),
+            humidity: Math.round(hourAcc.humidity / hourAcc.count),
+          },
+        ]);
+      }
+      if (hourAcc.key !== hourKey) {
+        hourAcc.key = hourKey;
+        hourAcc.label = hourLabel;
+        hourAcc.count = 0;
+        hourAcc.dust = 0;
+        hourAcc.temp = 0;
+        hourAcc.humidity = 0;
+      }
+      hourAcc.count += 1;
+      hourAcc.dust += newData.dust;
+      hourAcc.temp += newData.temperature;
+      hourAcc.humidity += newData.humidity;
+      setWindowOpen(latestWDir === 0); // 0: 열림, 1: 닫힘
+      setBlindOpen(latestBDir === 0); // 0: 블라인드 올라감
+    };
+
     const fetchAll = async () => {
       try {
-        // 최신 1개씩 요청 (결과는 리스트 형태)
-        const [tempRes, humiRes, dustRes, lightRes, rainRes, wDirRes, bDirRes] =
-          await Promise.all([
-            axios.get(`${API_BASE}/getTemp/1`),
-            axios.get(`${API_BASE}/getHumi/1`),
-            axios.get(`${API_BASE}/getDust/1`),
-            axios.get(`${API_BASE}/getLight/1`),
-            axios.get(`${API_BASE}/getRain/1`),
-            axios.get(`${API_BASE}/getWDir/1`),
-            axios.get(`${API_BASE}/getBDir/1`),
-          ]);
-
-        const tempList = tempRes.data as SensorRow[];
-        const humiList = humiRes.data as SensorRow[];
-        const dustList = dustRes.data as SensorRow[];
-        const lightList = lightRes.data as SensorRow[];
-        const rainList = rainRes.data as SensorRow[];
-        const wDirList = wDirRes.data as SensorRow[];
-        const bDirList = bDirRes.data as SensorRow[];
-
-        const latestTemp = tempList[0]?.value ?? 0;
-        const latestHumi = humiList[0]?.value ?? 0;
-        const latestDust = dustList[0]?.value ?? 0;
-        const latestLightRaw = lightList[0]?.value ?? 0;
-        const latestRain = rainList[0]?.value ?? 0;
-        const latestWDir = wDirList[0]?.value ?? 1;
-        const latestBDir = bDirList[0]?.value ?? 1;
-
-        // 조도 수치 → 등급 매핑 (임시 기준값)
-        const lightLevel: "상" | "중" | "하" =
-          latestLightRaw > 4000 ? "상" : latestLightRaw > 2000 ? "중" : "하";
-
-        const newData = {
-          dust: latestDust,
-          rain: latestRain > 0, // rain 값이 0보다 크면 비 감지
-          temperature: latestTemp,
-          humidity: latestHumi,
-          lightLevel,
-          timestamp: new Date().toLocaleTimeString("ko-KR"),
-        };
-        setSensorData(newData);
-        const derivedWeather = newData.rain ? "rainy" : "sunny";
-        setWeatherType((prev) =>
-          prev === derivedWeather ? prev : derivedWeather
+        // 모든 센서의 최신 값을 한 번에 요청
+        const { data } = await axios.get<SensorSnapshot>(
+          `${API_BASE}/snapshot`
         );
-
-        const now = new Date();
-        const minuteKey = `${now.getHours()}:${now.getMinutes()}`;
-        const minuteLabel = now.toLocaleTimeString("ko-KR", {
-          hour: "2-digit",
-          minute: "2-digit",
-        });
-        const minuteAcc = minuteAccumulatorRef.current;
-        if (
-          minuteAcc.key &&
-          minuteAcc.key !== minuteKey &&
-          minuteAcc.count > 0
-        ) {
-          setMinuteHistory((prev) => [
-            ...prev.slice(-95),
-            {
-              time: minuteAcc.label,
-              dust: Math.round(minuteAcc.dust / minuteAcc.count),
-              temp: Math.round(minuteAcc.temp / minuteAcc.count),
-              humidity: Math.round(minuteAcc.humidity / minuteAcc.count),
-            },
-          ]);
-        }
-        if (minuteAcc.key !== minuteKey) {
-          minuteAcc.key = minuteKey;
-          minuteAcc.label = minuteLabel;
-          minuteAcc.count = 0;
-          minuteAcc.dust = 0;
-          minuteAcc.temp = 0;
-          minuteAcc.humidity = 0;
-        }
-        minuteAcc.count += 1;
-        minuteAcc.dust += newData.dust;
-        minuteAcc.temp += newData.temperature;
-        minuteAcc.humidity += newData.humidity;
-
-        const hourKey = `${now.getFullYear()}-${now.getMonth()}-${now.getDate()}-${now.getHours()}`;
-        const hourLabel = `${now.getHours().toString().padStart(2, "0")}시`;
-        const hourAcc = hourAccumulatorRef.current;
-        if (hourAcc.key && hourAcc.key !== hourKey && hourAcc.count > 0) {
-          setHourHistory((prev) => [
-            ...prev.slice(-23),
-            {
-              time: hourAcc.label,
-              dust: Math.round(hourAcc.dust / hourAcc.count),
-              temp: Math.round(hourAcc.temp / hourAcc.count),
-              humidity: Math.round(hourAcc.humidity / hourAcc.count),
-            },
-          ]);
-        }
-        if (hourAcc.key !== hourKey) {
-          hourAcc.key = hourKey;
-          hourAcc.label = hourLabel;
-          hourAcc.count = 0;
-          hourAcc.dust = 0;
-          hourAcc.temp = 0;
-          hourAcc.humidity = 0;
-        }
-        hourAcc.count += 1;
-        hourAcc.dust += newData.dust;
-        hourAcc.temp += newData.temperature;
-        hourAcc.humidity += newData.humidity;
-        setWindowOpen(latestWDir === 0); // 0: 열림, 1: 닫힘
-        setBlindOpen(latestBDir === 0); // 0: 블라인드 올라감
+        current = data;
+        applySnapshot(data);
       } catch (err) {
         console.error("센서 데이터 요청 실패", err);
       }
     };
 
-    // 최초 1회 즉시 실행 후 주기적 폴링
-    fetchAll();
-    const interval = setInterval(fetchAll, 2000); // 2초 주기
-    return () => clearInterval(interval);
+    // 스트림이 끊긴 동안에만 2초 주기로 폴링
+    let interval: ReturnType<typeof setInterval> | null = null;
+    const startPolling = () => {
+      if (interval) return;
+      fetchAll();
+      interval = setInterval(fetchAll, 2000);
+    };
+    const stopPolling = () => {
+      if (interval) clearInterval(interval);
+      interval = null;
+    };
+
+    // WSGI(runserver)에서는 스트림이 204 로 거절되거나 응답이 오지 않을 수 있으므로
+    // 몇 초 안에 연결되지 않으면 폴링부터 시작한다
+    const source = new EventSource(`${API_BASE}/stream`);
+    const openTimer = setTimeout(startPolling, STREAM_OPEN_TIMEOUT);
+    source.onopen = () => {
+      clearTimeout(openTimer);
+      stopPolling();
+    };
+    source.onerror = startPolling;
+    source.addEventListener("snapshot", (event) => {
+      current = JSON.parse((event as MessageEvent).data) as SensorSnapshot;
+      applySnapshot(current);
+    });
+    source.addEventListener("reading", (event) => {
+      if (!current) return;
+      const { sensor, row } = JSON.parse((event as MessageEvent).data) as {
+        sensor: keyof SensorSnapshot;
+        row: SensorRow;
+      };
+      current = { ...current, [sensor]: row };
+      applySnapshot(current);
+    });
+
+    return () => {
+      clearTimeout(openTimer);
+      source.close();
+      stopPolling();
+    };
   }, []);
 
   useEffect(() => {
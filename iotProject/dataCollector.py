@@ -2,6 +2,11 @@ import serial
 import serial.tools.list_ports
 import requests
 import random, time
+import math
+import os
+import threading
+import queue
+from frameSpool import FrameSpool
 
 ports = serial.tools.list_ports.comports()
 
@@ -22,13 +27,14 @@ while(1):
         break
     try:
         # config COM port section
+        # 읽기 전용 스레드가 readline 에서 대기하므로 busy-wait 하지 않도록 timeout 을 둔다
         ser = serial.Serial(
             port=portName,
             baudrate=115200,
             parity=serial.PARITY_NONE,
             stopbits=serial.STOPBITS_ONE,
             bytesize=serial.EIGHTBITS,
-            timeout=0
+            timeout=1
         )
         break
     except:
@@ -36,129 +42,234 @@ while(1):
         print("Invaild Value")
 
 
-NORMAL_INTERVAL = 1  # 정상 데이터 수신 시 60초 후 재시도
-ERROR_INTERVAL = 1    # 에러/OnRxError 발생 시 1초 후 재시도
+SERVER_URL = "http://localhost:8000/sensor"
+# True: 프레임들을 setFrame 으로 묶어서 전송, False: 센서별 set* 개별 전송
+BATCH_MODE = True
+# getNextCommand long-poll 대기 시간(초). 명령 스레드에서만 사용하므로 직렬 읽기를 막지 않는다
+COMMAND_WAIT = 20
 
-next_sleep = 1  # 최초 대기 (기존 로직 유지)
+NORMAL_INTERVAL = 1   # 테스트 모드에서 가짜 프레임 생성 간격
+ERROR_INTERVAL = 1    # 서버 에러 발생 시 1초 후 재시도
+ERROR_MAX_INTERVAL = 30  # 연속 실패 시 재시도 간격을 두 배씩 늘리는 최대치(초)
 
-while True:
-    time.sleep(next_sleep)
-    # 기본적으로 정상 인터벌로 설정, 이후 상황에 따라 1초로 단축
-    next_sleep = NORMAL_INTERVAL
+SPOOL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "spool")  # 업로드 전 프레임 기록 경로
+SPOOL_SEGMENT_BYTES = 1 << 20     # 세그먼트 파일 하나의 크기
+SPOOL_MAX_BYTES = 256 << 20       # 스풀 최대 크기 (넘으면 가장 오래된 세그먼트를 버림)
+BATCH_MAX = 1000      # 한 번에 업로드할 최대 프레임 수 (서버 복구 후 밀린 프레임 재전송)
+BATCH_WAIT = 0.5      # 새 프레임이 없을 때 업로더가 기다리는 최대 시간(초)
+STATS_INTERVAL = 60   # 카운터 출력 간격(초)
 
-    if flag:
-        try:
-            data = {'value': random.random()*100}
-            resp = requests.post("http://localhost:8000/sensor/setTemp", data)
-            print(resp.json())
-        except Exception as e:
-            print(f"Could not connect Web Server: {e}")
-            next_sleep = ERROR_INTERVAL
-        continue
+ALLOWED_COMMANDS = ('OPEN', 'CLOSE', 'UP', 'DOWN')
+
+sensor_mapping = {
+    'T': ('Temp', 'setTemp'),
+    'H': ('Humi', 'setHumi'),
+    'D': ('Dust', 'setDust'),
+    'R': ('Rain', 'setRain'),
+    'L': ('Light', 'setLight'),
+    'DIR': ('WDir', 'setWDir'),
+    'WDIR': ('WDir', 'setWDir'),
+    'BDIR': ('BDir', 'setBDir'),
+}
+
+spool = FrameSpool(SPOOL_DIR, SPOOL_SEGMENT_BYTES, SPOOL_MAX_BYTES)  # 직렬 읽기 -> 업로드
+new_frame = threading.Event()
+commands = queue.Queue()              # 명령 조회 -> 직렬 쓰기
+serial_lock = threading.Lock()
+
+stats = {'read': 0, 'spooled': 0, 'uploaded': 0, 'upload_errors': 0, 'dead_lettered': 0, 'commands': 0}
+stats_lock = threading.Lock()
+
+
+def count(key, n=1):
+    with stats_lock:
+        stats[key] += n
+
+
+def parse_frame(raw_data):
+    """"T:23 H:5 D:0 R:0 L:2124" 형식의 한 줄을 {'T': 23.0, ...} 로 변환. 실패 시 None"""
+    # 에러 패턴 감지
+    if 'OnRxError' in raw_data or 'OnRxTimeout' in raw_data:
+        print("⚠️ OnRxError/Timeout detected")
+        return None
+
+    # 최소한 하나의 센서 데이터가 있는지 확인 (콜론 포함)
+    if ':' not in raw_data:
+        print("⚠️ Unexpected format (no sensor data)")
+        return None
 
+    values = {}
+    for item in raw_data.split():
+        if ':' in item:
+            key, val = item.split(':', 1)
+            try:
+                num_val = float(val)
+                # nan/inf 는 JSON 으로 보낼 수 없고 서버도 거부하므로 그 값만 버린다
+                if not math.isfinite(num_val):
+                    print(f"⚠️ Non-finite value dropped: {item}")
+                    continue
+                if key in ('WDIR', 'BDIR'):
+                    values[key] = int(num_val)
+                else:
+                    values[key] = num_val
+            except ValueError:
+                print(f"❌ Value conversion error for {item}")
+                return None
+    return values or None
+
+
+def enqueue_frame(values):
+    # 읽은 시각을 함께 보내 배치 업로드에서도 측정 시각이 유지되도록 한다
+    values['ts'] = time.time()
     try:
-        if not ser.readable():
-            # 포트에서 읽을 수 없으면 재시도 간격은 기존 정상 간격 유지
-            continue
+        spool.append(values)
+        count('spooled')
+    except Exception as e:
+        print(f"❌ [SPOOL] {e}")
+    new_frame.set()
 
-        smo = ser.readline()
-        raw_data = smo.decode(errors='ignore').strip()
-        if not raw_data:
-            continue
 
-        print(f"📥 [RAW]: {raw_data}")
+def reply_to_device():
+    # 프레임을 받을 때마다 대기 중인 명령 하나(없으면 ACK)를 장치로 돌려준다
+    try:
+        command_payload = commands.get_nowait()
+    except queue.Empty:
+        command_payload = 'ACK'
 
-        # 에러 패턴 감지 (OnRxError 문자열 포함 시 에러 인터벌 적용)
-        if 'OnRxError' in raw_data or 'OnRxTimeout' in raw_data:
-            print("⚠️ OnRxError/Timeout detected -> fast retry (1s)")
-            next_sleep = ERROR_INTERVAL
-            continue
+    try:
+        message = (command_payload + "\n").encode('utf-8')
+        with serial_lock:
+            ser.write(message)
+            ser.flush()
+        if command_payload != 'ACK':
+            print(f"📤 [CMD SENT] {command_payload}")
+    except Exception as write_err:
+        print(f"❌ [SERIAL WRITE] {write_err}")
 
-        # 새로운 포맷: "T:23 H:5 D:0 R:0 L:2124"
-        # 최소한 하나의 센서 데이터가 있는지 확인 (콜론 포함)
-        if ':' not in raw_data:
-            print("⚠️ Unexpected format (no sensor data) -> fast retry")
-            next_sleep = ERROR_INTERVAL
-            continue
 
-        # 전체 raw_data를 파싱 대상으로 사용
-        data_part = raw_data.strip()
-        print(f"📊 [DATA PART]: {data_part}")
-
-        values = {}
-        for item in data_part.split():
-            if ':' in item:
-                key, val = item.split(':', 1)
-                try:
-                    num_val = float(val)
-                    if key in ('WDIR', 'BDIR'):
-                        values[key] = int(num_val)
-                    else:
-                        values[key] = num_val
-                except ValueError:
-                    print(f"❌ Value conversion error for {item} -> fast retry")
-                    next_sleep = ERROR_INTERVAL
-                    values.clear()
-                    break
-
-        if not values:
-            continue
+def serial_reader():
+    # 직렬 포트 전용 스레드: 네트워크 상태와 관계없이 계속 읽는다
+    while True:
+        try:
+            smo = ser.readline()
+            raw_data = smo.decode(errors='ignore').strip()
+            if not raw_data:
+                continue
+
+            print(f"📥 [RAW]: {raw_data}")
+            count('read')
+            values = parse_frame(raw_data)
+            if not values:
+                continue
+
+            print(f"✅ [PARSED]: {values}")
+            enqueue_frame(values)
+            reply_to_device()
+        except Exception as outer_e:
+            print(f"❌ [SERIAL READ] {outer_e}")
+            time.sleep(ERROR_INTERVAL)
+
+
+def test_reader():
+    # 테스트 모드: 직렬 포트 대신 가짜 프레임을 생성
+    while True:
+        time.sleep(NORMAL_INTERVAL)
+        count('read')
+        enqueue_frame({'T': random.random() * 100})
+        try:
+            command_payload = commands.get_nowait()
+            print(f"🚧 [TEST MODE] Would send: {command_payload}")
+        except queue.Empty:
+            pass
 
-        print(f"✅ [PARSED]: {values}")
 
-        sensor_mapping = {
-            'T': ('Temp', 'setTemp'),
-            'H': ('Humi', 'setHumi'),
-            'D': ('Dust', 'setDust'),
-            'R': ('Rain', 'setRain'),
-            'L': ('Light', 'setLight'),
-            'DIR': ('WDir', 'setWDir'),
-            'WDIR': ('WDir', 'setWDir'),
-            'BDIR': ('BDir', 'setBDir'),
-        }
+def upload(session, batch):
+    if BATCH_MODE:
+        response = session.post(f"{SERVER_URL}/setFrame", json={'frames': batch}, timeout=5)
+        response.raise_for_status()
+        return
 
+    for values in batch:
         for key, value in values.items():
             if key in sensor_mapping:
                 sensor_name, api_endpoint = sensor_mapping[key]
-                data = {'value': value}
-                try:
-                    response = requests.post(f"http://localhost:8000/sensor/{api_endpoint}", data=data, timeout=5)
-                    # if response.status_code != 200:
-                    #     print(f"❌ [{sensor_name}] HTTP {response.status_code} -> fast retry")
-                    #     next_sleep = ERROR_INTERVAL
-                    # else:
-                        # print(f"✅ [{sensor_name}] {value} -> {response.json()}")
-                except Exception as e:
-                    print(f"❌ [{sensor_name}] Server error: {e} -> fast retry")
-                    next_sleep = ERROR_INTERVAL
+                response = session.post(f"{SERVER_URL}/{api_endpoint}", data={'value': value}, timeout=5)
+                response.raise_for_status()
 
-        command_payload = 'ACK'
+
+def is_rejected(error):
+    # 다시 보내도 같은 결과인 에러: 4xx(408/429 제외), JSON 으로 만들 수 없는 프레임
+    if isinstance(error, requests.exceptions.InvalidJSONError):
+        return True
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        status = error.response.status_code
+        return 400 <= status < 500 and status not in (408, 429)
+    return False
+
+
+def uploader():
+    # 스풀에 쌓인 프레임을 모아서 전송하고, 성공한 위치까지 ack 한다.
+    # 서버가 내려가 있던 동안 쌓인 프레임은 BATCH_MAX 단위로 재전송된다.
+    # 연결 에러와 5xx 는 간격을 늘려 가며 재시도하고, 서버가 거부한 배치는 dead-letter 로 옮긴다
+    session = requests.Session()
+    delay = ERROR_INTERVAL
+    while True:
+        batch, cursor = spool.read_batch(BATCH_MAX)
+        if not batch:
+            new_frame.wait(BATCH_WAIT)
+            new_frame.clear()
+            continue
         try:
-            cmd_resp = requests.get("http://localhost:8000/sensor/getNextCommand", timeout=5)
-            payload = cmd_resp.json()
-            command_payload = payload.get('command', 'ACK')
-        except Exception as cmd_err:
-            print(f"❌ [CMD] Fetch error: {cmd_err} -> default ACK")
-            command_payload = 'ACK'
+            upload(session, batch)
+            spool.ack(cursor)
+            count('uploaded', len(batch))
+            delay = ERROR_INTERVAL
+        except Exception as e:
+            count('upload_errors')
+            if is_rejected(e):
+                path = spool.dead_letter(batch, cursor)
+                count('dead_lettered', len(batch))
+                print(f"❌ [UPLOAD] Rejected: {e} -> {len(batch)} frames moved to {path}")
+                continue
+            print(f"❌ [UPLOAD] Server error: {e} -> retry in {delay}s")
+            time.sleep(delay)
+            delay = min(delay * 2, ERROR_MAX_INTERVAL)
 
-        if command_payload not in ('OPEN', 'CLOSE', 'UP', 'DOWN'):
-            command_payload = 'ACK'
 
+def command_fetcher():
+    # 서버에서 명령이 들어올 때까지 long-poll 로 대기
+    session = requests.Session()
+    while True:
         try:
-            message = (command_payload + "\n").encode('utf-8')
-            if flag:
-                print(f"🚧 [TEST MODE] Would send: {command_payload}")
-            else:
-                ser.write(message)
-                ser.flush()
-                print(f"📤 [CMD SENT] {command_payload}")
-        except Exception as write_err:
-            print(f"❌ [SERIAL WRITE] {write_err} -> fast retry")
-            next_sleep = ERROR_INTERVAL
-
-        # 여기까지 에러 없으면 next_sleep 이미 NORMAL_INTERVAL (60s)
-        print(f"⏱ Next read in {next_sleep} seconds")
-
-    except Exception as outer_e:
-        print(f"❌ [LOOP ERROR] {outer_e} -> fast retry")
-        next_sleep = ERROR_INTERVAL
+            cmd_resp = session.get(
+                f"{SERVER_URL}/getNextCommand",
+                params={'wait': COMMAND_WAIT},
+                timeout=COMMAND_WAIT + 5,
+            )
+            command_payload = cmd_resp.json().get('command', 'ACK')
+        except Exception as cmd_err:
+            print(f"❌ [CMD] Fetch error: {cmd_err}")
+            time.sleep(ERROR_INTERVAL)
+            continue
+
+        if command_payload in ALLOWED_COMMANDS:
+            count('commands')
+            commands.put(command_payload)
+
+
+threads = [
+    threading.Thread(target=test_reader if flag else serial_reader, name='reader', daemon=True),
+    threading.Thread(target=uploader, name='uploader', daemon=True),
+    threading.Thread(target=command_fetcher, name='commands', daemon=True),
+]
+for t in threads:
+    t.start()
+
+try:
+    while True:
+        time.sleep(STATS_INTERVAL)
+        with stats_lock:
+            snapshot = dict(stats)
+        print(f"📈 [STATS] {snapshot} evicted={spool.evicted} pending_bytes={spool.pending_bytes()}")
+except KeyboardInterrupt:
+    print("Stopped")
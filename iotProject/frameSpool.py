@@ -0,0 +1,165 @@
+import json
+import os
+import threading
+import time
+
+
+class FrameSpool:
+    """수집기용 디스크 스풀. 프레임을 JSON 한 줄씩 세그먼트 파일에 추가 기록한다.
+
+    - append(): 현재 세그먼트 끝에 기록 (업로드 전에 호출)
+    - read_batch(): 아직 확인(ack)되지 않은 가장 오래된 프레임부터 읽음
+    - ack(): 업로드가 끝난 위치를 저장하고, 다 읽은 세그먼트 파일은 삭제 (compaction)
+    - dead_letter(): 서버가 거부한 배치를 dead/ 아래 별도 파일로 옮기고 그 뒤로 ack
+    전체 크기가 max_bytes 를 넘으면 가장 오래된 세그먼트부터 버린다 (drop-oldest).
+    """
+
+    SUFFIX = '.seg'
+
+    def __init__(self, path, segment_bytes=1 << 20, max_bytes=64 << 20, fsync=False):
+        self.path = path
+        self.segment_bytes = segment_bytes
+        self.max_bytes = max_bytes
+        self.fsync = fsync
+        self.evicted = 0
+        self.dead_lettered = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(path, exist_ok=True)
+        self._segments = sorted(
+            int(name[:-len(self.SUFFIX)])
+            for name in os.listdir(path)
+            if name.endswith(self.SUFFIX)
+        )
+        self._ack = self._load_ack()
+        for seg in [s for s in self._segments if s < self._ack[0]]:
+            self._remove(seg)
+        if not self._segments:
+            self._segments.append(self._ack[0])
+        self._sizes = {seg: self._size(seg) for seg in self._segments}
+        self._writer = open(self._seg_path(self._segments[-1]), 'ab')
+
+    def _seg_path(self, seg):
+        return os.path.join(self.path, f"{seg:08d}{self.SUFFIX}")
+
+    def _ack_path(self):
+        return os.path.join(self.path, 'ack.json')
+
+    def _size(self, seg):
+        try:
+            return os.path.getsize(self._seg_path(seg))
+        except OSError:
+            return 0
+
+    def _load_ack(self):
+        try:
+            with open(self._ack_path()) as f:
+                data = json.load(f)
+            return int(data['segment']), int(data['offset'])
+        except (OSError, ValueError, KeyError, TypeError):
+            return (self._segments[0] if self._segments else 0), 0
+
+    def _save_ack(self):
+        tmp = self._ack_path() + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'segment': self._ack[0], 'offset': self._ack[1]}, f)
+        os.replace(tmp, self._ack_path())
+
+    def _remove(self, seg):
+        try:
+            os.remove(self._seg_path(seg))
+        except OSError:
+            pass
+        self._segments.remove(seg)
+
+    def append(self, frame):
+        line = (json.dumps(frame, separators=(',', ':')) + '\n').encode('utf-8')
+        with self._lock:
+            self._writer.write(line)
+            self._writer.flush()
+            if self.fsync:
+                os.fsync(self._writer.fileno())
+            current = self._segments[-1]
+            self._sizes[current] += len(line)
+            if self._sizes[current] >= self.segment_bytes:
+                self._rotate()
+            self._enforce_cap()
+
+    def _rotate(self):
+        self._writer.close()
+        seg = self._segments[-1] + 1
+        self._segments.append(seg)
+        self._sizes[seg] = 0
+        self._writer = open(self._seg_path(seg), 'ab')
+
+    def _enforce_cap(self):
+        while sum(self._sizes.values()) > self.max_bytes and len(self._segments) > 1:
+            oldest = self._segments[0]
+            with open(self._seg_path(oldest), 'rb') as f:
+                if oldest == self._ack[0]:
+                    f.seek(self._ack[1])
+                self.evicted += f.read().count(b'\n')
+            self._remove(oldest)
+            del self._sizes[oldest]
+            if self._ack[0] <= oldest:
+                self._ack = (self._segments[0], 0)
+                self._save_ack()
+
+    def read_batch(self, max_frames):
+        """확인되지 않은 프레임을 최대 max_frames 개 읽고 (frames, cursor) 를 반환한다."""
+        with self._lock:
+            seg, offset = self._ack
+            if seg not in self._sizes:
+                seg, offset = self._segments[0], 0
+            frames = []
+            for current in [s for s in self._segments if s >= seg]:
+                if current != seg:
+                    offset = 0
+                with open(self._seg_path(current), 'rb') as f:
+                    f.seek(offset)
+                    while len(frames) < max_frames:
+                        line = f.readline()
+                        if not line.endswith(b'\n'):
+                            break
+                        offset += len(line)
+                        try:
+                            frames.append(json.loads(line))
+                        except ValueError:
+                            continue
+                seg = current
+                if len(frames) >= max_frames:
+                    break
+            return frames, (seg, offset)
+
+    def ack(self, cursor):
+        """cursor 까지 업로드 완료로 표시하고 앞선 세그먼트를 삭제한다."""
+        with self._lock:
+            seg = max(cursor[0], self._segments[0])
+            offset = cursor[1] if seg == cursor[0] else 0
+            self._ack = (seg, offset)
+            self._save_ack()
+            for old in [s for s in self._segments if s < seg]:
+                self._remove(old)
+                del self._sizes[old]
+
+    def dead_letter(self, frames, cursor):
+        """다시 보내도 성공할 수 없는 프레임들을 dead/<시각>.seg 에 기록하고 cursor 까지 ack 한다.
+
+        뒤의 프레임들이 막히지 않게 하기 위한 것으로, 파일은 확인 후 직접 재전송하거나 삭제한다.
+        """
+        dead_dir = os.path.join(self.path, 'dead')
+        os.makedirs(dead_dir, exist_ok=True)
+        name = os.path.join(dead_dir, f"{time.time_ns()}{self.SUFFIX}")
+        with open(name, 'ab') as f:
+            for frame in frames:
+                f.write((json.dumps(frame, separators=(',', ':')) + '\n').encode('utf-8'))
+            f.flush()
+            os.fsync(f.fileno())
+        self.dead_lettered += len(frames)
+        self.ack(cursor)
+        return name
+
+    def pending_bytes(self):
+        with self._lock:
+            total = sum(self._sizes.values())
+            return total - self._ack[1] if self._ack[0] in self._sizes else total
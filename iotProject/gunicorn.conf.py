@@ -0,0 +1,52 @@
+# 운영 서버 설정: iotProject/ 에서 `gunicorn` 으로 실행 (이 파일을 자동으로 읽음)
+#
+#   pip install gunicorn uvicorn
+#   DJANGO_SECRET_KEY=... REDIS_URL=redis://localhost:6379/0 gunicorn
+#
+# 기본은 asgi.py + uvicorn 워커 (SSE /sensor/stream 과 getNextCommand long-poll 이 비동기 뷰).
+# SERVER_MODE=wsgi 이면 wsgi.py + 스레드 워커로 실행한다 (수집 전용 서버용, stream 은 사용하지 말 것).
+import multiprocessing
+import os
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'iotProject.settings_prod')
+
+bind = os.getenv('BIND', '127.0.0.1:8000')
+
+if os.getenv('SERVER_MODE', 'asgi') == 'wsgi':
+    wsgi_app = 'iotProject.wsgi:application'
+    worker_class = 'gthread'
+    threads = int(os.getenv('THREADS', 8))
+else:
+    wsgi_app = 'iotProject.asgi:application'
+    worker_class = 'uvicorn.workers.UvicornWorker'
+
+# 최신 값/ETag/명령 알림을 워커끼리 맞추려면 공유 캐시(REDIS_URL)가 필요하다. 없으면 워커 1개로 실행
+#
+# uvicorn 워커에서 동기 뷰(setFrame, snapshot, latest, series)는 요청마다 별도 스레드에서 실행되므로
+# (Django ASGIHandler 의 ThreadSensitiveContext) 서로 줄 서지는 않지만, GIL 때문에 워커 하나는
+# CPU 코어 하나만큼만 처리한다. DB 대기 중에만 다른 요청이 겹친다 (manage.py bench_asgi 로 측정).
+# 워커 1개는 곧 코어 1개이므로 그 이상이 필요하면 REDIS_URL 을 설정해 워커를 늘린다
+if os.getenv('REDIS_URL'):
+    workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+else:
+    workers = 1
+
+# SSE 연결과 long-poll 요청이 끊기지 않도록 (getNextCommand 최대 대기 30초)
+timeout = 60
+graceful_timeout = 30
+keepalive = 5
+
+# 워커를 주기적으로 교체 (write-behind 버퍼는 종료 시 flush 됨)
+max_requests = 100000
+max_requests_jitter = 10000
+
+accesslog = os.getenv('ACCESS_LOG')  # 기본: 기록 안 함
+errorlog = '-'
+
+
+def when_ready(server):
+    if workers == 1 and multiprocessing.cpu_count() > 1:
+        server.log.warning(
+            "REDIS_URL is not set: running a single worker, so all requests share one CPU core "
+            "(%d available). Set REDIS_URL to run WEB_CONCURRENCY workers.", multiprocessing.cpu_count(),
+        )
@@ -89,13 +89,52 @@ WSGI_APPLICATION = 'iotProject.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
+# 연결 단위 PRAGMA. transaction_mode IMMEDIATE: 쓰기 트랜잭션이 시작할 때 잠금을 잡아
+# 도중에 "database is locked" 가 나지 않게 한다.
+# journal_mode=WAL 은 DB 파일 자체를 바꾸므로 (저장소의 db.sqlite3 가 수정됨) 여기서 켜지 않고
+# settings_prod 에서만 SQLITE_WAL_PRAGMAS 를 더한다. 수집기 쓰기와 대시보드 읽기가 서로 막지 않게 하는 설정이다.
+SQLITE_WAL_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',     # WAL 에서는 NORMAL 로도 손상되지 않음 (전원 차단 시 마지막 커밋만 유실 가능)
+}
+SQLITE_PRAGMAS = {
+    'cache_size': -20000,        # 음수는 KiB 단위 (약 20MB)
+    'mmap_size': 268435456,      # 256MB
+    'temp_store': 'MEMORY',
+    'busy_timeout': 20000,       # ms
+}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 60,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'init_command': ';'.join(f'PRAGMA {key}={value}' for key, value in SQLITE_PRAGMAS.items()),
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        },
     }
 }
 
+# POSTGRES_DB 가 설정되어 있으면 PostgreSQL 을 사용한다 (운영용).
+# 센서 값 테이블은 마이그레이션에서 reg_date 월 단위 파티션 테이블로 만들어지며,
+# manage.py pg_partitions 를 매일 실행해 다가올 달의 파티션을 미리 만들어야 한다.
+if os.getenv('POSTGRES_DB'):
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv('POSTGRES_DB'),
+            'USER': os.getenv('POSTGRES_USER', 'postgres'),
+            'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
+            'HOST': os.getenv('POSTGRES_HOST', 'localhost'),
+            'PORT': os.getenv('POSTGRES_PORT', '5432'),
+            'CONN_MAX_AGE': 60,
+            'CONN_HEALTH_CHECKS': True,
+        }
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -116,6 +155,92 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Sensor storage layout
+# 'legacy': 센서별 테이블 (TemperatureSensor, ...), 'narrow': 통합 테이블 SensorReading.
+# 'narrow' 로 바꾸기 전에 manage.py convert_storage 로 기존 데이터를 옮긴다.
+
+SENSOR_STORAGE = 'legacy'
+
+
+# Sensor data retention
+# 센서 원본 데이터 보존 기간(일). 'default' 는 목록에 없는 센서에 적용되고, None 이면 삭제하지 않는다.
+# 기간이 지난 행은 manage.py sensor_retention 실행 시 SENSOR_ARCHIVE_DIR 로 옮겨진다.
+
+SENSOR_RETENTION_DAYS = {
+    'default': 90,
+}
+SENSOR_ARCHIVE_DIR = BASE_DIR / 'archive'
+
+
+# Cache
+# 기본은 프로세스별 메모리 캐시(LRU, MAX_ENTRIES 개). REDIS_URL 이 있으면 여러 워커가 Redis 를 공유한다.
+# Redis 는 maxmemory 와 maxmemory-policy allkeys-lru 로 크기를 제한해 둔다.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'sensor',
+        'OPTIONS': {'MAX_ENTRIES': 5000, 'CULL_FREQUENCY': 4},
+    }
+}
+if os.getenv('REDIS_URL'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv('REDIS_URL'),
+    }
+
+# 센서 조회 결과(latest-N, series) 캐시. 키에 센서별 쓰기 버전이 들어가므로 값이 저장되면 자동으로 무효화된다.
+# max_rows 보다 큰 결과는 저장하지 않는다.
+
+SENSOR_CACHE = {
+    'enabled': True,
+    'alias': 'default',
+    'timeout': 300,
+    'max_rows': 20000,
+}
+
+# Sensor write-behind buffer
+# enabled 이면 set* 요청은 값을 메모리 버퍼에 넣고 바로 응답하며, 백그라운드 스레드가
+# flush_interval_ms 마다 (또는 flush_rows 개가 모이면) 한 번에 저장한다.
+# 버퍼에 max_rows 개가 쌓여 있으면 503 INGEST_BUSY 를 반환한다.
+# 프로세스가 비정상 종료되면 아직 저장되지 않은 값은 사라진다.
+# 정상 종료 시에도 close_timeout 초 안에 저장하지 못한 값은 버린다 (로그와 ingestStats 의 dropped_rows).
+
+SENSOR_WRITE_BEHIND = {
+    'enabled': os.getenv('SENSOR_WRITE_BEHIND') == '1',
+    'flush_interval_ms': 200,
+    'flush_rows': 500,
+    'max_rows': 10000,
+    'close_timeout': 5,
+}
+
+
+# OpenAI (voiceAssistant)
+# 비동기 클라이언트로 호출하며, 워커당 동시에 max_concurrency 개까지만 호출한다.
+# 자리가 나지 않으면 queue_timeout 초 뒤 503, 호출이 timeout 초를 넘기면 504 를 반환한다.
+# OPENAI_BASE_URL 로 다른 서버(예: manage.py fake_llm)를 가리킬 수 있다.
+# 같은 (system prompt, 정규화한 메시지, model) 의 응답은 cache_alias 캐시에 cache_timeout 초 동안 저장하고,
+# 동시에 들어온 같은 요청은 호출 하나를 함께 기다린다. cache_timeout 이 0 이면 저장하지 않는다.
+
+LLM = {
+    'model': 'gpt-4o-mini',
+    'base_url': os.getenv('OPENAI_BASE_URL'),
+    'timeout': 20,
+    'max_retries': 1,
+    'max_concurrency': 4,
+    'queue_timeout': 5,
+    'cache_alias': 'default',
+    'cache_timeout': 600,
+}
+
+
+# Multi-worker
+# 여러 워커 프로세스로 실행할 때 다른 워커의 쓰기/명령을 확인하는 주기(초).
+# None 이면 단일 프로세스 기준으로 프로세스 내 알림만 사용한다 (settings_prod 에서 설정).
+
+SENSOR_WORKER_POLL = None
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.1/topics/i18n/
 
@@ -135,6 +260,8 @@ STATIC_URL = 'static/'
 STATICFILES_DIRS = (
     os.path.join(BASE_DIR, 'static'),
 )
+# manage.py collectstatic 결과 (운영에서는 nginx 가 직접 제공)
+STATIC_ROOT = BASE_DIR / 'staticfiles'
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
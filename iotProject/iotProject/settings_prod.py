@@ -0,0 +1,40 @@
+"""
+운영용 설정. DJANGO_SETTINGS_MODULE=iotProject.settings_prod
+
+gunicorn.conf.py 가 기본으로 이 모듈을 사용한다.
+필수 환경 변수: DJANGO_SECRET_KEY
+선택 환경 변수: DJANGO_ALLOWED_HOSTS (쉼표 구분), REDIS_URL (워커 2개 이상일 때 필요), POSTGRES_DB 등
+"""
+import os
+
+from .settings import *  # noqa: F401,F403
+
+DEBUG = False
+
+SECRET_KEY = os.environ['DJANGO_SECRET_KEY']
+ALLOWED_HOSTS = os.getenv('DJANGO_ALLOWED_HOSTS', 'localhost,127.0.0.1').split(',')
+
+# 정적 파일은 collectstatic 으로 STATIC_ROOT 에 모은 뒤 nginx 가 제공한다 (deploy/nginx.conf)
+
+# SQLite 는 운영에서만 WAL 로 전환한다 (한 번 바꾸면 DB 파일에 남음)
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':  # noqa: F405
+    SQLITE_PRAGMAS = {**SQLITE_WAL_PRAGMAS, **SQLITE_PRAGMAS}  # noqa: F405
+    DATABASES['default']['OPTIONS']['init_command'] = ';'.join(  # noqa: F405
+        f'PRAGMA {key}={value}' for key, value in SQLITE_PRAGMAS.items()
+    )
+
+# 워커 사이 상태(최신 값, SSE, 명령 알림)는 REDIS_URL 캐시의 센서 버전과 DB 조회로 맞춘다
+SENSOR_WORKER_POLL = 1.0
+
+# DEBUG 가 꺼져 있으면 요청 에러가 콘솔에 남지 않으므로 로그를 stderr 로 보낸다
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'root': {
+        'handlers': ['console'],
+        'level': os.getenv('DJANGO_LOG_LEVEL', 'WARNING'),
+    },
+}
@@ -0,0 +1,232 @@
+"""서버 부하 테스트: 수집기 N 개가 setFrame 으로 프레임을 올리고, 대시보드 M 개가 조회 API 를 폴링한다.
+--voice 를 주면 음성 비서 사용자도 함께 실행해, LLM 호출이 진행 중일 때 센서 경로의 지연 시간을 볼 수 있다
+(서버는 OPENAI_BASE_URL 로 manage.py fake_llm 을 가리키게 해서 실행).
+
+    python loadTest.py --url http://127.0.0.1:8000 --collectors 20 --dashboards 50 --duration 60
+
+표준 라이브러리만 사용한다 (asyncio 위의 간단한 HTTP/1.1 keep-alive 클라이언트).
+끝나면 경로별 요청 수, 초당 요청 수(RPS), 에러 수, 304 비율, p50/p90/p99/최대 지연 시간을 출력한다.
+같은 옵션으로 변경 전후를 실행해 비교한다 (--json 으로 결과를 파일에 남길 수 있음).
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from urllib.parse import urlsplit
+
+
+class Connection:
+    """HTTP/1.1 keep-alive 연결 하나. 응답은 Content-Length 또는 chunked 만 처리한다."""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def request(self, method, path, body=b'', headers=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}", f"Content-Length: {len(body)}"]
+        lines += [f"{key}: {value}" for key, value in (headers or {}).items()]
+        try:
+            self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode('latin-1') + body)
+            await self.writer.drain()
+            return await self._read_response()
+        except Exception:
+            self.close()
+            raise
+
+    async def _read_response(self):
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("connection closed")
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            key, _, value = line.decode('latin-1').partition(':')
+            headers[key.strip().lower()] = value.strip()
+
+        if headers.get('transfer-encoding') == 'chunked':
+            body = b''
+            while True:
+                size = int((await self.reader.readline()).split(b';')[0], 16)
+                chunk = await self.reader.readexactly(size + 2)
+                if size == 0:
+                    break
+                body += chunk[:-2]
+        elif 'content-length' in headers:
+            body = await self.reader.readexactly(int(headers['content-length']))
+        else:
+            body = await self.reader.read()
+            self.close()
+        if headers.get('connection', '').lower() == 'close':
+            self.close()
+        return status, headers, body
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+class Stats:
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+        self.not_modified = {}
+
+    def record(self, name, ms, status):
+        self.latencies.setdefault(name, []).append(ms)
+        if status == 304:
+            self.not_modified[name] = self.not_modified.get(name, 0) + 1
+        elif status >= 400:
+            self.errors[name] = self.errors.get(name, 0) + 1
+
+    def error(self, name):
+        self.errors[name] = self.errors.get(name, 0) + 1
+
+    def report(self, elapsed):
+        result = {}
+        for name in sorted(set(self.latencies) | set(self.errors)):
+            values = sorted(self.latencies.get(name, []))
+            count = len(values)
+
+            def pct(p):
+                return values[min(count - 1, int(count * p))] if count else 0.0
+
+            result[name] = {
+                'requests': count,
+                'rps': count / elapsed,
+                'errors': self.errors.get(name, 0),
+                'not_modified': self.not_modified.get(name, 0) / count if count else 0.0,
+                'p50_ms': pct(0.50),
+                'p90_ms': pct(0.90),
+                'p99_ms': pct(0.99),
+                'max_ms': values[-1] if values else 0.0,
+            }
+        return result
+
+
+async def timed(stats, name, conn, method, path, body=b'', headers=None):
+    t0 = time.perf_counter()
+    try:
+        status, response_headers, response_body = await conn.request(method, path, body, headers)
+    except Exception:
+        stats.error(name)
+        await asyncio.sleep(0.1)
+        return None, {}, b''
+    stats.record(name, (time.perf_counter() - t0) * 1000, status)
+    return status, response_headers, response_body
+
+
+async def collector(args, stats, deadline):
+    # dataCollector.py 의 BATCH_MODE 와 같은 형식으로 프레임을 올린다
+    conn = Connection(args.host, args.port)
+    await asyncio.sleep(random.random() * args.frame_interval)
+    while time.monotonic() < deadline:
+        now = time.time()
+        frames = [
+            {'T': round(random.uniform(-10, 35), 1), 'H': round(random.uniform(0, 100), 1),
+             'D': random.randint(0, 300), 'R': random.randint(0, 1), 'L': random.randint(0, 4000),
+             'WDIR': random.randint(0, 3), 'ts': now}
+            for _ in range(args.batch)
+        ]
+        body = json.dumps({'frames': frames}).encode('utf-8')
+        await timed(stats, 'POST setFrame', conn, 'POST', args.prefix + '/setFrame', body,
+                    {'Content-Type': 'application/json'})
+        await asyncio.sleep(args.frame_interval)
+    conn.close()
+
+
+async def dashboard(args, stats, deadline):
+    # 대시보드: snapshot 을 ETag 와 함께 폴링하고, 가끔 최신 N 개와 시계열을 조회
+    conn = Connection(args.host, args.port)
+    etag = None
+    polls = 0
+    await asyncio.sleep(random.random() * args.poll_interval)
+    while time.monotonic() < deadline:
+        headers = {'If-None-Match': etag} if etag and not args.no_etag else None
+        status, response_headers, _ = await timed(stats, 'GET snapshot', conn, 'GET', args.prefix + '/snapshot',
+                                                  headers=headers)
+        if status == 200:
+            etag = response_headers.get('etag')
+        polls += 1
+        if polls % 5 == 0:
+            await timed(stats, 'GET latest', conn, 'GET', args.prefix + f'/Temp/latest/{args.latest}')
+        if polls % 15 == 0:
+            await timed(stats, 'GET series', conn, 'GET', args.prefix + '/Temp/series?bucket=1m&points=500')
+        await asyncio.sleep(args.poll_interval)
+    conn.close()
+
+
+# 기본 음성 요청은 장치를 움직이지 않는 질문만 보낸다 (fake_llm 도 '열어' 가 없으면 action 을 돌려주지 않음)
+VOICE_QUESTIONS = ['오늘 날씨 어때?', '지금 미세먼지 괜찮아?', '실내 온도 알려줘', '습도는 어때?']
+# --voice-commands 를 준 경우에만 섞는다. 실제 WindowCommand 가 만들어지고 수집기가 실행한다
+VOICE_COMMANDS = ['창문 열어줘', '블라인드 좀 내려줄래']
+
+
+async def voice_user(args, stats, deadline):
+    conn = Connection(args.host, args.port)
+    messages = VOICE_QUESTIONS + (VOICE_COMMANDS if args.voice_commands else [])
+    while time.monotonic() < deadline:
+        body = json.dumps({'message': random.choice(messages)}, ensure_ascii=False).encode('utf-8')
+        await timed(stats, 'POST voice', conn, 'POST', args.prefix + '/voiceAssistant', body,
+                    {'Content-Type': 'application/json'})
+        await asyncio.sleep(args.voice_interval)
+    conn.close()
+
+
+async def run(args):
+    deadline = time.monotonic() + args.duration
+    stats = Stats()
+    started = time.monotonic()
+    tasks = [collector(args, stats, deadline) for _ in range(args.collectors)]
+    tasks += [dashboard(args, stats, deadline) for _ in range(args.dashboards)]
+    tasks += [voice_user(args, stats, deadline) for _ in range(args.voice)]
+    await asyncio.gather(*tasks)
+    return stats.report(time.monotonic() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--collectors', type=int, default=10)
+    parser.add_argument('--dashboards', type=int, default=20)
+    parser.add_argument('--duration', type=float, default=30)
+    parser.add_argument('--batch', type=int, default=1, help='setFrame 한 번에 보내는 프레임 수')
+    parser.add_argument('--frame-interval', type=float, default=1.0, help='수집기 전송 간격(초), 0 이면 쉬지 않음')
+    parser.add_argument('--poll-interval', type=float, default=2.0, help='대시보드 폴링 간격(초), 0 이면 쉬지 않음')
+    parser.add_argument('--voice', type=int, default=0, help='voiceAssistant 를 호출하는 사용자 수')
+    parser.add_argument('--voice-interval', type=float, default=0.0, help='음성 요청 간격(초)')
+    parser.add_argument('--voice-commands', action='store_true',
+                        help='창문/블라인드 명령도 보냄 (실제 명령이 큐에 쌓이므로 수집기가 연결되지 않은 서버에서만 사용)')
+    parser.add_argument('--latest', type=int, default=100)
+    parser.add_argument('--no-etag', action='store_true', help='If-None-Match 를 보내지 않음')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='결과를 JSON 파일로 저장')
+    args = parser.parse_args()
+
+    url = urlsplit(args.url)
+    args.host = url.hostname
+    args.port = url.port or 80
+    args.prefix = url.path.rstrip('/') + '/sensor'
+    random.seed(args.seed)
+
+    result = asyncio.run(run(args))
+    print(f"{'endpoint':<15} {'requests':>9} {'rps':>8} {'errors':>7} {'304':>6} "
+          f"{'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for name, row in result.items():
+        print(f"{name:<15} {row['requests']:>9} {row['rps']:>8.1f} {row['errors']:>7} {row['not_modified']:>6.0%} "
+              f"{row['p50_ms']:>8.1f} {row['p90_ms']:>8.1f} {row['p99_ms']:>8.1f} {row['max_ms']:>8.1f}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'args': {k: v for k, v in vars(args).items() if k != 'json'}, 'result': result}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
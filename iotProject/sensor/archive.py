@@ -0,0 +1,171 @@
+import json
+import os
+import sys
+import zipfile
+from array import array
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import caching, postgres
+from .models import SensorReading
+from .queries import readings, SENSORS, SENSOR_IDS
+
+# 보관 파일: 센서별 디렉터리에 열(column) 단위로 압축한 zip 파일
+#   meta.json : sensor, count, first/last (unix 초)
+#   id.i8     : id (little-endian int64)
+#   ts.f8     : reg_date (unix 초, little-endian float64)
+#   value.f8  : value (little-endian float64)
+# numpy 로는 np.frombuffer(zf.read('ts.f8'), '<f8') 로 바로 읽을 수 있다.
+
+
+def archive_dir(sensor):
+    return os.path.join(settings.SENSOR_ARCHIVE_DIR, sensor)
+
+
+def retention_for(sensor):
+    """센서의 원본 보존 기간 (None 이면 삭제하지 않음)"""
+    days = settings.SENSOR_RETENTION_DAYS.get(sensor, settings.SENSOR_RETENTION_DAYS.get('default'))
+    return None if days is None else timedelta(days=days)
+
+
+def _column(typecode, values):
+    col = array(typecode, values)
+    if sys.byteorder != 'little':
+        col.byteswap()
+    return col.tobytes()
+
+
+def _read_column(zf, name, typecode):
+    col = array(typecode)
+    col.frombytes(zf.read(name))
+    if sys.byteorder != 'little':
+        col.byteswap()
+    return col
+
+
+def write_segment(sensor, rows):
+    """(id, reg_date, value) 목록을 보관 파일 하나로 기록하고 경로를 반환한다."""
+    ids = [row[0] for row in rows]
+    ts = [row[1].timestamp() for row in rows]
+    values = [float(row[2]) for row in rows]
+    directory = archive_dir(sensor)
+    os.makedirs(directory, exist_ok=True)
+    # 파일 이름에 시간 범위를 넣어 조회 시 파일을 열지 않고 고를 수 있게 한다
+    name = f"{int(ts[0] * 1000)}_{int(ts[-1] * 1000)}_{ids[0]}.zip"
+    path = os.path.join(directory, name)
+    tmp = path + '.tmp'
+    with zipfile.ZipFile(tmp, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr('meta.json', json.dumps({
+            'sensor': sensor, 'count': len(rows), 'first': ts[0], 'last': ts[-1],
+        }))
+        zf.writestr('id.i8', _column('q', ids))
+        zf.writestr('ts.f8', _column('d', ts))
+        zf.writestr('value.f8', _column('d', values))
+    os.replace(tmp, path)
+    return path
+
+
+def expire(sensor, model, chunk=5000, now=None):
+    """보존 기간이 지난 원본 행을 chunk 개씩 보관 파일로 옮기고 삭제한다.
+
+    chunk 마다 짧은 트랜잭션으로 삭제하므로 수집 중인 쓰기를 오래 막지 않는다.
+    보관 파일을 먼저 쓰고 삭제하므로 중간에 중단되어도 데이터가 사라지지 않는다.
+    """
+    ttl = retention_for(sensor)
+    if ttl is None:
+        return 0
+    cutoff = (now or timezone.now()) - ttl
+    moved = 0
+    while True:
+        rows = list(
+            readings(model)
+            .filter(reg_date__lt=cutoff)
+            .order_by('reg_date', 'id')
+            .values_list('id', 'reg_date', 'value')[:chunk]
+        )
+        if not rows:
+            if moved:
+                # 삭제된 행이 들어 있던 조회 결과 캐시 무효화
+                caching.bump([sensor])
+            return moved
+        write_segment(sensor, rows)
+        with transaction.atomic():
+            readings(model).filter(id__in=[row[0] for row in rows]).delete()
+        moved += len(rows)
+
+
+def _segments(sensor, start, end):
+    directory = archive_dir(sensor)
+    if not os.path.isdir(directory):
+        return []
+    start_ms, end_ms = start.timestamp() * 1000, end.timestamp() * 1000
+    paths = []
+    for name in os.listdir(directory):
+        if not name.endswith('.zip'):
+            continue
+        first_ms, last_ms, _ = name[:-4].split('_')
+        if int(last_ms) >= start_ms and int(first_ms) < end_ms:
+            paths.append((int(first_ms), os.path.join(directory, name)))
+    return [path for _, path in sorted(paths)]
+
+
+def has_segments(sensor, start, end):
+    """[start, end) 에 걸친 보관 파일이 있는지 (파일을 열지 않고 이름으로만 확인)"""
+    return bool(_segments(sensor, start, end))
+
+
+def read_archived(sensor, start, end):
+    """보관 파일에서 [start, end) 구간의 (reg_date, value) 를 시간 순으로 반환한다."""
+    lo, hi = start.timestamp(), end.timestamp()
+    points = []
+    for path in _segments(sensor, start, end):
+        with zipfile.ZipFile(path) as zf:
+            ts = _read_column(zf, 'ts.f8', 'd')
+            values = _read_column(zf, 'value.f8', 'd')
+        points.extend(
+            (datetime.fromtimestamp(t, tz=dt_timezone.utc), v)
+            for t, v in zip(ts, values)
+            if lo <= t < hi
+        )
+    points.sort(key=lambda p: p[0])
+    return points
+
+
+def drop_expired_partitions(now=None):
+    """PostgreSQL 파티션 테이블에서 보존 기간이 모두 지난 월 파티션을 보관 후 DROP 한다.
+
+    통합 테이블(SensorReading)은 모든 센서가 한 파티션을 공유하므로
+    가장 긴 보존 기간을 기준으로 하고, 보존 기간이 없는 센서가 있으면 건너뛴다.
+    """
+    if not postgres.enabled():
+        return {}
+    now = now or timezone.now()
+    dropped = {}
+    for sensor, model in SENSORS.items():
+        ttl = retention_for(sensor)
+        table = model._meta.db_table
+        if ttl is None or not postgres.is_partitioned(table):
+            continue
+        dropped[sensor] = postgres.drop_expired_partitions(
+            table, now - ttl, lambda rows, sensor=sensor: write_segment(sensor, rows),
+        )
+
+    ttls = [retention_for(sensor) for sensor in SENSORS]
+    table = SensorReading._meta.db_table
+    if None not in ttls and postgres.is_partitioned(table):
+        names = {SENSOR_IDS[model]: sensor for sensor, model in SENSORS.items()}
+
+        def archive_rows(rows):
+            by_sensor = {}
+            for row_id, reg_date, value, sensor_id in rows:
+                by_sensor.setdefault(names[sensor_id], []).append((row_id, reg_date, value))
+            for sensor, sensor_rows in by_sensor.items():
+                write_segment(sensor, sensor_rows)
+
+        dropped['SensorReading'] = postgres.drop_expired_partitions(table, now - max(ttls), archive_rows)
+    if any(dropped.values()):
+        caching.bump(list(SENSORS))
+    return dropped
@@ -0,0 +1,140 @@
+"""센서 조회 결과 캐시.
+
+Django 캐시(settings.SENSOR_CACHE['alias']) 위에 센서별 버전 키를 둔다.
+- 'sensor:v:<센서>' 는 센서 값이 저장될 때마다 증가하는 버전이다 (bump).
+- 조회 결과 키에는 그 센서의 현재 버전이 들어가므로, 값이 저장되면 이전 결과는 더 이상 읽히지 않고
+  LRU(LocMemCache 의 MAX_ENTRIES, Redis 의 maxmemory-policy)로 밀려난다.
+- Redis 처럼 공유 백엔드를 쓰면 여러 워커가 같은 버전과 결과를 본다.
+
+캐시 백엔드에 문제가 있어도 요청은 실패하지 않고 DB 에서 읽는다 (errors 로 집계).
+"""
+import logging
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = 'sensor:v:{}'
+
+_stats_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0, 'skipped': 0, 'errors': 0, 'get_ms': 0.0, 'fill_ms': 0.0}
+
+
+def _config():
+    return settings.SENSOR_CACHE
+
+
+def _cache():
+    return caches[_config().get('alias', 'default')]
+
+
+def _count(**values):
+    with _stats_lock:
+        for key, value in values.items():
+            _stats[key] += value
+
+
+def _new_version():
+    # 버전 키가 밀려나거나 백엔드가 다시 시작되어도 예전 결과 키와 겹치지 않도록 무작위로 시작
+    return random.getrandbits(48)
+
+
+def versions(sensors):
+    """센서 이름 목록 -> {센서: 버전}. 버전 키가 없으면 새로 만든다."""
+    cache = _cache()
+    keys = {VERSION_KEY.format(name): name for name in sensors}
+    try:
+        found = cache.get_many(keys)
+        for key in keys.keys() - found.keys():
+            cache.add(key, _new_version(), timeout=None)
+            found[key] = cache.get(key)
+    except Exception:
+        logger.exception("sensor cache unavailable")
+        _count(errors=1)
+        return {name: None for name in sensors}
+    return {name: found[key] for key, name in keys.items()}
+
+
+def version(sensor):
+    return versions([sensor])[sensor]
+
+
+def bump(sensors):
+    """sensors 의 값이 저장/삭제되었음을 알린다 (이전 조회 결과 무효화). {센서: 새 버전} 을 반환한다."""
+    cache = _cache()
+    bumped = {}
+    for name in sensors:
+        key = VERSION_KEY.format(name)
+        try:
+            bumped[name] = cache.incr(key)
+        except ValueError:
+            # 아직 버전 키가 없음
+            cache.add(key, _new_version(), timeout=None)
+            bumped[name] = None
+        except Exception:
+            logger.exception("sensor cache unavailable")
+            _count(errors=1)
+            bumped[name] = None
+    return bumped
+
+
+def cached(sensor, parts, compute):
+    """(sensor, parts) 조회 결과를 캐시에서 읽고, 없으면 compute() 로 계산해 저장한다.
+
+    parts 는 결과를 구분하는 값들의 tuple (예: ('latest', 100)) 이다.
+    결과 행 수가 SENSOR_CACHE['max_rows'] 보다 많으면 저장하지 않는다.
+    """
+    config = _config()
+    if not config.get('enabled', True):
+        return compute()
+    current = version(sensor)
+    if current is None:
+        return compute()
+    key = ':'.join(['sensor', sensor, str(current), *map(str, parts)])
+    cache = _cache()
+
+    t0 = time.perf_counter()
+    try:
+        result = cache.get(key)
+    except Exception:
+        logger.exception("sensor cache unavailable")
+        _count(errors=1)
+        return compute()
+    get_ms = (time.perf_counter() - t0) * 1000
+    if result is not None:
+        _count(hits=1, get_ms=get_ms)
+        return result
+
+    t0 = time.perf_counter()
+    result = compute()
+    fill_ms = (time.perf_counter() - t0) * 1000
+    _count(misses=1, get_ms=get_ms, fill_ms=fill_ms)
+    if len(result) > config.get('max_rows', 20000):
+        _count(skipped=1)
+        return result
+    try:
+        cache.set(key, result, config.get('timeout', 300))
+    except Exception:
+        logger.exception("sensor cache unavailable")
+        _count(errors=1)
+    return result
+
+
+def metrics():
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats['hits'] + stats['misses']
+    return {
+        'backend': type(_cache()).__name__,
+        'hits': stats['hits'],
+        'misses': stats['misses'],
+        'hit_rate': stats['hits'] / lookups if lookups else 0.0,
+        'skipped': stats['skipped'],
+        'errors': stats['errors'],
+        'avg_get_ms': stats['get_ms'] / lookups if lookups else 0.0,
+        'avg_fill_ms': stats['fill_ms'] / stats['misses'] if stats['misses'] else 0.0,
+    }
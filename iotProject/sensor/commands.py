@@ -0,0 +1,86 @@
+import asyncio
+import threading
+
+from django.db import connection, transaction
+
+from .models import WindowCommand
+
+# getNextCommand?wait= 로 대기 중인 요청들: (이벤트 루프, asyncio.Event)
+_waiters = set()
+_waiters_lock = threading.Lock()
+
+
+def _pending():
+    return WindowCommand.objects.filter(processed=False).order_by('created_at', 'id')
+
+
+def claim_next_command():
+    """처리되지 않은 가장 오래된 명령을 원자적으로 가져가고 processed 로 표시한다.
+
+    동시에 여러 poller 가 호출해도 한 명령은 정확히 한 번만 반환된다.
+    SKIP LOCKED 를 지원하는 DB (PostgreSQL 등) 는 행 잠금을 사용하고,
+    SQLite 3.35 이상은 UPDATE ... RETURNING 한 문장으로 가져간다.
+    그 외에는 processed=False 조건을 건 UPDATE 의 영향 행 수로 선점 여부를 판단한다.
+    """
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            cmd = _pending().select_for_update(skip_locked=True).first()
+            if cmd is not None:
+                cmd.processed = True
+                cmd.save(update_fields=['processed'])
+            return cmd
+
+    if connection.vendor == 'sqlite' and connection.Database.sqlite_version_info >= (3, 35):
+        table = connection.ops.quote_name(WindowCommand._meta.db_table)
+        claimed = list(WindowCommand.objects.raw(
+            f"UPDATE {table} SET processed = 1 "
+            f"WHERE id = (SELECT id FROM {table} WHERE processed = 0 ORDER BY created_at, id LIMIT 1) "
+            f"RETURNING *"
+        ))
+        return claimed[0] if claimed else None
+
+    while True:
+        cmd = _pending().first()
+        if cmd is None:
+            return None
+        if WindowCommand.objects.filter(pk=cmd.pk, processed=False).update(processed=True):
+            cmd.processed = True
+            return cmd
+        # 다른 poller 가 먼저 가져간 경우 다음 후보로 재시도
+
+
+def notify_command_queued():
+    """대기 중인 long-poll 요청을 깨운다. 어느 스레드에서 호출해도 된다.
+
+    같은 프로세스 안의 대기자만 깨우므로, 다른 워커에서 들어온 명령은
+    대기 시간이 끝난 뒤 다음 요청에서 전달된다.
+    """
+    with _waiters_lock:
+        waiters = list(_waiters)
+    for loop, event in waiters:
+        try:
+            loop.call_soon_threadsafe(event.set)
+        except RuntimeError:
+            pass
+
+
+class CommandWaiter:
+    """명령 대기 등록. 명령을 조회하기 전에 등록해야 그 사이의 알림을 놓치지 않는다."""
+
+    def __enter__(self):
+        self._entry = (asyncio.get_running_loop(), asyncio.Event())
+        with _waiters_lock:
+            _waiters.add(self._entry)
+        return self
+
+    def __exit__(self, *exc):
+        with _waiters_lock:
+            _waiters.discard(self._entry)
+
+    async def wait(self, timeout):
+        event = self._entry[1]
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        event.clear()
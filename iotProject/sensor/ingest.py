@@ -0,0 +1,157 @@
+import math
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import (
+    TemperatureSensor,
+    HumiditySensor,
+    VibratorSensor,
+    ProximitySensor,
+    DustSensor,
+    LightSensor,
+    RainSensor,
+    DirSensor,
+    BlindDirSensor,
+)
+from .queries import remember_latest, mark_written, new_reading, SENSOR_NAMES
+from . import postgres, rollup, writebehind
+
+def _float(raw):
+    value = float(raw)
+    if not math.isfinite(value):
+        raise ValueError(raw)
+    return value
+
+
+def _int(raw):
+    # DB 정수 열 범위를 넘는 값은 저장 시 OverflowError(500) 가 되므로 여기서 거른다
+    value = int(_float(raw))
+    low, high = connection.ops.integer_field_range('IntegerField')
+    if not low <= value <= high:
+        raise ValueError(raw)
+    return value
+
+
+def _bool(raw):
+    # 'true'/'false' 문자열과 0/1 숫자를 모두 받는다
+    if isinstance(raw, str) and raw.strip().lower() in ('true', 'false'):
+        return raw.strip().lower() == 'true'
+    return bool(_int(raw))
+
+
+# LoRa 프레임 키 -> (모델, 값 변환 함수)
+FRAME_KEYS = {
+    'T': (TemperatureSensor, _float),
+    'H': (HumiditySensor, _float),
+    'V': (VibratorSensor, _bool),
+    'P': (ProximitySensor, _float),
+    'D': (DustSensor, _float),
+    'L': (LightSensor, _float),
+    'R': (RainSensor, _float),
+    'DIR': (DirSensor, _int),
+    'WDIR': (DirSensor, _int),
+    'BDIR': (BlindDirSensor, _int),
+}
+# 센서 모델 -> 값 변환 함수 (set* / POST /sensor/<name> 용)
+VALUE_COERCE = {model: coerce for model, coerce in FRAME_KEYS.values()}
+
+
+class FrameError(ValueError):
+    pass
+
+
+def _frame_date(ts, default):
+    # 수집기가 측정 시각(unix 초)을 보낸 경우 그 시각을 사용
+    if ts is None:
+        return default
+    try:
+        return datetime.fromtimestamp(float(ts), tz=dt_timezone.utc)
+    except (TypeError, ValueError, OverflowError, OSError):
+        raise FrameError(f"invalid ts: {ts!r}")
+
+
+def coerce_value(model, raw, key=None):
+    """센서 타입(float/bool/int)에 맞게 값을 변환한다. 잘못된 값이면 FrameError"""
+    try:
+        return VALUE_COERCE[model](raw)
+    except (TypeError, ValueError, OverflowError):
+        raise FrameError(f"invalid value for {key or SENSOR_NAMES[model]}: {raw!r}")
+
+
+def has_readings(frames):
+    """프레임 중 하나라도 알려진 센서 키를 포함하는지"""
+    return any(
+        isinstance(frame, dict) and any(str(key).upper() in FRAME_KEYS for key in frame)
+        for frame in frames
+    )
+
+
+def build_rows(frames, reg_date):
+    """프레임 목록을 센서 모델별 저장 전 인스턴스 목록으로 변환한다."""
+    rows = {}
+    for frame in frames:
+        if not isinstance(frame, dict):
+            raise FrameError("frame must be an object")
+        frame_date = _frame_date(frame.get('ts'), reg_date)
+        for key, raw in frame.items():
+            spec = FRAME_KEYS.get(str(key).upper())
+            if spec is None:
+                continue
+            model = spec[0]
+            rows.setdefault(model, []).append(new_reading(model, coerce_value(model, raw, key), frame_date))
+    return rows
+
+
+def write_rows(rows):
+    """센서 모델별 저장 전 인스턴스 목록을 한 트랜잭션에서 저장하고 rollup/최신 값을 갱신한다.
+
+    bulk_create 는 save() 를 거치지 않으므로 인스턴스의 reg_date 가 채워져 있어야 한다.
+    """
+    # 통합 테이블이면 모든 센서 값이 한 번의 bulk_create 로 들어간다
+    tables = {}
+    for objs in rows.values():
+        tables.setdefault(type(objs[0]), []).extend(objs)
+    with transaction.atomic():
+        for table, objs in tables.items():
+            # PostgreSQL 에서 큰 배치는 COPY 로 저장
+            if not postgres.copy_rows(table, objs):
+                table.objects.bulk_create(objs)
+        for model, objs in rows.items():
+            rollup.apply_readings(SENSOR_NAMES[model], ((obj.reg_date, obj.value) for obj in objs))
+    for model, objs in rows.items():
+        for obj in objs:
+            remember_latest(model, obj)
+    mark_written(list(rows))
+
+
+def ingest_frames(frames):
+    """프레임들을 하나의 트랜잭션에서 bulk_create 로 저장하고 모델별 저장 개수를 반환한다.
+
+    한 요청에 포함된 모든 값은 같은 reg_date 를 공유한다.
+    단, 프레임에 'ts' (unix 초) 가 있으면 그 프레임은 해당 시각으로 저장한다.
+    """
+    rows = build_rows(frames, timezone.now())
+    write_rows(rows)
+    return {model.__name__: len(objs) for model, objs in rows.items()}
+
+
+def save_reading(model, raw_value):
+    """set* 뷰에서 값 하나를 저장한다. rollup 갱신과 같은 트랜잭션에서 처리한다.
+
+    값이 센서 타입에 맞지 않으면 FrameError 를 발생시킨다.
+    write-behind 버퍼가 켜져 있으면 버퍼에 넣고 바로 반환하며 (None),
+    버퍼가 가득 차 있으면 writebehind.BufferFull 을 발생시킨다.
+    """
+    value = coerce_value(model, raw_value)
+    if writebehind.enabled():
+        writebehind.get_buffer().submit(new_reading(model, value, timezone.now()), model)
+        return None
+    with transaction.atomic():
+        obj = new_reading(model, value)
+        obj.save()
+        rollup.apply_readings(SENSOR_NAMES[model], [(obj.reg_date, obj.value)])
+    remember_latest(model, obj)
+    mark_written([model])
+    return obj
@@ -0,0 +1,106 @@
+"""voiceAssistant 용 규칙 기반 명령 인식 (LLM 호출 전에 먼저 시도).
+
+"창문 열어", "블라인드 좀 내려줘", "창문 닫고 블라인드 올려" 처럼 문장 전체가
+[장치] [좀] [명령형 동사] 형태일 때만 처리한다. 실제 장치를 움직이므로,
+부정/과거/상태 설명("창문 안열어", "창문 열었어", "닫혔네")이나 형태가 조금이라도 다른 문장은
+None 을 반환해 LLM 에 맡긴다.
+"""
+import re
+import threading
+
+DEVICE_WORDS = {
+    '창문': 'WINDOW', '창': 'WINDOW', '윈도우': 'WINDOW',
+    '블라인드': 'BLIND', '커튼': 'BLIND',
+}
+# 동사 -> 동작. '...고' 는 다음 장치 명령으로 이어지는 형태 ("창문 닫고 블라인드 올려")
+VERB_WORDS = {
+    '열어': 'OPEN', '오픈': 'OPEN', '열고': 'OPEN',
+    '닫아': 'CLOSE', '클로즈': 'CLOSE', '닫고': 'CLOSE',
+    '올려': 'UP', '걷어': 'UP', '올리고': 'UP', '걷고': 'UP',
+    '내려': 'DOWN', '쳐': 'DOWN', '내리고': 'DOWN', '치고': 'DOWN',
+}
+LINK_VERBS = {'열고', '닫고', '올리고', '걷고', '내리고', '치고'}
+NOUN_VERBS = {'오픈', '클로즈'}
+# (장치, 동작) -> 명령. 블라인드는 열면 올리고 닫으면 내린다. 창문 올려/내려 는 애매하므로 LLM 으로
+COMMANDS = {
+    ('WINDOW', 'OPEN'): 'OPEN',
+    ('WINDOW', 'CLOSE'): 'CLOSE',
+    ('BLIND', 'UP'): 'UP',
+    ('BLIND', 'DOWN'): 'DOWN',
+    ('BLIND', 'OPEN'): 'UP',
+    ('BLIND', 'CLOSE'): 'DOWN',
+}
+REPLIES = {
+    'OPEN': '창문을 열게요.',
+    'CLOSE': '창문을 닫을게요.',
+    'UP': '블라인드를 올릴게요.',
+    'DOWN': '블라인드를 내릴게요.',
+}
+MAX_LENGTH = 40
+
+# 문법에 맞더라도 부정, 과거, 상태 설명, 질문이 섞이면 LLM 으로 넘긴다
+_REJECT = re.compile(r'안|않|못|말|필요\s*없|없|었|았|혔|렸|네$|\?')
+_ADVERB = r'(?:(?:좀|빨리|얼른|지금|다)\s+)*'
+# 장치는 단어 단위로만 맞춘다 ('창고', '창 밖' 은 장치가 아님)
+_CLAUSE = re.compile(
+    r'\s*' + _ADVERB
+    + r'(?P<device>창문|윈도우|블라인드|커튼|창)(?:을|를|도|은|는)?\s*' + _ADVERB
+    + r'(?P<verb>' + '|'.join(sorted(VERB_WORDS, key=len, reverse=True)) + r')'
+    + r'(?P<ending>(?:\s*해)?(?:\s*(?:줘요|줘|줄래|주세요)|요|라)?)'
+)
+_LINK = re.compile(r'\s*,?\s*(?:그리고\s+)?')
+_END = re.compile(r'[\s.!~]*$')
+
+_stats_lock = threading.Lock()
+_stats = {'matched': 0, 'fallback': 0}
+
+
+def match(message):
+    """message 를 [{"device", "command"}, ...] 로 해석한다. 확실하지 않으면 None"""
+    text = message.strip()
+    if not text or len(text) > MAX_LENGTH or _REJECT.search(text):
+        return None
+
+    actions = []
+    pos = 0
+    while True:
+        clause = _CLAUSE.match(text, pos)
+        if clause is None:
+            return None
+        verb, ending = clause.group('verb'), clause.group('ending')
+        # '해' 는 '오픈해줘' 처럼 명사형 동사 뒤에만, 연결형('닫고') 뒤에는 어미가 올 수 없다
+        if '해' in ending and verb not in NOUN_VERBS:
+            return None
+        if verb in LINK_VERBS and ending:
+            return None
+        device = DEVICE_WORDS[clause.group('device')]
+        command = COMMANDS.get((device, VERB_WORDS[verb]))
+        if command is None:
+            return None
+        action = {"device": device, "command": command}
+        if action not in actions:
+            actions.append(action)
+
+        if verb in LINK_VERBS:
+            pos = _LINK.match(text, clause.end()).end()
+            continue
+        if not _END.match(text, clause.end()):
+            return None
+        return actions
+
+
+def reply_for(actions):
+    return ' '.join(REPLIES[action["command"]] for action in actions)
+
+
+def count(matched):
+    with _stats_lock:
+        _stats['matched' if matched else 'fallback'] += 1
+
+
+def metrics():
+    with _stats_lock:
+        stats = dict(_stats)
+    total = stats['matched'] + stats['fallback']
+    stats['hit_rate'] = stats['matched'] / total if total else 0.0
+    return stats
@@ -0,0 +1,214 @@
+"""OpenAI 비동기 호출.
+
+- 이벤트 루프마다 AsyncOpenAI 클라이언트 하나를 재사용한다 (HTTP 연결 유지).
+- 동시에 진행되는 호출 수를 settings.LLM['max_concurrency'] 로 제한하고,
+  자리가 나지 않으면 queue_timeout 초 뒤 LLMBusy 를 발생시킨다.
+- 호출 하나는 timeout 초를 넘기면 LLMTimeout.
+- 응답은 (system prompt, 정규화한 메시지, model) 키로 Django 캐시에 cache_timeout 초 동안 저장한다.
+  LocMemCache 는 MAX_ENTRIES 기준 LRU 로, Redis 는 maxmemory-policy 로 밀려난다.
+- 같은 키의 호출이 진행 중이면 새로 호출하지 않고 그 결과를 함께 기다린다 (워커 단위).
+  요청 하나가 취소되어도 기다리는 요청이 남아 있으면 호출은 계속되고, 마지막 요청까지 떠나면 취소한다.
+
+uvicorn(ASGI) 으로 실행해야 호출을 기다리는 동안 워커가 다른 요청을 처리할 수 있다.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import unicodedata
+import weakref
+
+from django.conf import settings
+from django.core.cache import caches
+from openai import APITimeoutError, AsyncOpenAI
+
+logger = logging.getLogger(__name__)
+
+
+class LLMUnavailable(Exception):
+    pass
+
+
+class LLMBusy(Exception):
+    pass
+
+
+class LLMTimeout(Exception):
+    pass
+
+
+# 이벤트 루프 -> (클라이언트, 세마포어, 진행 중인 호출). runserver 처럼 요청마다 새 루프를 쓰는 경우도 안전하도록 루프별로 둔다
+_state = weakref.WeakKeyDictionary()
+
+_stats_lock = threading.Lock()
+_stats = {'calls': 0, 'cache_hits': 0, 'coalesced': 0, 'not_cached': 0, 'errors': 0}
+
+
+def _config():
+    return settings.LLM
+
+
+def _count(**values):
+    with _stats_lock:
+        for key, value in values.items():
+            _stats[key] += value
+
+
+def available():
+    return bool(os.getenv("OPENAI_API_KEY"))
+
+
+def _loop_state():
+    loop = asyncio.get_running_loop()
+    state = _state.get(loop)
+    if state is None:
+        config = _config()
+        client = AsyncOpenAI(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            base_url=config.get('base_url') or None,
+            timeout=config['timeout'],
+            max_retries=config.get('max_retries', 1),
+        )
+        state = _state[loop] = (client, asyncio.Semaphore(config['max_concurrency']), {})
+    return state
+
+
+def normalize(message):
+    # 전각/반각, 공백, 대소문자, 끝의 마침표 차이는 같은 질문으로 본다 (물음표는 의미가 있으므로 남긴다)
+    text = ' '.join(unicodedata.normalize('NFKC', message).split()).lower()
+    return text.rstrip('.!~ ')
+
+
+def cache_key(system_prompt, message, model):
+    digest = hashlib.sha256('\0'.join([model, system_prompt, normalize(message)]).encode('utf-8'))
+    return 'llm:' + digest.hexdigest()
+
+
+async def _cache_get(key):
+    try:
+        return await caches[_config().get('cache_alias', 'default')].aget(key)
+    except Exception:
+        logger.exception("llm cache unavailable")
+        _count(errors=1)
+        return None
+
+
+async def _cache_set(key, text):
+    try:
+        await caches[_config().get('cache_alias', 'default')].aset(key, text, _config()['cache_timeout'])
+    except Exception:
+        logger.exception("llm cache unavailable")
+        _count(errors=1)
+
+
+def output_text(response):
+    text = getattr(response, "output_text", None)
+    if text:
+        return text
+    # responses.create 가 chunk 를 반환할 때 대비
+    chunks = []
+    for output in getattr(response, "output", []) or []:
+        for content in getattr(output, "content", []) or []:
+            text_value = getattr(content, "text", None)
+            if text_value:
+                chunks.append(text_value)
+    return "".join(chunks)
+
+
+async def _call(client, semaphore, system_prompt, message, model, key, cacheable):
+    config = _config()
+    try:
+        await asyncio.wait_for(semaphore.acquire(), config['queue_timeout'])
+    except asyncio.TimeoutError:
+        raise LLMBusy()
+    try:
+        _count(calls=1)
+        response = await asyncio.wait_for(
+            client.responses.create(
+                model=model,
+                input=[
+                    {"role": "system", "content": [{"type": "input_text", "text": system_prompt}]},
+                    {"role": "user", "content": [{"type": "input_text", "text": message}]},
+                ],
+            ),
+            config['timeout'],
+        )
+    except (asyncio.TimeoutError, APITimeoutError):
+        raise LLMTimeout()
+    finally:
+        semaphore.release()
+
+    text = output_text(response)
+    if key is not None:
+        if text and (cacheable is None or cacheable(text)):
+            await _cache_set(key, text)
+        else:
+            _count(not_cached=1)
+    return text
+
+
+async def _single_flight(inflight, key, factory):
+    """key 의 호출이 진행 중이면 그 결과를 함께 기다리고, 없으면 factory() 로 새로 시작한다.
+
+    inflight[key] 는 [task, 기다리는 요청 수] 이다. 기다리는 요청이 모두 취소되면 호출도 취소해
+    동시 호출 자리와 토큰을 낭비하지 않는다. key 가 None 이면 다른 요청과 공유하지 않는다.
+    """
+    entry = inflight.get(key) if key is not None else None
+    if entry is None:
+        task = asyncio.ensure_future(factory())
+        entry = [task, 0]
+        if key is not None:
+            inflight[key] = entry
+
+        def finished(done):
+            if inflight.get(key) is entry:
+                del inflight[key]
+            # 취소되지 않은 호출의 예외가 로그에 "never retrieved" 로 남지 않게 한다
+            if not done.cancelled():
+                done.exception()
+
+        task.add_done_callback(finished)
+    entry[1] += 1
+    try:
+        # 이 요청이 취소되어도 같은 호출을 기다리는 다른 요청에는 영향을 주지 않는다
+        return await asyncio.shield(entry[0])
+    finally:
+        entry[1] -= 1
+        if entry[1] == 0 and not entry[0].done():
+            entry[0].cancel()
+
+
+async def complete(system_prompt, message, model=None, cacheable=None):
+    """system_prompt 와 사용자 message 로 Responses API 를 호출하고 (응답 텍스트, shared) 를 반환한다.
+
+    shared 는 캐시에서 읽었거나 다른 요청의 호출 결과를 함께 받은 경우 True 이다.
+    cacheable(text) 가 False 를 반환한 응답은 캐시에 저장하지 않는다 (예: 명령을 실행하는 응답).
+    """
+    if not available():
+        raise LLMUnavailable()
+    config = _config()
+    model = model or config['model']
+    key = cache_key(system_prompt, message, model) if config.get('cache_timeout') else None
+    if key is not None:
+        text = await _cache_get(key)
+        if text is not None:
+            _count(cache_hits=1)
+            return text, True
+
+    client, semaphore, inflight = _loop_state()
+    shared = key is not None and key in inflight
+    if shared:
+        _count(coalesced=1)
+    text = await _single_flight(
+        inflight, key, lambda: _call(client, semaphore, system_prompt, message, model, key, cacheable),
+    )
+    return text, shared
+
+
+def metrics():
+    with _stats_lock:
+        stats = dict(_stats)
+    requests = stats['calls'] + stats['cache_hits'] + stats['coalesced']
+    stats['saved_rate'] = (stats['cache_hits'] + stats['coalesced']) / requests if requests else 0.0
+    return stats
@@ -0,0 +1,55 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.http import JsonResponse
+from django.test import RequestFactory
+from django.urls import resolve
+from django.utils import timezone
+
+from sensor.models import TemperatureSensor
+from sensor.queries import latest_rows
+
+
+class Command(BaseCommand):
+    help = "센서 조회 API 요청 지연 시간을 예전 방식(JsonResponse)과 공통 뷰로 비교한다 (데이터는 롤백됨)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000)
+        parser.add_argument('--cnt', default='1,100,1000')
+        parser.add_argument('--repeat', type=int, default=200)
+
+    def handle(self, *args, **options):
+        factory = RequestFactory()
+        repeat = options['repeat']
+
+        with transaction.atomic():
+            start = timezone.now()
+            TemperatureSensor.objects.bulk_create(
+                TemperatureSensor(reg_date=start + timedelta(milliseconds=i), value=float(i % 100))
+                for i in range(options['rows'])
+            )
+            for cnt in (int(c) for c in options['cnt'].split(',')):
+                # 예전 getTemp 뷰: 같은 쿼리 + JsonResponse(list of dicts)
+                legacy_ms = self._measure(lambda: JsonResponse(latest_rows(TemperatureSensor, cnt), safe=False), repeat)
+                line = f"cnt={cnt:>6}  legacy view: {legacy_ms:8.3f} ms"
+                for path in (f'/sensor/getTemp/{cnt}', f'/sensor/Temp/latest/{cnt}'):
+                    line += f"  {path.split('/')[2]}: {self._measure_path(factory, path, repeat):8.3f} ms"
+                self.stdout.write(line)
+            transaction.set_rollback(True)
+
+    def _measure_path(self, factory, path, repeat):
+        # URL 해석 + 뷰 + 직렬화 (미들웨어 제외)
+        def request():
+            match = resolve(path)
+            response = match.func(factory.get(path), *match.args, **match.kwargs)
+            assert response.status_code == 200, response.content
+        return self._measure(request, repeat)
+
+    def _measure(self, fn, repeat):
+        fn()
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        return (time.perf_counter() - t0) * 1000 / repeat
@@ -0,0 +1,87 @@
+import asyncio
+import contextlib
+import statistics
+import time
+from unittest import mock
+
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.db.backends import utils
+
+
+class Command(BaseCommand):
+    help = (
+        "ASGI 워커 하나에서 동기 뷰가 동시에 처리되는지 잰다. 프로젝트의 ASGI 앱을 프로세스 안에서 호출해 "
+        "같은 GET 요청을 --concurrency 개씩 동시에 보내고, 순서대로 보낸 경우와 처리량을 비교한다 "
+        "(조회 경로만 사용하므로 DB 는 바뀌지 않음)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', action='append',
+                            help='요청 경로 (여러 번 지정 가능). 기본: snapshot, Temp/latest/100, Temp/series')
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--query-delay-ms', type=float, default=0,
+                            help='SQL 실행마다 더하는 지연 (원격 DB 왕복 시간 흉내)')
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1 or options['requests'] < 1:
+            raise CommandError('--concurrency 와 --requests 는 1 이상')
+        paths = options['path'] or ['/sensor/snapshot', '/sensor/Temp/latest/100', '/sensor/Temp/series?bucket=1m']
+        app = get_asgi_application()
+        delay = options['query_delay_ms'] / 1000
+        execute = utils.CursorWrapper.execute
+
+        def slow_execute(cursor, *args, **kwargs):
+            time.sleep(delay)
+            return execute(cursor, *args, **kwargs)
+
+        with mock.patch.object(utils.CursorWrapper, 'execute', slow_execute) if delay else contextlib.nullcontext():
+            for path in paths:
+                serial = asyncio.run(self._run(app, path, options['requests'], 1))
+                parallel = asyncio.run(self._run(app, path, options['requests'], options['concurrency']))
+                self.stdout.write(
+                    f"{path:<32} 순차 {serial['rps']:8.1f} req/s | 동시 {options['concurrency']}: "
+                    f"{parallel['rps']:8.1f} req/s (x{parallel['rps'] / serial['rps']:.2f}), "
+                    f"p50 {parallel['p50_ms']:.1f} ms"
+                )
+
+    async def _run(self, app, path, count, concurrency):
+        raw_path, _, query = path.partition('?')
+        latencies = []
+        remaining = iter(range(count))
+
+        async def one():
+            scope = {
+                'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+                'scheme': 'http', 'path': raw_path, 'raw_path': raw_path.encode(), 'root_path': '',
+                'query_string': query.encode(), 'headers': [(b'host', b'localhost')],
+                'client': ('127.0.0.1', 0), 'server': ('localhost', 80),
+            }
+            messages = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+            status = []
+
+            async def receive():
+                if messages:
+                    return messages.pop()
+                await asyncio.Event().wait()
+
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    status.append(message['status'])
+
+            await app(scope, receive, send)
+            if status != [200]:
+                raise CommandError(f"{path} returned {status}")
+
+        async def worker():
+            for _ in remaining:
+                t0 = time.perf_counter()
+                await one()
+                latencies.append((time.perf_counter() - t0) * 1000)
+
+        await one()  # 연결/캐시 준비
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        return {'rps': count / elapsed, 'p50_ms': statistics.median(latencies)}
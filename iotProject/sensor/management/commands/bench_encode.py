@@ -0,0 +1,39 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.http import JsonResponse
+from django.utils import timezone
+
+from sensor.responses import FORMATS, rows_response, orjson
+from sensor.views import ROW_KEYS
+
+
+class Command(BaseCommand):
+    help = "센서 조회 응답 형식별 직렬화 시간과 크기를 비교한다 (DB 사용 안 함)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        start = timezone.now()
+        rows = [
+            {'id': i + 1, 'reg_date': start + timedelta(seconds=i), 'value': 20.0 + (i % 1000) / 100}
+            for i in range(options['rows'])
+        ]
+        self.stdout.write(f"rows={len(rows)} orjson={'yes' if orjson else 'no'}")
+
+        cases = [('JsonResponse (기존)', lambda: JsonResponse(rows, safe=False))]
+        cases += [(fmt, lambda fmt=fmt: rows_response(fmt, rows, ROW_KEYS)) for fmt in FORMATS]
+        for label, fn in cases:
+            size = len(fn().content)
+            ms = self._measure(fn, options['repeat'])
+            self.stdout.write(f"{label:<20} {ms:8.2f} ms  {size:>10} bytes")
+
+    def _measure(self, fn, repeat):
+        fn()
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        return (time.perf_counter() - t0) * 1000 / repeat
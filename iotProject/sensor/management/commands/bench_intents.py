@@ -0,0 +1,87 @@
+import json
+import time
+
+from asgiref.sync import async_to_sync
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import AsyncClient, override_settings
+
+from sensor.intents import match
+
+# (문장, 규칙으로 처리되어야 하는지)
+SAMPLES = [
+    ('창문 열어줘', True),
+    ('창문 좀 열어주세요', True),
+    ('창문 닫아', True),
+    ('블라인드 내려줘', True),
+    ('블라인드 좀 내려줄래', True),
+    ('블라인드 올려', True),
+    ('커튼 쳐줘', True),
+    ('창문 닫고 블라인드 올려줘', True),
+    ('창문 열지 마', False),
+    ('창문 안열어', False),
+    ('창문 열 필요 없어', False),
+    ('창문 열었어', False),
+    ('창문 닫혔네', False),
+    ('창고 열어', False),
+    ('창 밖이 시끄러워 닫아줘', False),
+    ('창문 열어도 돼?', False),
+    ('창문 열려 있어?', False),
+    ('비 오면 창문 닫아줘', False),
+    ('10분 뒤에 창문 닫아줘', False),
+    ('창문 올려줘', False),
+    ('오늘 날씨 어때?', False),
+    ('지금 미세먼지 괜찮아?', False),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "voiceAssistant 규칙 기반 명령 인식의 정확도와 지연 시간을 잰다. "
+        "--requests 를 주면 규칙으로 처리되는 문장으로 뷰 전체 지연 시간도 잰다 "
+        "(트랜잭션 안에서 실행하고 롤백하므로 명령은 DB 에 남지 않고 수집기에도 보이지 않는다)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=10000)
+        parser.add_argument('--requests', type=int, default=0)
+
+    def handle(self, *args, **options):
+        wrong = [text for text, expected in SAMPLES if (match(text) is not None) != expected]
+        for text in wrong:
+            self.stdout.write(f"  잘못 분류: {text} -> {match(text)}")
+        self.stdout.write(f"samples={len(SAMPLES)} wrong={len(wrong)}")
+
+        repeat = options['repeat']
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            for text, _expected in SAMPLES:
+                match(text)
+        us = (time.perf_counter() - t0) * 1e6 / (repeat * len(SAMPLES))
+        self.stdout.write(f"match(): {us:.1f} us/문장")
+
+        if options['requests']:
+            # 테스트 클라이언트의 Host(testserver) 를 허용.
+            # async_to_sync 로 실행하면 뷰의 DB 작업이 이 스레드(이 트랜잭션)에서 실행된다
+            with override_settings(ALLOWED_HOSTS=['*']), transaction.atomic():
+                latencies = async_to_sync(self._requests)(options['requests'])
+                transaction.set_rollback(True)
+            latencies.sort()
+            self.stdout.write(
+                f"voiceAssistant (규칙 처리): p50 {latencies[len(latencies) // 2]:.2f} ms, "
+                f"p99 {latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]:.2f} ms, "
+                f"max {latencies[-1]:.2f} ms"
+            )
+
+    async def _requests(self, count):
+        client = AsyncClient()
+        texts = [text for text, expected in SAMPLES if expected]
+        latencies = []
+        for i in range(count):
+            body = json.dumps({'message': texts[i % len(texts)]}, ensure_ascii=False)
+            t0 = time.perf_counter()
+            response = await client.post('/sensor/voiceAssistant', body, content_type='application/json')
+            latencies.append((time.perf_counter() - t0) * 1000)
+            if response.status_code != 200:
+                raise RuntimeError(f"voiceAssistant returned {response.status_code}")
+        return latencies
@@ -0,0 +1,59 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from sensor.models import TemperatureSensor
+from sensor.queries import latest_rows
+
+
+class Command(BaseCommand):
+    help = "getX/<cnt> 조회 지연 시간을 테이블 크기별로 측정한다 (데이터는 롤백됨)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='10000,100000,1000000,10000000')
+        parser.add_argument('--cnt', type=int, default=1)
+        parser.add_argument('--repeat', type=int, default=50)
+        parser.add_argument('--legacy', action='store_true',
+                            help='기존 list(...)[:cnt] 방식도 함께 측정 (큰 테이블에서는 매우 느림)')
+
+    def handle(self, *args, **options):
+        sizes = sorted(int(s) for s in options['sizes'].split(','))
+        cnt = options['cnt']
+        repeat = options['repeat']
+
+        with transaction.atomic():
+            start = timezone.now()
+            inserted = TemperatureSensor.objects.count()
+            for size in sizes:
+                self._fill(start, inserted, size)
+                inserted = max(inserted, size)
+
+                new_ms = self._measure(lambda: latest_rows(TemperatureSensor, cnt), repeat)
+                line = f"rows={size:>10}  latest_rows: {new_ms:8.3f} ms"
+                if options['legacy']:
+                    legacy_ms = self._measure(
+                        lambda: list(TemperatureSensor.objects.all().order_by('-reg_date').values())[:cnt][::-1],
+                        max(1, repeat // 10),
+                    )
+                    line += f"  legacy: {legacy_ms:10.3f} ms"
+                self.stdout.write(line)
+            transaction.set_rollback(True)
+
+    def _fill(self, start, current, target, batch=50000):
+        while current < target:
+            n = min(batch, target - current)
+            TemperatureSensor.objects.bulk_create(
+                TemperatureSensor(reg_date=start + timedelta(milliseconds=current + i), value=float(i % 100))
+                for i in range(n)
+            )
+            current += n
+
+    def _measure(self, fn, repeat):
+        fn()
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        return (time.perf_counter() - t0) * 1000 / repeat
@@ -0,0 +1,113 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from sensor.models import TemperatureSensor
+
+PROFILES = {
+    # Django 기본 sqlite3 연결과 같은 조건
+    'default': {'pragmas': {}, 'timeout': 5, 'isolation_level': 'DEFERRED'},
+    'tuned': {
+        'pragmas': {**settings.SQLITE_WAL_PRAGMAS, **settings.SQLITE_PRAGMAS},
+        'timeout': settings.DATABASES['default']['OPTIONS'].get('timeout', 5),
+        'isolation_level': settings.DATABASES['default']['OPTIONS'].get('transaction_mode', 'DEFERRED'),
+    },
+}
+
+
+class Command(BaseCommand):
+    help = "DB 파일 복사본에서 동시 쓰기(수집기)/읽기(대시보드) 처리량을 SQLite 프로필별로 측정한다"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--seconds', type=float, default=5)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            self.stdout.write("default DB 가 sqlite 가 아닙니다")
+            return
+        connection.close()
+        table = TemperatureSensor._meta.db_table
+        for name, profile in PROFILES.items():
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, 'bench.sqlite3')
+                shutil.copy(settings.DATABASES['default']['NAME'], path)
+                self._prepare(path)
+                result = self._run(path, table, profile, options)
+            self.stdout.write(
+                f"{name:>7}: writes {result['writes'] / options['seconds']:8.0f}/s  "
+                f"reads {result['reads'] / options['seconds']:8.0f}/s  "
+                f"read p99 {result['p99']:7.2f} ms  locked errors {result['locked']}"
+            )
+
+    def _prepare(self, path):
+        # 복사본이 이미 WAL 이면 기본 프로필 비교를 위해 rollback journal 로 되돌린다
+        conn = sqlite3.connect(path)
+        conn.execute('PRAGMA journal_mode=DELETE')
+        conn.close()
+
+    def _connect(self, path, profile):
+        conn = sqlite3.connect(path, timeout=profile['timeout'], isolation_level=None, check_same_thread=False)
+        for key, value in profile['pragmas'].items():
+            conn.execute(f'PRAGMA {key}={value}')
+        return conn
+
+    def _run(self, path, table, profile, options):
+        stop = time.monotonic() + options['seconds']
+        result = {'writes': 0, 'reads': 0, 'locked': 0}
+        latencies = []
+        lock = threading.Lock()
+
+        def writer():
+            conn = self._connect(path, profile)
+            while time.monotonic() < stop:
+                try:
+                    # 프레임 하나 = 트랜잭션 하나
+                    conn.execute(f"BEGIN {profile['isolation_level']}")
+                    conn.execute(
+                        f'INSERT INTO "{table}" (reg_date, value) VALUES (?, ?)', (timezone.now().strftime('%Y-%m-%d %H:%M:%S.%f'), 21.5)
+                    )
+                    conn.execute('COMMIT')
+                    with lock:
+                        result['writes'] += 1
+                except sqlite3.OperationalError:
+                    if conn.in_transaction:
+                        conn.execute('ROLLBACK')
+                    with lock:
+                        result['locked'] += 1
+            conn.close()
+
+        def reader():
+            conn = self._connect(path, profile)
+            while time.monotonic() < stop:
+                t0 = time.perf_counter()
+                try:
+                    conn.execute(
+                        f'SELECT id, reg_date, value FROM "{table}" ORDER BY reg_date DESC, id DESC LIMIT 1'
+                    ).fetchall()
+                    with lock:
+                        result['reads'] += 1
+                        latencies.append((time.perf_counter() - t0) * 1000)
+                except sqlite3.OperationalError:
+                    with lock:
+                        result['locked'] += 1
+            conn.close()
+
+        threads = [threading.Thread(target=writer) for _ in range(options['writers'])]
+        threads += [threading.Thread(target=reader) for _ in range(options['readers'])]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        latencies.sort()
+        result['p99'] = latencies[int(len(latencies) * 0.99)] if latencies else 0.0
+        return result
@@ -0,0 +1,63 @@
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from sensor.ingest import ingest_frames
+from sensor.queries import SENSOR_MODELS, latest_rows
+from sensor.series import raw_series
+
+
+class Command(BaseCommand):
+    help = "센서별 테이블(legacy) 과 통합 테이블(narrow) 의 저장/조회 처리량을 비교한다 (데이터는 롤백됨)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--frames', type=int, default=2000)
+        parser.add_argument('--reads', type=int, default=200)
+
+    def handle(self, *args, **options):
+        for layout in ('legacy', 'narrow'):
+            with override_settings(SENSOR_STORAGE=layout), transaction.atomic():
+                self._run(layout, options['frames'], options['reads'])
+                transaction.set_rollback(True)
+
+    def _run(self, layout, n_frames, n_reads):
+        start = timezone.now() - timedelta(days=1)
+        frames = [
+            {
+                'ts': (start + timedelta(seconds=i)).timestamp(),
+                'T': random.uniform(-10, 40), 'H': random.uniform(0, 100), 'D': random.uniform(0, 300),
+                'R': random.randint(0, 1), 'L': random.uniform(0, 5000), 'WDIR': random.randint(0, 1),
+                'BDIR': random.randint(0, 1),
+            }
+            for i in range(n_frames)
+        ]
+
+        # 수집기 한 프레임 = setFrame 한 번
+        t0 = time.perf_counter()
+        for frame in frames:
+            ingest_frames([frame])
+        insert_s = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        for _ in range(n_reads):
+            for model in SENSOR_MODELS:
+                latest_rows(model, 1)
+        snapshot_ms = (time.perf_counter() - t0) * 1000 / n_reads
+
+        end = start + timedelta(seconds=n_frames)
+        t0 = time.perf_counter()
+        for _ in range(max(1, n_reads // 20)):
+            for model in SENSOR_MODELS:
+                raw_series(model, start, end)
+        range_ms = (time.perf_counter() - t0) * 1000 / max(1, n_reads // 20)
+
+        self.stdout.write(
+            f"{layout:>6}: insert {n_frames / insert_s:8.0f} frames/s  "
+            f"latest(all sensors) {snapshot_ms:7.3f} ms  "
+            f"range(all sensors, {n_frames} rows each) {range_ms:8.2f} ms"
+        )
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from sensor.models import SensorReading
+from sensor.queries import SENSOR_IDS, resolve_sensors
+
+
+class Command(BaseCommand):
+    help = "센서별 테이블의 값을 통합 테이블 SensorReading 으로 복사한다 (SENSOR_STORAGE = 'narrow' 전환용)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('sensors', nargs='*', help='센서 이름 (기본: 전체)')
+        parser.add_argument('--chunk', type=int, default=5000)
+        parser.add_argument('--reset', action='store_true', help='이미 옮겨진 센서 값을 지우고 다시 복사')
+
+    def handle(self, *args, **options):
+        try:
+            sensors = resolve_sensors(options['sensors'])
+        except LookupError as exc:
+            raise CommandError(f"unknown sensor: {exc}")
+        for name, model in sensors:
+            sensor_id = SENSOR_IDS[model]
+            existing = SensorReading.objects.filter(sensor=sensor_id)
+            if existing.exists():
+                if not options['reset']:
+                    self.stdout.write(f"{name}: already converted (use --reset to copy again)")
+                    continue
+                existing.delete()
+
+            copied, last_id = 0, 0
+            while True:
+                rows = list(
+                    model.objects.filter(id__gt=last_id).order_by('id')
+                    .values_list('id', 'reg_date', 'value')[:options['chunk']]
+                )
+                if not rows:
+                    break
+                with transaction.atomic():
+                    SensorReading.objects.bulk_create(
+                        SensorReading(sensor=sensor_id, reg_date=reg_date, value=float(value))
+                        for _, reg_date, value in rows
+                    )
+                last_id = rows[-1][0]
+                copied += len(rows)
+            self.stdout.write(f"{name}: copied {copied} rows")
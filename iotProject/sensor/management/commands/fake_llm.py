@@ -0,0 +1,79 @@
+import asyncio
+import json
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "OpenAI Responses API 를 흉내 내는 로컬 서버 (부하 테스트용). "
+        "OPENAI_BASE_URL=http://127.0.0.1:8100/v1 OPENAI_API_KEY=fake 로 서버를 실행한다"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--port', type=int, default=8100)
+        parser.add_argument('--delay', type=float, default=2.0, help='응답 지연 시간(초)')
+        parser.add_argument('--jitter', type=float, default=0.5, help='지연 시간에 더할 무작위 값의 최대치(초)')
+
+    def handle(self, *args, **options):
+        self.delay = options['delay']
+        self.jitter = options['jitter']
+        self.stdout.write(f"fake LLM on http://127.0.0.1:{options['port']}/v1 (delay {self.delay}s)")
+        asyncio.run(self._serve(options['port']))
+
+    async def _serve(self, port):
+        server = await asyncio.start_server(self._handle, '127.0.0.1', port)
+        async with server:
+            await server.serve_forever()
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    key, _, value = line.decode('latin-1').partition(':')
+                    headers[key.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get('content-length', 0)))
+                payload = self._respond(json.loads(body or b'{}'))
+                await asyncio.sleep(self.delay + random.random() * self.jitter)
+                data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    + f"Content-Length: {len(data)}\r\n\r\n".encode('latin-1') + data
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def _respond(self, request):
+        # 사용자 메시지에 '열어' 가 있으면 창문 열기 action 을 돌려준다
+        text = json.dumps(request.get('input', ''), ensure_ascii=False)
+        actions = [{"device": "WINDOW", "command": "OPEN"}] if '열어' in text else []
+        reply = json.dumps({"reply": "알겠습니다.", "actions": actions}, ensure_ascii=False)
+        return {
+            "id": f"resp_{time.time_ns()}",
+            "object": "response",
+            "created_at": int(time.time()),
+            "model": request.get('model', 'fake'),
+            "status": "completed",
+            "output": [{
+                "id": f"msg_{time.time_ns()}",
+                "type": "message",
+                "role": "assistant",
+                "status": "completed",
+                "content": [{"type": "output_text", "text": reply, "annotations": []}],
+            }],
+            "parallel_tool_calls": False,
+            "tool_choice": "auto",
+            "tools": [],
+        }
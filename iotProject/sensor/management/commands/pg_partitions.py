@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from sensor import postgres
+from sensor.models import SensorReading
+from sensor.queries import SENSOR_MODELS
+
+
+class Command(BaseCommand):
+    help = "PostgreSQL 센서 값 파티션 테이블에 다가올 달의 파티션을 미리 만든다 (매일 실행)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months', type=int, default=postgres.PARTITION_MONTHS_AHEAD)
+
+    def handle(self, *args, **options):
+        if not postgres.enabled():
+            self.stdout.write("default DB 가 PostgreSQL 이 아니므로 건너뜁니다")
+            return
+        now = timezone.now()
+        for model in SENSOR_MODELS + (SensorReading,):
+            table = model._meta.db_table
+            if not postgres.is_partitioned(table):
+                continue
+            for name in postgres.ensure_future_partitions(table, now, options['months']):
+                self.stdout.write(f"created {name}")
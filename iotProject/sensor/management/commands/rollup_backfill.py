@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from sensor import rollup
+from sensor.queries import resolve_sensors
+
+
+class Command(BaseCommand):
+    help = "원본 센서 행으로부터 rollup (분/시/일 집계) 을 다시 계산한다"
+
+    def add_arguments(self, parser):
+        parser.add_argument('sensors', nargs='*', help='센서 이름 (기본: 전체)')
+
+    def handle(self, *args, **options):
+        try:
+            sensors = resolve_sensors(options['sensors'])
+        except LookupError as exc:
+            raise CommandError(f"unknown sensor: {exc}")
+        for name, model in sensors:
+            created = rollup.rebuild(name, model)
+            self.stdout.write(f"{name}: {created} rollup rows")
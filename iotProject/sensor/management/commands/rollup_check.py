@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from sensor import rollup
+from sensor.queries import resolve_sensors
+
+
+class Command(BaseCommand):
+    help = "rollup 이 원본 센서 행과 일치하는지 검사한다"
+
+    def add_arguments(self, parser):
+        parser.add_argument('sensors', nargs='*', help='센서 이름 (기본: 전체)')
+        parser.add_argument('--fix', action='store_true', help='불일치가 있는 센서는 다시 계산')
+
+    def handle(self, *args, **options):
+        try:
+            sensors = resolve_sensors(options['sensors'])
+        except LookupError as exc:
+            raise CommandError(f"unknown sensor: {exc}")
+        failed = []
+        for name, model in sensors:
+            mismatches = rollup.find_mismatches(name, model)
+            unchecked = rollup.unchecked_buckets(name, model)
+            self.stdout.write(
+                f"{name}: {len(mismatches)} mismatched buckets"
+                + (f", {unchecked} older buckets not checked (raw rows archived)" if unchecked else "")
+            )
+            for resolution, bucket_start, reason in mismatches[:10]:
+                self.stdout.write(f"  {resolution}s {bucket_start.isoformat()} {reason}")
+            if mismatches:
+                if options['fix']:
+                    rollup.rebuild(name, model)
+                    self.stdout.write(f"  rebuilt {name}")
+                else:
+                    failed.append(name)
+        if failed:
+            raise CommandError(f"rollup mismatch: {', '.join(failed)}")
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from sensor import archive
+from sensor.queries import resolve_sensors
+
+
+class Command(BaseCommand):
+    help = "보존 기간이 지난 센서 원본 행을 압축 보관 파일로 옮기고 삭제한다"
+
+    def add_arguments(self, parser):
+        parser.add_argument('sensors', nargs='*', help='센서 이름 (기본: 전체)')
+        parser.add_argument('--chunk', type=int, default=5000, help='한 번에 옮기고 삭제할 행 수')
+
+    def handle(self, *args, **options):
+        try:
+            sensors = resolve_sensors(options['sensors'])
+        except LookupError as exc:
+            raise CommandError(f"unknown sensor: {exc}")
+
+        # PostgreSQL 파티션 테이블은 만료된 월 파티션을 먼저 통째로 정리
+        for table, partitions in archive.drop_expired_partitions().items():
+            for partition in partitions:
+                self.stdout.write(f"{table}: archived and dropped partition {partition}")
+
+        for name, model in sensors:
+            ttl = archive.retention_for(name)
+            if ttl is None:
+                self.stdout.write(f"{name}: retention disabled")
+                continue
+            moved = archive.expire(name, model, chunk=options['chunk'])
+            self.stdout.write(f"{name}: archived {moved} rows older than {ttl.days} days")
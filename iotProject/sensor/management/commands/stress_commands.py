@@ -0,0 +1,88 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from sensor.commands import claim_next_command
+from sensor.models import WindowCommand
+
+
+# 수집기가 실행하지 않는 명령 (dataCollector.ALLOWED_COMMANDS 에 없음)
+STRESS_COMMAND = 'STRESS'
+
+
+class Command(BaseCommand):
+    help = (
+        "여러 poller 가 동시에 getNextCommand 를 호출할 때 각 명령이 정확히 한 번만 전달되는지 검사한다. "
+        "운영 DB 가 아닌 별도 테스트 DB 를 만들어 실행하고 끝나면 삭제한다"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--commands', type=int, default=500)
+        parser.add_argument('--pollers', type=int, default=16)
+
+    def handle(self, *args, **options):
+        # 운영 DB 에 명령을 만들면 실행 중인 수집기가 가져가 창문을 움직이므로 테스트 DB 를 쓴다.
+        # SQLite 는 기본 테스트 DB 가 메모리 DB 라 스레드 동시성을 볼 수 없으므로 임시 파일로 만든다
+        old_name = connection.settings_dict['NAME']
+        test_settings = connection.settings_dict.setdefault('TEST', {})
+        tmpdir = None
+        if connection.vendor == 'sqlite' and not test_settings.get('NAME'):
+            tmpdir = tempfile.mkdtemp()
+            test_settings['NAME'] = os.path.join(tmpdir, 'stress_commands.sqlite3')
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            self._stress(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            if tmpdir:
+                test_settings['NAME'] = None
+                shutil.rmtree(tmpdir, ignore_errors=True)
+
+    def _stress(self, options):
+        created = WindowCommand.objects.bulk_create(
+            WindowCommand(command=STRESS_COMMAND, created_at=timezone.now())
+            for _ in range(options['commands'])
+        )
+        ids = [cmd.id for cmd in created]
+        claimed = []
+        errors = []
+        lock = threading.Lock()
+
+        def poller():
+            try:
+                while True:
+                    cmd = claim_next_command()
+                    if cmd is None:
+                        return
+                    with lock:
+                        claimed.append(cmd.id)
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=poller) for _ in range(options['pollers'])]
+        t0 = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - t0
+
+        duplicates = [cid for cid, n in Counter(claimed).items() if n > 1]
+        missing = set(ids) - set(claimed)
+        self.stdout.write(
+            f"pollers={options['pollers']} commands={len(ids)} claimed={len(claimed)} "
+            f"duplicates={len(duplicates)} missing={len(missing)} errors={len(errors)} "
+            f"rate={len(claimed) / elapsed:.0f}/s"
+        )
+        if duplicates or missing or errors:
+            raise CommandError(f"exactly-once 위반: {errors[:3]}")
+
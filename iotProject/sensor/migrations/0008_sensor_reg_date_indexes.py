@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sensor', '0007_blinddirsensor'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='blinddirsensor',
+            index=models.Index(fields=['reg_date', 'id'], name='bdir_reg_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dirsensor',
+            index=models.Index(fields=['reg_date', 'id'], name='wdir_reg_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dustsensor',
+            index=models.Index(fields=['reg_date', 'id'], name='dust_reg_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='humiditysensor',
+            index=models.Index(fields=['reg_date', 'id'], name='humi_reg_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lightsensor',
+            index=models.Index(fields=['reg_date', 'id'], name='light_reg_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='proximitysensor',
+            index=models.Index(fields=['reg_date', 'id'], name='prox_reg_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rainsensor',
+            index=models.Index(fields=['reg_date', 'id'], name='rain_reg_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='temperaturesensor',
+            index=models.Index(fields=['reg_date', 'id'], name='temp_reg_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vibratorsensor',
+            index=models.Index(fields=['reg_date', 'id'], name='vib_reg_date_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sensor', '0008_sensor_reg_date_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='windowcommand',
+            index=models.Index(fields=['processed', 'created_at'], name='wincmd_pending_idx'),
+        ),
+    ]
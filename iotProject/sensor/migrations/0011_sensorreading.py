@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sensor', '0010_sensorrollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SensorReading',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sensor', models.SmallIntegerField()),
+                ('reg_date', models.DateTimeField(editable=False)),
+                ('value', models.FloatField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['sensor', 'reg_date', 'id', 'value'], name='reading_sensor_ts_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+from django.db import migrations
+from django.utils import timezone
+
+from sensor import postgres
+
+SENSOR_TABLE_MODELS = [
+    'TemperatureSensor',
+    'HumiditySensor',
+    'VibratorSensor',
+    'ProximitySensor',
+    'DustSensor',
+    'LightSensor',
+    'RainSensor',
+    'DirSensor',
+    'BlindDirSensor',
+    'SensorReading',
+]
+
+
+def partition_sensor_tables(apps, schema_editor):
+    # PostgreSQL 에서만 센서 값 테이블을 reg_date 월 단위 파티션 테이블로 바꾼다
+    if not postgres.enabled(schema_editor.connection):
+        return
+    now = timezone.now()
+    for name in SENSOR_TABLE_MODELS:
+        postgres.convert_to_partitioned(schema_editor, apps.get_model('sensor', name), now)
+
+
+class Migration(migrations.Migration):
+
+    # PostgreSQL 의 DDL 은 트랜잭션 안에서 실행되므로, 변환이 중간에 실패하면 모든 테이블이 원래대로 돌아간다
+
+    dependencies = [
+        ('sensor', '0011_sensorreading'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_sensor_tables, migrations.RunPython.noop),
+    ]
@@ -5,6 +5,10 @@ from django.utils import timezone
 class TemperatureSensor(models.Model):
 	reg_date = models.DateTimeField(editable=False)
 	value = models.FloatField()
+
+	class Meta:
+		indexes = [models.Index(fields=['reg_date', 'id'], name='temp_reg_date_idx')]
+
 	def save(self, *args, **kwargs):
 		if not self.id:
 			self.reg_date = timezone.now()
@@ -15,6 +19,9 @@ class HumiditySensor(models.Model):
 	reg_date = models.DateTimeField(editable=False)
 	value = models.FloatField()
 
+	class Meta:
+		indexes = [models.Index(fields=['reg_date', 'id'], name='humi_reg_date_idx')]
+
 	def save(self, *args, **kwargs):
 		if not self.id:
 			self.reg_date = timezone.now()
@@ -25,6 +32,9 @@ class VibratorSensor(models.Model):
 	reg_date = models.DateTimeField(editable=False)
 	value = models.BooleanField()
 
+	class Meta:
+		indexes = [models.Index(fields=['reg_date', 'id'], name='vib_reg_date_idx')]
+
 	def save(self, *args, **kwargs):
 		if not self.id:
 			self.reg_date = timezone.now()
@@ -35,6 +45,9 @@ class ProximitySensor(models.Model):
 	reg_date = models.DateTimeField(editable=False)
 	value = models.FloatField()
 
+	class Meta:
+		indexes = [models.Index(fields=['reg_date', 'id'], name='prox_reg_date_idx')]
+
 	def save(self, *args, **kwargs):
 		if not self.id:
 			self.reg_date = timezone.now()
@@ -45,6 +58,9 @@ class DustSensor(models.Model):
 	reg_date = models.DateTimeField(editable=False)
 	value = models.FloatField()
 
+	class Meta:
+		indexes = [models.Index(fields=['reg_date', 'id'], name='dust_reg_date_idx')]
+
 	def save(self, *args, **kwargs):
 		if not self.id:
 			self.reg_date = timezone.now()
@@ -55,6 +71,9 @@ class LightSensor(models.Model):
 	reg_date = models.DateTimeField(editable=False)
 	value = models.FloatField()
 
+	class Meta:
+		indexes = [models.Index(fields=['reg_date', 'id'], name='light_reg_date_idx')]
+
 	def save(self, *args, **kwargs):
 		if not self.id:
 			self.reg_date = timezone.now()
@@ -65,6 +84,9 @@ class RainSensor(models.Model):
 	reg_date = models.DateTimeField(editable=False)
 	value = models.FloatField()
 
+	class Meta:
+		indexes = [models.Index(fields=['reg_date', 'id'], name='rain_reg_date_idx')]
+
 	def save(self, *args, **kwargs):
 		if not self.id:
 			self.reg_date = timezone.now()
@@ -76,6 +98,9 @@ class WindowCommand(models.Model):
 	processed = models.BooleanField(default=False)
 	created_at = models.DateTimeField(editable=False)
 
+	class Meta:
+		indexes = [models.Index(fields=['processed', 'created_at'], name='wincmd_pending_idx')]
+
 	def save(self, *args, **kwargs):
 		if not self.id:
 			self.created_at = timezone.now()
@@ -86,6 +111,9 @@ class DirSensor(models.Model):
 	reg_date = models.DateTimeField(editable=False)
 	value = models.IntegerField()
 
+	class Meta:
+		indexes = [models.Index(fields=['reg_date', 'id'], name='wdir_reg_date_idx')]
+
 	def save(self, *args, **kwargs):
 		if not self.id:
 			self.reg_date = timezone.now()
@@ -96,9 +124,41 @@ class BlindDirSensor(models.Model):
 	reg_date = models.DateTimeField(editable=False)
 	value = models.IntegerField()
 
+	class Meta:
+		indexes = [models.Index(fields=['reg_date', 'id'], name='bdir_reg_date_idx')]
+
 	def save(self, *args, **kwargs):
 		if not self.id:
 			self.reg_date = timezone.now()
 		return super(BlindDirSensor, self).save(*args, **kwargs)
 
-# Create your models here.
+
+# 센서별 시간 구간 집계 (분/시/일 단위 rollup)
+class SensorRollup(models.Model):
+	sensor = models.CharField(max_length=10)
+	resolution = models.IntegerField()  # 구간 길이(초): 60, 3600, 86400
+	bucket_start = models.DateTimeField()
+	min = models.FloatField()
+	max = models.FloatField()
+	sum = models.FloatField()
+	count = models.IntegerField()
+
+	class Meta:
+		constraints = [
+			models.UniqueConstraint(fields=['sensor', 'resolution', 'bucket_start'], name='rollup_bucket_uniq'),
+		]
+
+# 통합 센서 값 테이블 (SENSOR_STORAGE = 'narrow' 일 때 사용)
+# 센서별 테이블 대신 (sensor, reg_date, value) 한 행씩 저장한다.
+class SensorReading(models.Model):
+	sensor = models.SmallIntegerField()
+	reg_date = models.DateTimeField(editable=False)
+	value = models.FloatField()
+
+	class Meta:
+		indexes = [models.Index(fields=['sensor', 'reg_date', 'id', 'value'], name='reading_sensor_ts_idx')]
+
+	def save(self, *args, **kwargs):
+		if not self.id and not self.reg_date:
+			self.reg_date = timezone.now()
+		return super(SensorReading, self).save(*args, **kwargs)
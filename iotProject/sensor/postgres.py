@@ -0,0 +1,228 @@
+"""PostgreSQL 전용 시계열 저장 기능.
+
+- 센서 값 테이블을 reg_date 기준 월 단위 선언적 파티션 테이블로 변환 (+ reg_date BRIN 인덱스)
+- 다가올 달의 파티션 미리 생성
+- 보존 기간이 지난 파티션은 보관 파일로 옮긴 뒤 통째로 DROP (행 단위 DELETE 없음)
+- 큰 배치는 COPY 로 저장
+
+SQLite 등 다른 DB 에서는 모든 함수가 아무 것도 하지 않는다.
+"""
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import connection, transaction
+
+PARTITION_MONTHS_AHEAD = 2
+COPY_MIN_ROWS = 500
+
+
+def enabled(conn=None):
+    return (conn or connection).vendor == 'postgresql'
+
+
+def _month_start(dt):
+    return datetime(dt.year, dt.month, 1, tzinfo=dt_timezone.utc)
+
+
+def _add_months(dt, months):
+    index = dt.year * 12 + dt.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=dt_timezone.utc)
+
+
+def partition_name(table, month):
+    return f"{table}_p{month:%Y%m}"
+
+
+def is_partitioned(table, conn=None):
+    with (conn or connection).cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = %s",
+            [table],
+        )
+        return cursor.fetchone() is not None
+
+
+def partitions(table, conn=None):
+    """table 의 월 파티션 목록 [(월 시작, 파티션 이름)] (default 파티션 제외)"""
+    with (conn or connection).cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = %s",
+            [table],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    prefix = f"{table}_p"
+    result = []
+    for name in names:
+        suffix = name[len(prefix):]
+        if name.startswith(prefix) and len(suffix) == 6 and suffix.isdigit():
+            result.append((datetime(int(suffix[:4]), int(suffix[4:]), 1, tzinfo=dt_timezone.utc), name))
+    return sorted(result)
+
+
+def ensure_partitions(table, start, end, conn=None):
+    """[start, end) 를 덮는 월 파티션을 만든다. 이미 있는 파티션은 건너뛴다.
+
+    DEFAULT 파티션에 그 달의 행이 있으면 PARTITION OF 로 만들 수 없으므로, 빈 테이블을 만들어
+    DEFAULT 의 행을 옮긴 뒤 ATTACH 한다 (한 트랜잭션).
+    """
+    conn = conn or connection
+    quote = conn.ops.quote_name
+    existing = {month for month, _ in partitions(table, conn)}
+    default = _default_partition(table, conn)
+    month = _month_start(start)
+    created = []
+    while month < end:
+        if month not in existing:
+            name = partition_name(table, month)
+            bounds = [month, _add_months(month, 1)]
+            with transaction.atomic(using=conn.alias), conn.cursor() as cursor:
+                if default is None:
+                    cursor.execute(
+                        f"CREATE TABLE {quote(name)} PARTITION OF {quote(table)} FOR VALUES FROM (%s) TO (%s)",
+                        bounds,
+                    )
+                else:
+                    cursor.execute(f"CREATE TABLE {quote(name)} (LIKE {quote(table)} INCLUDING DEFAULTS)")
+                    cursor.execute(
+                        f"WITH moved AS (DELETE FROM {quote(default)} WHERE reg_date >= %s AND reg_date < %s "
+                        f"RETURNING *) INSERT INTO {quote(name)} SELECT * FROM moved",
+                        bounds,
+                    )
+                    cursor.execute(
+                        f"ALTER TABLE {quote(table)} ATTACH PARTITION {quote(name)} FOR VALUES FROM (%s) TO (%s)",
+                        bounds,
+                    )
+            created.append(name)
+        month = _add_months(month, 1)
+    return created
+
+
+def _default_partition(table, conn):
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_partitioned_table pt JOIN pg_class p ON p.oid = pt.partrelid "
+            "JOIN pg_class c ON c.oid = pt.partdefid WHERE p.relname = %s",
+            [table],
+        )
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def ensure_future_partitions(table, now, months=PARTITION_MONTHS_AHEAD, conn=None):
+    return ensure_partitions(table, _month_start(now), _add_months(_month_start(now), months + 1), conn)
+
+
+def convert_to_partitioned(schema_editor, model, now):
+    """일반 테이블을 reg_date 범위 파티션 테이블로 바꾸고 기존 행을 옮긴다 (마이그레이션용).
+
+    PostgreSQL 의 파티션 테이블은 기본 키에 파티션 키가 포함되어야 하므로 DB 의 기본 키는
+    (id, reg_date) 가 된다. Django 는 계속 id 로 행을 찾는다.
+    """
+    conn = schema_editor.connection
+    quote = schema_editor.quote_name
+    table = model._meta.db_table
+    if is_partitioned(table, conn):
+        return
+    old = f"{table}_unpartitioned"
+    # Django 가 만든 identity 시퀀스({table}_id_seq)는 이전 테이블과 함께 삭제되므로 새 이름을 쓴다
+    seq = f"{table}_pid_seq"
+    columns = ', '.join(quote(f.column) for f in model._meta.local_concrete_fields)
+
+    with conn.cursor() as cursor:
+        cursor.execute(f"SELECT MIN(reg_date), MAX(id) FROM {quote(table)}")
+        first, max_id = cursor.fetchone()
+
+    schema_editor.execute(f"ALTER TABLE {quote(table)} RENAME TO {quote(old)}")
+    schema_editor.execute(f"CREATE SEQUENCE IF NOT EXISTS {quote(seq)}")
+    schema_editor.execute(
+        f"CREATE TABLE {quote(table)} (LIKE {quote(old)} INCLUDING DEFAULTS) PARTITION BY RANGE (reg_date)"
+    )
+    schema_editor.execute(f"ALTER TABLE {quote(table)} ALTER COLUMN id SET DEFAULT nextval('{seq}')")
+    schema_editor.execute(f"ALTER SEQUENCE {quote(seq)} OWNED BY {quote(table)}.id")
+    schema_editor.execute(f"CREATE TABLE {quote(table + '_default')} PARTITION OF {quote(table)} DEFAULT")
+    ensure_partitions(table, first or now, _add_months(_month_start(now), PARTITION_MONTHS_AHEAD + 1), conn)
+    schema_editor.execute(f"INSERT INTO {quote(table)} ({columns}) SELECT {columns} FROM {quote(old)}")
+    if max_id:
+        schema_editor.execute(f"SELECT setval('{seq}', %s)", [max_id])
+    # 이전 테이블의 기본 키/인덱스 이름과 겹치지 않도록 삭제한 뒤에 만든다
+    schema_editor.execute(f"DROP TABLE {quote(old)}")
+    schema_editor.execute(f"ALTER TABLE {quote(table)} ADD PRIMARY KEY (id, reg_date)")
+
+    # 파티션 테이블 전체에 걸친 인덱스로 다시 만든다
+    for index in model._meta.indexes:
+        schema_editor.add_index(model, index)
+    schema_editor.execute(
+        f"CREATE INDEX {quote(table + '_reg_date_brin')} ON {quote(table)} USING brin (reg_date)"
+    )
+
+
+def drop_expired_partitions(table, cutoff, archive_rows):
+    """월 전체가 cutoff 이전인 파티션을 archive_rows(rows) 로 보관한 뒤 DROP 한다.
+
+    rows 는 파티션의 (id, reg_date, value[, sensor]) 목록을 (reg_date, id) 순서로 chunk 단위로 넘긴다.
+    행 수와 관계없이 삭제 비용이 일정하다.
+    """
+    quote = connection.ops.quote_name
+    dropped = []
+    for month, name in partitions(table):
+        if _add_months(month, 1) > cutoff:
+            break
+        archive_partition(name, archive_rows)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"ALTER TABLE {quote(table)} DETACH PARTITION {quote(name)}")
+            cursor.execute(f"DROP TABLE {quote(name)}")
+        dropped.append(name)
+    return dropped
+
+
+def archive_partition(name, archive_rows, chunk=50000):
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT column_name FROM information_schema.columns WHERE table_name = %s AND column_name = 'sensor'",
+            [name],
+        )
+        columns = "id, reg_date, value, sensor" if cursor.fetchone() else "id, reg_date, value"
+    # 보관 파일 이름은 첫/마지막 행의 시각으로 정하므로 reg_date 순서로 읽는다 (archive.expire 와 같음)
+    last = None
+    while True:
+        with connection.cursor() as cursor:
+            if last is None:
+                cursor.execute(f"SELECT {columns} FROM {quote(name)} ORDER BY reg_date, id LIMIT %s", [chunk])
+            else:
+                cursor.execute(
+                    f"SELECT {columns} FROM {quote(name)} WHERE (reg_date, id) > (%s, %s) "
+                    f"ORDER BY reg_date, id LIMIT %s",
+                    [last[1], last[0], chunk],
+                )
+            rows = cursor.fetchall()
+        if not rows:
+            return
+        archive_rows(rows)
+        last = rows[-1]
+
+
+def copy_rows(table_model, objs):
+    """objs 를 COPY 로 저장한다. 사용할 수 없으면 False 를 반환한다 (호출 측에서 bulk_create).
+
+    COPY 는 생성된 id 를 돌려주지 않으므로 큰 배치(수집기 재전송 등)에만 사용한다.
+    """
+    if not enabled() or len(objs) < COPY_MIN_ROWS:
+        return False
+    fields = [f for f in table_model._meta.local_concrete_fields if not f.primary_key]
+    quote = connection.ops.quote_name
+    sql = (
+        f"COPY {quote(table_model._meta.db_table)} "
+        f"({', '.join(quote(f.column) for f in fields)}) FROM STDIN"
+    )
+    connection.ensure_connection()
+    with connection.cursor() as cursor:
+        raw = cursor.cursor
+        if not hasattr(raw, 'copy'):
+            # psycopg2 에서는 사용하지 않음
+            return False
+        with raw.copy(sql) as copy:
+            for obj in objs:
+                copy.write_row([getattr(obj, f.attname) for f in fields])
+    return True
@@ -0,0 +1,172 @@
+from django.conf import settings
+
+from .models import (
+    TemperatureSensor,
+    HumiditySensor,
+    VibratorSensor,
+    ProximitySensor,
+    DustSensor,
+    LightSensor,
+    RainSensor,
+    DirSensor,
+    BlindDirSensor,
+    SensorReading,
+)
+from .stream import broadcaster
+from . import caching
+
+# URL 에서 사용하는 센서 이름 -> 모델 (reg_date 인덱스를 가진 모든 센서 테이블)
+SENSORS = {
+    'Temp': TemperatureSensor,
+    'Humi': HumiditySensor,
+    'Vib': VibratorSensor,
+    'Prox': ProximitySensor,
+    'Dust': DustSensor,
+    'Light': LightSensor,
+    'Rain': RainSensor,
+    'WDir': DirSensor,
+    'BDir': BlindDirSensor,
+}
+SENSOR_MODELS = tuple(SENSORS.values())
+SENSOR_NAMES = {model: name for name, model in SENSORS.items()}
+# 예전 URL(getDir/setDir)에서 쓰던 이름
+SENSOR_ALIASES = {
+    'Dir': DirSensor,
+}
+_SENSORS_LOWER = {name.lower(): model for name, model in {**SENSORS, **SENSOR_ALIASES}.items()}
+
+# SensorReading.sensor 에 저장되는 센서 번호 (DB 에 기록되므로 바꾸지 말 것)
+SENSOR_IDS = {
+    TemperatureSensor: 1,
+    HumiditySensor: 2,
+    VibratorSensor: 3,
+    ProximitySensor: 4,
+    DustSensor: 5,
+    LightSensor: 6,
+    RainSensor: 7,
+    DirSensor: 8,
+    BlindDirSensor: 9,
+}
+
+# 프로세스 내 최신 값 캐시: 모델 -> {'id', 'reg_date', 'value'}
+# 캐시한 시점의 센서 버전(caching.version)을 함께 기억하고, 버전이 바뀌었을 때만 DB 를 다시 조회한다.
+# 공유 캐시 백엔드를 쓰면 다른 워커에서 저장된 값도 반영된다.
+_latest = {}
+_latest_versions = {}
+
+
+def resolve_sensor(name):
+    """URL 의 센서 이름(대소문자 무시)을 모델로 변환. 없으면 None"""
+    return _SENSORS_LOWER.get(name.lower())
+
+
+def resolve_sensors(names):
+    """관리 명령 인자의 센서 이름 목록을 [(이름, 모델)] 로 변환한다 (비어 있으면 전체 센서).
+
+    'temp', 'Dir' 처럼 입력한 이름 대신 SENSOR_NAMES 의 이름을 돌려주므로, rollup/보관 파일/캐시 키가
+    조회 경로와 같은 이름을 쓴다. 알 수 없는 이름이 있으면 아무 것도 처리하기 전에 LookupError 를 발생시킨다.
+    """
+    resolved = []
+    for name in names or list(SENSORS):
+        model = resolve_sensor(name)
+        if model is None:
+            raise LookupError(name)
+        resolved.append((SENSOR_NAMES[model], model))
+    return resolved
+
+
+def narrow_storage():
+    return getattr(settings, 'SENSOR_STORAGE', 'legacy') == 'narrow'
+
+
+def readings(model):
+    """센서 값 행의 QuerySet (id, reg_date, value).
+
+    SENSOR_STORAGE 가 'narrow' 이면 통합 테이블 SensorReading 에서,
+    아니면 센서별 테이블에서 읽는다. 조회 코드는 항상 이 함수를 거친다.
+    """
+    if narrow_storage():
+        return SensorReading.objects.filter(sensor=SENSOR_IDS[model])
+    return model.objects.all()
+
+
+def new_reading(model, value, reg_date=None):
+    """저장 전 센서 값 인스턴스 (SENSOR_STORAGE 에 맞는 테이블)"""
+    if narrow_storage():
+        return SensorReading(sensor=SENSOR_IDS[model], reg_date=reg_date, value=float(value))
+    return model(reg_date=reg_date, value=value)
+
+
+def latest_rows(model, cnt):
+    """최신 cnt 개의 행을 오래된 순서로 반환한다.
+
+    슬라이스를 QuerySet 에 적용해 LIMIT 쿼리로 내려보내고,
+    (reg_date, id) 인덱스를 역방향으로 읽어 테이블 크기와 무관하게 동작한다.
+    """
+    if cnt <= 0:
+        return []
+    rows = list(readings(model).order_by('-reg_date', '-id').values('id', 'reg_date', 'value')[:cnt])
+    rows.reverse()
+    if narrow_storage():
+        # 통합 테이블은 float 로 저장하므로 센서 원래 타입으로 되돌린다
+        field = model._meta.get_field('value')
+        for row in rows:
+            row['value'] = field.to_python(row['value'])
+    return rows
+
+
+def remember_latest(model, obj):
+    """저장된 인스턴스를 최신 값 캐시에 반영한다. 더 오래된 값으로 덮어쓰지 않는다."""
+    # set* 뷰는 POST 문자열을 그대로 저장하므로 필드 타입으로 변환해 둔다
+    value = model._meta.get_field('value').to_python(obj.value)
+    row = {'id': obj.id, 'reg_date': obj.reg_date, 'value': value}
+    current = _latest.get(model)
+    if current is None or (row['reg_date'], row['id'] or 0) >= (current['reg_date'], current['id'] or 0):
+        _latest[model] = row
+    broadcaster.publish('reading', {'sensor': SENSOR_NAMES[model], 'row': row})
+    return obj
+
+
+def mark_written(models):
+    """models 의 행이 저장되었음을 알린다 (센서 버전 증가 -> 조회 결과 캐시와 ETag 무효화).
+
+    그 사이 다른 워커의 쓰기가 없었으면 remember_latest 로 갱신한 최신 값 캐시를 그대로 쓴다.
+    """
+    bumped = caching.bump([SENSOR_NAMES[model] for model in models])
+    for model in models:
+        version = bumped[SENSOR_NAMES[model]]
+        seen = _latest_versions.get(model)
+        if version is not None and seen is not None and seen + 1 == version:
+            _latest_versions[model] = version
+
+
+def data_version(model=None):
+    """model(None 이면 전체 센서)의 데이터 버전 문자열. 행이 저장될 때마다 바뀐다.
+
+    캐시 백엔드를 사용할 수 없으면 None (ETag 를 붙이지 않음)
+    """
+    names = list(SENSORS) if model is None else [SENSOR_NAMES[model]]
+    found = caching.versions(names)
+    if None in found.values():
+        return None
+    return '.'.join(str(found[name]) for name in names)
+
+
+def _checked_latest(model, version):
+    # 버전 확인 후 조회하므로, 조회 중에 들어온 쓰기는 다음 호출에서 다시 반영된다
+    if model not in _latest or version is None or _latest_versions.get(model) != version:
+        rows = latest_rows(model, 1)
+        # 행이 없는 테이블도 None 으로 기억해 매번 조회하지 않는다
+        _latest[model] = rows[0] if rows else None
+        _latest_versions[model] = version
+    return _latest[model]
+
+
+def latest_row(model):
+    return _checked_latest(model, caching.version(SENSOR_NAMES[model]))
+
+
+def snapshot():
+    """모든 센서의 최신 값 한 개씩 (값이 없으면 None)"""
+    found = caching.versions(list(SENSORS))
+    return {name: _checked_latest(model, found[name]) for name, model in SENSORS.items()}
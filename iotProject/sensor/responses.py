@@ -0,0 +1,92 @@
+"""센서 조회 응답 직렬화.
+
+orjson 이 설치되어 있으면 사용하고, 없으면 표준 json 으로 대체한다.
+
+조회 뷰는 ?format= 으로 응답 형식을 고를 수 있다.
+- json (기본): 행 목록 [{"id": .., "reg_date": "ISO 8601", "value": ..}, ...]
+- columns: 열 단위 JSON {"id": [..], "reg_date": [epoch ms, ..], "value": [..]}
+- f8: 열 단위 little-endian float64 배열을 이어 붙인 바이너리.
+  열 순서는 X-Columns 헤더, 행 수는 X-Rows 헤더에 있다. 시각은 epoch ms, bool 은 0/1, 값이 없으면 NaN.
+"""
+import json
+import sys
+from array import array
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse, JsonResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+FORMATS = ('json', 'columns', 'f8')
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+ONE_MS = timedelta(milliseconds=1)
+
+
+class FormatError(ValueError):
+    pass
+
+
+def response_format(request):
+    fmt = request.GET.get('format', 'json')
+    if fmt not in FORMATS:
+        raise FormatError(fmt)
+    return fmt
+
+
+def dumps(data):
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, cls=DjangoJSONEncoder, separators=(',', ':')).encode('utf-8')
+
+
+def json_response(data, status=200):
+    """data(dict/list) 를 JSON 응답으로 만든다. datetime 은 ISO 8601 (UTC 는 'Z') 로 직렬화된다."""
+    if orjson is None:
+        return JsonResponse(data, status=status, safe=False)
+    return HttpResponse(dumps(data), status=status, content_type='application/json')
+
+
+def to_columns(rows, keys):
+    """dict 행 목록을 {key: [..]} 로 바꾼다. datetime 은 epoch ms 로 변환한다."""
+    columns = {}
+    for key in keys:
+        column = [row[key] for row in rows]
+        if column and isinstance(column[0], datetime):
+            column = [(v - EPOCH) // ONE_MS for v in column]
+        columns[key] = column
+    return columns
+
+
+def _f8_body(columns):
+    data = array('d')
+    for column in columns.values():
+        try:
+            data.extend(array('d', column))
+        except TypeError:
+            # None 이 섞인 열
+            data.extend(float('nan') if v is None else v for v in column)
+    if sys.byteorder != 'little':
+        data.byteswap()
+    return data.tobytes()
+
+
+def rows_response(fmt, rows, keys, meta=None, key='rows'):
+    """rows(dict 목록)를 fmt 형식으로 응답한다.
+
+    meta 가 있으면 JSON 형식에서는 {**meta, key: rows} 로 감싸고,
+    f8 형식에서는 X-Meta 헤더(JSON)로 보낸다.
+    """
+    if fmt == 'f8':
+        columns = to_columns(rows, keys)
+        response = HttpResponse(_f8_body(columns), content_type='application/octet-stream')
+        response['X-Columns'] = ','.join(keys)
+        response['X-Rows'] = str(len(rows))
+        if meta is not None:
+            response['X-Meta'] = dumps(meta).decode('utf-8')
+        return response
+    body = to_columns(rows, keys) if fmt == 'columns' else rows
+    return json_response(body if meta is None else {**meta, key: body})
@@ -0,0 +1,176 @@
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import IntegrityError, transaction
+from django.db.models import Max, Min
+from django.db.models import F, Value
+from django.db.models.functions import Greatest, Least
+
+from .models import SensorRollup
+from .queries import readings
+from .series import bucket_series_with_archive
+
+# 분, 시, 일 단위 집계
+RESOLUTIONS = (60, 3600, 86400)
+
+
+def _floor(reg_date, resolution):
+    epoch = int(reg_date.timestamp()) // resolution * resolution
+    return datetime.fromtimestamp(epoch, tz=dt_timezone.utc)
+
+
+def apply_readings(sensor, readings):
+    """새로 저장된 (reg_date, value) 목록을 sensor 의 rollup 에 누적한다.
+
+    같은 구간의 값은 먼저 메모리에서 합친 뒤 구간당 UPDATE 한 번으로 반영하므로
+    프레임 배치는 구간 수만큼만 쿼리한다. 저장과 같은 트랜잭션 안에서 호출해야 한다.
+    """
+    acc = {}
+    for reg_date, value in readings:
+        value = float(value)
+        for resolution in RESOLUTIONS:
+            key = (resolution, _floor(reg_date, resolution))
+            agg = acc.get(key)
+            if agg is None:
+                acc[key] = [value, value, value, 1]
+            else:
+                agg[0] = min(agg[0], value)
+                agg[1] = max(agg[1], value)
+                agg[2] += value
+                agg[3] += 1
+    for (resolution, bucket_start), agg in acc.items():
+        _upsert(sensor, resolution, bucket_start, *agg)
+
+
+def _upsert(sensor, resolution, bucket_start, min_value, max_value, total, count):
+    qs = SensorRollup.objects.filter(sensor=sensor, resolution=resolution, bucket_start=bucket_start)
+    changes = dict(
+        min=Least(F('min'), Value(min_value)),
+        max=Greatest(F('max'), Value(max_value)),
+        sum=F('sum') + total,
+        count=F('count') + count,
+    )
+    if qs.update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            SensorRollup.objects.create(
+                sensor=sensor, resolution=resolution, bucket_start=bucket_start,
+                min=min_value, max=max_value, sum=total, count=count,
+            )
+    except IntegrityError:
+        # 다른 요청이 먼저 구간을 만든 경우
+        qs.update(**changes)
+
+
+def rollup_resolution(start, end, bucket):
+    """[start, end) 를 bucket 초 단위로 집계할 때 사용할 수 있는 가장 큰 rollup 해상도. 없으면 None"""
+    for resolution in reversed(RESOLUTIONS):
+        if (bucket % resolution == 0
+                and start.timestamp() % resolution == 0
+                and end.timestamp() % resolution == 0):
+            return resolution
+    return None
+
+
+def rollup_series(sensor, start, end, bucket, resolution):
+    """rollup 행을 bucket 단위로 다시 묶어 series 결과와 같은 형식으로 반환한다."""
+    rows = (
+        SensorRollup.objects
+        .filter(sensor=sensor, resolution=resolution, bucket_start__gte=start, bucket_start__lt=end)
+        .order_by('bucket_start')
+        .values_list('bucket_start', 'min', 'max', 'sum', 'count')
+    )
+    buckets = {}
+    for bucket_start, min_value, max_value, total, count in rows:
+        key = _floor(bucket_start, bucket)
+        agg = buckets.get(key)
+        if agg is None:
+            buckets[key] = [min_value, max_value, total, count]
+        else:
+            agg[0] = min(agg[0], min_value)
+            agg[1] = max(agg[1], max_value)
+            agg[2] += total
+            agg[3] += count
+    return [
+        {'t': t, 'min': mn, 'max': mx, 'avg': total / count, 'count': count, 'sum': total}
+        for t, (mn, mx, total, count) in buckets.items()
+    ]
+
+
+def raw_range(model, resolution):
+    """원본 행이 있는 구간을 resolution 경계에 맞춰 반환 (첫 구간 포함, 없으면 None)"""
+    bounds = readings(model).aggregate(first=Min('reg_date'), last=Max('reg_date'))
+    if bounds['first'] is None:
+        return None
+    start = _floor(bounds['first'], resolution)
+    end = datetime.fromtimestamp(_floor(bounds['last'], resolution).timestamp() + resolution, tz=dt_timezone.utc)
+    return start, end
+
+
+def rebuild(sensor, model):
+    """sensor 의 rollup 을 원본 행으로부터 다시 계산한다 (backfill).
+
+    원본 행이 남아 있는 구간만 다시 계산한다. 그보다 오래된 구간은 원본이 보관 파일로 옮겨졌으므로
+    rollup 을 그대로 두고, 가장 오래된 원본 행이 속한 첫 구간은 보관 파일의 값을 합쳐 계산한다.
+    """
+    created = 0
+    with transaction.atomic():
+        for resolution in RESOLUTIONS:
+            bounds = raw_range(model, resolution)
+            if bounds is None:
+                continue
+            SensorRollup.objects.filter(sensor=sensor, resolution=resolution, bucket_start__gte=bounds[0]).delete()
+            objs = [
+                SensorRollup(
+                    sensor=sensor, resolution=resolution, bucket_start=row['t'],
+                    min=row['min'], max=row['max'], sum=row['sum'], count=row['count'],
+                )
+                for row in bucket_series_with_archive(model, sensor, bounds[0], bounds[1], resolution)
+            ]
+            SensorRollup.objects.bulk_create(objs, batch_size=1000)
+            created += len(objs)
+    return created
+
+
+def unchecked_buckets(sensor, model):
+    """원본 행이 없어(보관 파일로 옮겨져) 검사할 수 없는 rollup 구간 수"""
+    unchecked = 0
+    for resolution in RESOLUTIONS:
+        rollups = SensorRollup.objects.filter(sensor=sensor, resolution=resolution)
+        bounds = raw_range(model, resolution)
+        if bounds is not None:
+            rollups = rollups.filter(bucket_start__lt=bounds[0])
+        unchecked += rollups.count()
+    return unchecked
+
+
+def find_mismatches(sensor, model, start=None, end=None, tolerance=1e-6):
+    """원본 행으로 계산한 집계와 rollup 이 다른 구간 목록 [(resolution, bucket_start, 원인)]
+
+    가장 오래된 원본 행보다 앞선 구간은 비교할 원본이 없으므로 검사하지 않는다 (unchecked_buckets).
+    """
+    mismatches = []
+    for resolution in RESOLUTIONS:
+        bounds = raw_range(model, resolution)
+        if bounds is None:
+            continue
+        lo = max(bounds[0], _floor(start, resolution)) if start else bounds[0]
+        hi = min(bounds[1], end) if end else bounds[1]
+        if lo >= hi:
+            continue
+        expected = {row['t']: row for row in bucket_series_with_archive(model, sensor, lo, hi, resolution)}
+        actual = {
+            row['bucket_start']: row
+            for row in SensorRollup.objects.filter(
+                sensor=sensor, resolution=resolution, bucket_start__gte=lo, bucket_start__lt=hi,
+            ).values('bucket_start', 'min', 'max', 'sum', 'count')
+        }
+        for t in expected.keys() | actual.keys():
+            exp, act = expected.get(t), actual.get(t)
+            if exp is None or act is None:
+                mismatches.append((resolution, t, 'missing rollup' if act is None else 'extra rollup'))
+            elif exp['count'] != act['count'] or any(
+                abs(exp[k] - act[k]) > tolerance * max(1.0, abs(exp[k])) for k in ('min', 'max', 'sum')
+            ):
+                mismatches.append((resolution, t, 'value differs'))
+    return sorted(mismatches)
@@ -0,0 +1,180 @@
+import math
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db import connection
+from django.db.models import Avg, Count, FloatField, Max, Min, Sum
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast
+
+from . import archive
+from .queries import readings
+
+MAX_BUCKETS = 10000
+MAX_POINTS = 5000
+# points= 요청에서 원본 행이 points 의 이 배수보다 많으면 SQL 로 먼저 구간별 min/max 만 가져온다
+PREBUCKET_RATIO = 4
+
+
+def _bucket_sql():
+    # reg_date 를 bucket 초 단위로 내림한 unix 초 (%% 는 SQL 의 리터럴 %)
+    if connection.vendor == 'sqlite':
+        return "(CAST(strftime('%%s', reg_date) AS INTEGER) / %s) * %s"
+    if connection.vendor == 'postgresql':
+        return "(FLOOR(EXTRACT(EPOCH FROM reg_date) / %s) * %s)::bigint"
+    if connection.vendor == 'mysql':
+        return "(FLOOR(UNIX_TIMESTAMP(reg_date) / %s) * %s)"
+    raise NotImplementedError(f"series aggregation is not supported on {connection.vendor}")
+
+
+def _from_epoch(seconds):
+    return datetime.fromtimestamp(seconds, tz=dt_timezone.utc)
+
+
+def bucket_series(model, start, end, bucket):
+    """[start, end) 구간을 bucket 초 단위로 나눠 min/max/avg/count 를 SQL 로 계산한다."""
+    value = Cast('value', FloatField())
+    rows = (
+        readings(model)
+        .filter(reg_date__gte=start, reg_date__lt=end)
+        .annotate(bucket=RawSQL(_bucket_sql(), (bucket, bucket)))
+        .values('bucket')
+        .annotate(min=Min(value), max=Max(value), avg=Avg(value), count=Count('id'), sum=Sum(value))
+        .order_by('bucket')
+    )
+    return [
+        {
+            't': _from_epoch(int(row['bucket'])),
+            'min': row['min'],
+            'max': row['max'],
+            'avg': row['avg'],
+            'count': row['count'],
+            'sum': row['sum'],
+        }
+        for row in rows
+    ]
+
+
+def raw_series(model, start, end):
+    """구간의 (reg_date, value) 를 시간 순으로 반환 (모델 인스턴스를 만들지 않음)"""
+    return list(
+        readings(model)
+        .filter(reg_date__gte=start, reg_date__lt=end)
+        .order_by('reg_date', 'id')
+        .values_list('reg_date', 'value')
+    )
+
+
+def _archived_part(model, sensor, start, end):
+    """[start, end) 중 원본 테이블에서 이미 삭제된 앞부분을 보관 파일에서 읽는다."""
+    oldest = readings(model).order_by('reg_date').values_list('reg_date', flat=True).first()
+    if oldest is not None and oldest <= start:
+        return []
+    return archive.read_archived(sensor, start, min(end, oldest) if oldest else end)
+
+
+def aggregate_points(points, bucket):
+    """(datetime, value) 목록을 bucket 초 단위로 집계 (bucket_series 와 같은 형식)"""
+    buckets = {}
+    for t, value in points:
+        key = _from_epoch(int(t.timestamp()) // bucket * bucket)
+        agg = buckets.get(key)
+        if agg is None:
+            buckets[key] = [value, value, value, 1]
+        else:
+            agg[0] = min(agg[0], value)
+            agg[1] = max(agg[1], value)
+            agg[2] += value
+            agg[3] += 1
+    return [
+        {'t': t, 'min': mn, 'max': mx, 'avg': total / count, 'count': count, 'sum': total}
+        for t, (mn, mx, total, count) in buckets.items()
+    ]
+
+
+def merge_buckets(*series):
+    merged = {}
+    for rows in series:
+        for row in rows:
+            agg = merged.get(row['t'])
+            if agg is None:
+                merged[row['t']] = dict(row)
+            else:
+                agg['min'] = min(agg['min'], row['min'])
+                agg['max'] = max(agg['max'], row['max'])
+                agg['sum'] += row['sum']
+                agg['count'] += row['count']
+                agg['avg'] = agg['sum'] / agg['count']
+    return [merged[t] for t in sorted(merged)]
+
+
+def bucket_series_with_archive(model, sensor, start, end, bucket):
+    """bucket_series 에 보관 파일로 옮겨진 구간을 합친 결과"""
+    archived = _archived_part(model, sensor, start, end)
+    live = bucket_series(model, start, end, bucket)
+    if not archived:
+        return live
+    return merge_buckets(aggregate_points(archived, bucket), live)
+
+
+def raw_series_with_archive(model, sensor, start, end):
+    return _archived_part(model, sensor, start, end) + raw_series(model, start, end)
+
+
+def downsample_series(model, sensor, start, end, points):
+    """[start, end) 를 LTTB 로 points 개 이하의 (datetime, value) 로 줄인다.
+
+    행이 적으면 원본 행으로 LTTB 를 계산한다. 행이 많거나 보관 파일에 걸친 구간이면
+    모든 행을 읽지 않고 약 points 개 구간으로 SQL 집계한 뒤, 구간마다 최솟값과 최댓값
+    두 점만 LTTB 후보로 쓴다 (점의 시각은 구간 시작과 가운데로 근사).
+    """
+    live = readings(model).filter(reg_date__gte=start, reg_date__lt=end).count()
+    if live <= points * PREBUCKET_RATIO and not archive.has_segments(sensor, start, end):
+        return lttb(raw_series_with_archive(model, sensor, start, end), points)
+
+    bucket = max(math.ceil((end - start).total_seconds() / points), 1)
+    candidates = []
+    for row in bucket_series_with_archive(model, sensor, start, end, bucket):
+        low, high = row['min'], row['max']
+        if low == high:
+            candidates.append((row['t'], low))
+            continue
+        # 앞 점과 가까운 쪽을 먼저 놓아 선이 구간 안에서 한 번만 오르내리게 한다
+        if candidates and abs(candidates[-1][1] - high) < abs(candidates[-1][1] - low):
+            low, high = high, low
+        candidates.append((row['t'], low))
+        candidates.append((row['t'] + timedelta(seconds=bucket / 2), high))
+    return lttb(candidates, points)
+
+
+def lttb(points, threshold):
+    """Largest-Triangle-Three-Buckets 다운샘플링. points 는 (datetime, value) 목록."""
+    n = len(points)
+    if threshold >= n or threshold < 3:
+        return points
+
+    xs = [p[0].timestamp() for p in points]
+    ys = [float(p[1]) for p in points]
+    sampled = [points[0]]
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        # 다음 구간의 평균점
+        next_start = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        span = max(next_end - next_start, 1)
+        avg_x = sum(xs[next_start:next_end]) / span
+        avg_y = sum(ys[next_start:next_end]) / span
+
+        # 현재 구간에서 삼각형 넓이가 가장 큰 점 선택
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        ax, ay = xs[a], ys[a]
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        sampled.append(points[best])
+        a = best
+    sampled.append(points[-1])
+    return sampled
@@ -0,0 +1,70 @@
+import asyncio
+import json
+import threading
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+
+class Subscriber:
+    """스트림 구독자 하나. 자신이 속한 이벤트 루프와 제한된 크기의 큐를 가진다.
+
+    큐가 가득 차면 가장 오래된 메시지를 버려 느린 클라이언트가
+    다른 구독자나 쓰기 요청을 막지 않도록 한다.
+    """
+
+    def __init__(self, loop, maxsize):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize)
+        self.dropped = 0
+
+    def _put(self, message):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+
+
+class Broadcaster:
+    def __init__(self, maxsize=100):
+        self.maxsize = maxsize
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self):
+        sub = Subscriber(asyncio.get_running_loop(), self.maxsize)
+        with self._lock:
+            self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+    def publish(self, event, data):
+        """모든 구독자에게 SSE 메시지를 보낸다. 어느 스레드에서 호출해도 된다.
+
+        메시지는 한 번만 인코딩하고 DB 는 조회하지 않는다.
+        """
+        with self._lock:
+            subscribers = list(self._subscribers)
+        if not subscribers:
+            return
+        message = format_event(event, data)
+        for sub in subscribers:
+            try:
+                sub.loop.call_soon_threadsafe(sub._put, message)
+            except RuntimeError:
+                # 이벤트 루프가 이미 닫힌 구독자
+                self.unsubscribe(sub)
+
+
+def format_event(event, data):
+    payload = json.dumps(data, cls=DjangoJSONEncoder, separators=(',', ':'))
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+broadcaster = Broadcaster()
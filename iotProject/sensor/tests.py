@@ -1,3 +1,596 @@
-from django.test import TestCase
+import asyncio
+import contextlib
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management import CommandError, call_command
+from django.db import OperationalError, connection
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from frameSpool import FrameSpool
+
+from . import archive, caching, intents, llm, postgres, rollup, writebehind
+from .commands import claim_next_command
+from .management.commands import fake_llm
+from .ingest import ingest_frames
+from .models import DirSensor, HumiditySensor, SensorRollup, TemperatureSensor, WindowCommand
+from .queries import latest_rows
+
+
+class IntentMatchTests(SimpleTestCase):
+    def test_commands(self):
+        cases = {
+            '창문 열어줘': [('WINDOW', 'OPEN')],
+            '창문 좀 열어주세요': [('WINDOW', 'OPEN')],
+            '창을 닫아': [('WINDOW', 'CLOSE')],
+            '블라인드 좀 내려줄래': [('BLIND', 'DOWN')],
+            '블라인드 열어': [('BLIND', 'UP')],
+            '커튼 쳐줘': [('BLIND', 'DOWN')],
+            '창문 오픈해줘': [('WINDOW', 'OPEN')],
+            '창문 닫고 블라인드 올려줘': [('WINDOW', 'CLOSE'), ('BLIND', 'UP')],
+        }
+        for text, expected in cases.items():
+            with self.subTest(text=text):
+                actions = intents.match(text)
+                self.assertEqual([(a['device'], a['command']) for a in actions], expected)
+
+    def test_not_commands_go_to_llm(self):
+        # 부정, 과거/상태 설명, 장치가 아닌 단어, 조건, 질문
+        for text in [
+            '창문 열 필요 없어',
+            '창문 안열어',
+            '창문 안 열어',
+            '창문 열지 마',
+            '창문 열었어',
+            '창문 열어놨어',
+            '창문 닫혔네',
+            '창문이 열려',
+            '창고 열어',
+            '창 밖이 시끄러워 닫아줘',
+            '비 오면 창문 닫아',
+            '10분 뒤에 창문 닫아줘',
+            '창문 열어도 돼?',
+            '창문 올려줘',
+            '창문 열고 닫아',
+            '창문 열어줘 그리고 커피',
+            '열어줘',
+            '오늘 날씨 어때?',
+        ]:
+            with self.subTest(text=text):
+                self.assertIsNone(intents.match(text))
+
+
+class VoiceFastPathTests(TestCase):
+    def test_queues_command_without_llm(self):
+        response = self.client.post(
+            '/sensor/voiceAssistant', json.dumps({'message': '창문 열어줘'}), content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['actionsQueued'], [{'device': 'WINDOW', 'command': 'OPEN'}])
+        self.assertEqual(list(WindowCommand.objects.values_list('command', flat=True)), ['OPEN'])
+
+    def test_negative_queues_nothing(self):
+        # LLM 으로 넘어가지만 키가 없으므로 호출하지 않는다
+        with mock.patch.dict(os.environ, {'OPENAI_API_KEY': ''}):
+            response = self.client.post(
+                '/sensor/voiceAssistant', json.dumps({'message': '창문 안열어'}), content_type='application/json'
+            )
+        self.assertEqual(response.json()['message'], 'OPENAI_KEY_MISSING')
+        self.assertFalse(WindowCommand.objects.exists())
+
+
+class NextCommandWaitTests(TestCase):
+    def test_rejects_non_finite_wait(self):
+        for wait in ['nan', 'inf', '-inf', 'abc']:
+            with self.subTest(wait=wait):
+                response = self.client.get('/sensor/getNextCommand', {'wait': wait})
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json()['message'], 'INVALID_WAIT')
+
+    def test_no_wait_returns_ack(self):
+        response = self.client.get('/sensor/getNextCommand')
+        self.assertEqual(response.json(), {'command': 'ACK'})
+
+
+class FrameSpoolTests(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_ack_and_resume(self):
+        spool = FrameSpool(self.tmp.name, segment_bytes=64)
+        for i in range(10):
+            spool.append({'T': i, 'ts': i})
+        batch, cursor = spool.read_batch(4)
+        self.assertEqual([f['T'] for f in batch], [0, 1, 2, 3])
+        spool.ack(cursor)
+
+        # 다시 열면 ack 이후부터 읽는다
+        spool = FrameSpool(self.tmp.name, segment_bytes=64)
+        batch, cursor = spool.read_batch(100)
+        self.assertEqual([f['T'] for f in batch], [4, 5, 6, 7, 8, 9])
+        spool.ack(cursor)
+        self.assertEqual(spool.read_batch(100)[0], [])
+        self.assertEqual(spool.pending_bytes(), 0)
+
+    def test_unacked_batch_is_read_again(self):
+        spool = FrameSpool(self.tmp.name)
+        spool.append({'T': 1})
+        self.assertEqual(spool.read_batch(10)[0], [{'T': 1}])
+        self.assertEqual(spool.read_batch(10)[0], [{'T': 1}])
+
+    def test_dead_letter_unblocks_later_frames(self):
+        spool = FrameSpool(self.tmp.name)
+        spool.append({'T': 1})
+        spool.append({'T': 2})
+        batch, cursor = spool.read_batch(10)
+        path = spool.dead_letter(batch, cursor)
+        spool.append({'T': 3})
+
+        self.assertEqual(spool.read_batch(10)[0], [{'T': 3}])
+        with open(path) as f:
+            self.assertEqual([json.loads(line) for line in f], [{'T': 1}, {'T': 2}])
+        # dead/ 는 세그먼트로 읽히지 않는다
+        self.assertEqual(FrameSpool(self.tmp.name).read_batch(10)[0], [{'T': 3}])
+
+
+class RollupArchiveTests(TestCase):
+    BASE = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        override = override_settings(SENSOR_ARCHIVE_DIR=tmp.name, SENSOR_RETENTION_DAYS={'default': 90})
+        override.enable()
+        self.addCleanup(override.disable)
+        # 4일 동안 6시간마다 하나씩, 하루에 4개
+        ingest_frames([
+            {'T': float(hour), 'ts': (self.BASE + timedelta(hours=hour)).timestamp()} for hour in range(0, 96, 6)
+        ])
+
+    def daily(self):
+        return dict(
+            SensorRollup.objects.filter(sensor='Temp', resolution=86400)
+            .order_by('bucket_start').values_list('bucket_start', 'count')
+        )
+
+    def test_rebuild_keeps_rollups_of_archived_rows(self):
+        before = self.daily()
+        # 1.5 일 이전 행을 보관 파일로 옮긴다 (둘째 날은 일부만 남음)
+        cutoff = self.BASE + timedelta(hours=36)
+        self.assertEqual(archive.expire('Temp', TemperatureSensor, now=cutoff + timedelta(days=90)), 6)
+
+        rollup.rebuild('Temp', TemperatureSensor)
+        self.assertEqual(self.daily(), before)
+        self.assertEqual(rollup.find_mismatches('Temp', TemperatureSensor), [])
+        # 보관된 6개 행의 분/시 구간과 첫날 구간은 원본이 없으므로 검사하지 않는다
+        self.assertEqual(rollup.unchecked_buckets('Temp', TemperatureSensor), 6 + 6 + 1)
+
+    def test_retention_command_uses_canonical_name(self):
+        with mock.patch('django.utils.timezone.now', return_value=self.BASE + timedelta(days=100)):
+            call_command('sensor_retention', 'temp', stdout=open(os.devnull, 'w'))
+        self.assertEqual(os.listdir(archive.archive_dir('Temp').rsplit(os.sep, 1)[0]), ['Temp'])
+        self.assertEqual(len(archive.read_archived('Temp', self.BASE, self.BASE + timedelta(days=4))), 16)
+
+    def test_check_finds_changed_rollup(self):
+        SensorRollup.objects.filter(sensor='Temp', resolution=3600).update(count=99)
+        mismatches = rollup.find_mismatches('Temp', TemperatureSensor)
+        self.assertEqual(len(mismatches), 16)
+        rollup.rebuild('Temp', TemperatureSensor)
+        self.assertEqual(rollup.find_mismatches('Temp', TemperatureSensor), [])
+
+
+class SensorCommandNameTests(TestCase):
+    def test_rollup_backfill_uses_canonical_name(self):
+        ingest_frames([{'T': 1.0}])
+        call_command('rollup_backfill', 'temp', stdout=open(os.devnull, 'w'))
+        self.assertEqual(set(SensorRollup.objects.values_list('sensor', flat=True)), {'Temp'})
+
+    def test_unknown_sensor_stops_before_any_work(self):
+        ingest_frames([{'T': 1.0}])
+        SensorRollup.objects.all().delete()
+        with self.assertRaisesMessage(CommandError, 'unknown sensor: nope'):
+            call_command('rollup_backfill', 'temp', 'nope', stdout=open(os.devnull, 'w'))
+        self.assertFalse(SensorRollup.objects.exists())
+
+
+class WriteBehindTests(TestCase):
+    def test_flush_saves_rows(self):
+        buffer = writebehind.WriteBehindBuffer(flush_interval=0.01)
+        buffer.submit(TemperatureSensor(value=1.5, reg_date=RollupArchiveTests.BASE), TemperatureSensor)
+        buffer.flush()
+        self.assertEqual(list(TemperatureSensor.objects.values_list('value', flat=True)), [1.5])
+
+    def test_failed_flush_counts_dropped_rows(self):
+        buffer = writebehind.WriteBehindBuffer(max_rows=3)
+        row = (TemperatureSensor, TemperatureSensor(value=1.0, reg_date=RollupArchiveTests.BASE))
+        buffer._queue.extend([row, row])
+
+        def fail(rows):
+            # 저장이 실패하는 동안 다른 요청이 큐를 채운다
+            buffer._queue.extend([row, row])
+            raise OperationalError('database is locked')
+
+        with mock.patch('sensor.ingest.write_rows', side_effect=fail), \
+                self.assertLogs('sensor.writebehind', 'ERROR') as logs:
+            buffer.flush()
+        # 빈 자리 1 개만 되돌리고 나머지 1 개는 버린 것으로 집계
+        self.assertEqual(buffer.metrics()['queue_depth'], 3)
+        self.assertEqual(buffer.metrics()['dropped_rows'], 1)
+        self.assertIn('dropped 1 rows', logs.output[-1])
+
+    def test_close_does_not_hang_when_db_is_down(self):
+        buffer = writebehind.WriteBehindBuffer(flush_interval=0.01, close_timeout=0.2)
+        with mock.patch('sensor.ingest.write_rows', side_effect=OperationalError('db down')), \
+                self.assertLogs('sensor.writebehind', 'ERROR') as logs:
+            buffer.submit(TemperatureSensor(value=1.0, reg_date=RollupArchiveTests.BASE), TemperatureSensor)
+            started = time.monotonic()
+            buffer.close()
+        self.assertLess(time.monotonic() - started, 2)
+        self.assertEqual(buffer.metrics()['dropped_rows'], 1)
+        self.assertIn('1 unsaved rows', logs.output[-1])
+
+
+    def test_poison_rows_are_dropped_and_good_rows_saved(self):
+        buffer = writebehind.WriteBehindBuffer()
+        base = RollupArchiveTests.BASE
+        buffer._queue.extend([
+            (DirSensor, DirSensor(value=10 ** 30, reg_date=base)),  # OverflowError
+            (TemperatureSensor, TemperatureSensor(value=1.0, reg_date=None)),  # IntegrityError (NOT NULL)
+            (TemperatureSensor, TemperatureSensor(value=2.0, reg_date=base)),
+            (DirSensor, DirSensor(value=3, reg_date=base)),
+        ])
+        with self.assertLogs('sensor.writebehind', 'ERROR') as logs:
+            buffer.flush()
+        self.assertEqual(list(TemperatureSensor.objects.values_list('value', flat=True)), [2.0])
+        self.assertEqual(list(DirSensor.objects.values_list('value', flat=True)), [3])
+        metrics = buffer.metrics()
+        self.assertEqual((metrics['queue_depth'], metrics['invalid_rows'], metrics['flushed_rows']), (0, 2, 2))
+        self.assertEqual(len([line for line in logs.output if 'dropped invalid' in line]), 2)
+
+
+class StreamTests(TestCase):
+    def test_wsgi_request_is_refused(self):
+        self.assertEqual(self.client.get('/sensor/stream').status_code, 204)
+
+    async def test_asgi_stream_starts_with_snapshot(self):
+        response = await self.async_client.get('/sensor/stream')
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        events = aiter(response.streaming_content)
+        first = await anext(events)
+        await events.aclose()
+        self.assertTrue((first.decode() if isinstance(first, bytes) else first).startswith('event: snapshot'))
+
+
+class SeriesDownsampleTests(TestCase):
+    BASE = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+
+    def series(self, points, count):
+        ingest_frames([
+            {'T': 100.0 if i == 777 else float(i % 10), 'ts': (self.BASE + timedelta(seconds=i)).timestamp()}
+            for i in range(count)
+        ])
+        response = self.client.get('/sensor/Temp/series', {
+            'from': self.BASE.timestamp(), 'to': (self.BASE + timedelta(seconds=count)).timestamp(), 'points': points,
+        })
+        self.assertEqual(response.status_code, 200)
+        return response.json()['points']
+
+    def test_large_range_is_bucketed_in_sql(self):
+        # 원본 행을 전부 읽지 않고도 튀는 값은 남는다
+        with mock.patch('sensor.series.raw_series', side_effect=AssertionError('loaded raw rows')):
+            points = self.series(50, 2000)
+        self.assertLessEqual(len(points), 50)
+        self.assertIn(100.0, [p['value'] for p in points])
+        self.assertEqual(points, sorted(points, key=lambda p: p['t']))
+
+    def test_small_range_uses_raw_rows(self):
+        points = self.series(50, 100)
+        self.assertEqual(len(points), 50)
+        self.assertEqual(points[0]['value'], 0.0)
+        self.assertEqual(points[-1]['value'], 9.0)
+
+
+class SingleFlightTests(SimpleTestCase):
+    async def test_waiters_share_one_call(self):
+        inflight, calls, release = {}, [], asyncio.Event()
+
+        async def call():
+            calls.append(1)
+            await release.wait()
+            return 'answer'
+
+        waiters = [asyncio.ensure_future(llm._single_flight(inflight, 'k', call)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        self.assertEqual(await asyncio.gather(*waiters), ['answer'] * 3)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(inflight, {})
+
+    async def test_call_survives_while_a_waiter_remains(self):
+        inflight, release = {}, asyncio.Event()
+
+        async def call():
+            await release.wait()
+            return 'answer'
+
+        first = asyncio.ensure_future(llm._single_flight(inflight, 'k', call))
+        second = asyncio.ensure_future(llm._single_flight(inflight, 'k', call))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        self.assertEqual(await second, 'answer')
+        self.assertTrue(first.cancelled())
+
+    async def test_last_waiter_leaving_cancels_call(self):
+        inflight, started, cancelled = {}, asyncio.Event(), asyncio.Event()
+
+        async def call():
+            started.set()
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        waiters = [asyncio.ensure_future(llm._single_flight(inflight, 'k', call)) for _ in range(2)]
+        await started.wait()
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.wait_for(cancelled.wait(), 1)
+        await asyncio.sleep(0)
+        self.assertEqual(inflight, {})
+
+
+class FrameIngestTests(TestCase):
+    def post_frames(self, payload):
+        return self.client.post('/sensor/setFrame', json.dumps(payload), content_type='application/json')
+
+    def test_frame_without_ts_shares_one_reg_date(self):
+        response = self.post_frames({'T': 21.5, 'H': 40, 'WDIR': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['saved'], {'TemperatureSensor': 1, 'HumiditySensor': 1, 'DirSensor': 1})
+        temp = TemperatureSensor.objects.get()
+        self.assertEqual(temp.value, 21.5)
+        self.assertEqual(HumiditySensor.objects.get().reg_date, temp.reg_date)
+
+    def test_frames_with_ts_use_measurement_time(self):
+        base = RollupArchiveTests.BASE
+        response = self.post_frames({'frames': [
+            {'T': 1.0, 'H': 10, 'ts': base.timestamp()},
+            {'T': 2.0, 'H': 20, 'ts': (base + timedelta(seconds=5)).timestamp()},
+        ]})
+        self.assertEqual(response.json()['frames'], 2)
+        expected = [(base, 1.0), (base + timedelta(seconds=5), 2.0)]
+        self.assertEqual(list(TemperatureSensor.objects.order_by('reg_date').values_list('reg_date', 'value')),
+                         expected)
+        self.assertEqual(list(HumiditySensor.objects.order_by('reg_date').values_list('reg_date', flat=True)),
+                         [t for t, _ in expected])
+
+    def test_invalid_value_saves_nothing(self):
+        response = self.post_frames({'frames': [{'T': 1.0}, {'T': 'nan', 'H': 10}]})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['message'], 'INVALID_VALUE')
+        self.assertFalse(TemperatureSensor.objects.exists())
+        self.assertFalse(HumiditySensor.objects.exists())
+
+    def test_out_of_range_integer_is_rejected_not_500(self):
+        # 5xx 면 수집기가 같은 배치를 계속 재시도해 스풀 전체가 막힌다
+        response = self.post_frames({'frames': [{'T': 1.0}, {'WDIR': 1e300}]})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['message'], 'INVALID_VALUE')
+        self.assertFalse(TemperatureSensor.objects.exists())
+
+    def test_requires_post(self):
+        self.assertEqual(self.client.get('/sensor/setFrame').status_code, 405)
+
+    def test_frames_without_sensor_values_are_rejected(self):
+        for payload in [[], [{}], {'frames': [{'ts': 1}, {'X': 1}]}]:
+            with self.subTest(payload=payload):
+                response = self.post_frames(payload)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json()['message'], 'KEY_ERROR')
+        empty = self.client.post('/sensor/setFrame', '', content_type='application/x-www-form-urlencoded')
+        self.assertEqual(empty.status_code, 400)
+        self.assertEqual(empty.json()['message'], 'KEY_ERROR')
+
+    def test_invalid_ts_is_rejected(self):
+        response = self.post_frames({'T': 1.0, 'ts': 'yesterday'})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(TemperatureSensor.objects.exists())
+
+
+class CommandClaimTests(TestCase):
+    def test_each_command_is_claimed_once_in_order(self):
+        ids = [WindowCommand.objects.create(command=command).id for command in ['OPEN', 'UP', 'CLOSE']]
+        # RETURNING 을 쓰는 경로와 조건부 UPDATE 로 선점하는 예전 SQLite 경로
+        for version in [(3, 45, 0), (3, 34, 0)]:
+            with self.subTest(sqlite_version=version):
+                WindowCommand.objects.update(processed=False)
+                with mock.patch.object(connection.Database, 'sqlite_version_info', version):
+                    claimed = [claim_next_command() for _ in range(4)]
+                self.assertEqual([cmd and cmd.id for cmd in claimed], ids + [None])
+                self.assertFalse(WindowCommand.objects.filter(processed=False).exists())
+
+    async def test_concurrent_long_polls_get_one_delivery(self):
+        async def poll():
+            response = await self.async_client.get('/sensor/getNextCommand', {'wait': 1})
+            return response.json()['command']
+
+        polls = [asyncio.ensure_future(poll()) for _ in range(3)]
+        await asyncio.sleep(0.1)
+        await self.async_client.post('/sensor/setWindowCommand', {'command': 'open'})
+        self.assertEqual(sorted(await asyncio.gather(*polls)), ['ACK', 'ACK', 'OPEN'])
+
+
+class ResultCacheTests(TestCase):
+    def setUp(self):
+        caches['default'].clear()
+
+    def latest(self):
+        return [row['value'] for row in self.client.get('/sensor/Temp/latest/5').json()]
+
+    def test_latest_is_cached_until_next_write(self):
+        ingest_frames([{'T': 1.0}])
+        with mock.patch('sensor.views.latest_rows', wraps=latest_rows) as query:
+            self.assertEqual(self.latest(), [1.0])
+            self.assertEqual(self.latest(), [1.0])
+            self.assertEqual(query.call_count, 1)
+            ingest_frames([{'T': 2.0}])
+            self.assertEqual(self.latest(), [1.0, 2.0])
+            self.assertEqual(query.call_count, 2)
+
+    def test_series_with_end_is_invalidated_by_write(self):
+        base = RollupArchiveTests.BASE
+        params = {'from': base.timestamp(), 'to': (base + timedelta(hours=1)).timestamp(), 'bucket': '1h'}
+        ingest_frames([{'T': 1.0, 'ts': base.timestamp()}])
+        self.assertEqual(self.client.get('/sensor/Temp/series', params).json()['buckets'][0]['count'], 1)
+        ingest_frames([{'T': 3.0, 'ts': base.timestamp() + 60}])
+        bucket = self.client.get('/sensor/Temp/series', params).json()['buckets'][0]
+        self.assertEqual((bucket['count'], bucket['max']), (2, 3.0))
+
+    def test_unavailable_backend_falls_back_to_db(self):
+        ingest_frames([{'T': 1.0}])
+        with mock.patch.object(type(caches['default']), 'get_many', side_effect=ConnectionError('down')), \
+                self.assertLogs('sensor.caching', 'ERROR'):
+            self.assertEqual(self.latest(), [1.0])
+        self.assertGreater(caching.metrics()['errors'], 0)
+
+    def test_no_etag_without_cache(self):
+        # 버전을 모르면 쓰기 후에도 같은 ETag 가 되어 304 로 예전 값을 돌려주게 된다
+        ingest_frames([{'T': 1.0}])
+        for path in ['/sensor/Temp/latest/1', '/sensor/snapshot']:
+            with self.subTest(path=path):
+                with mock.patch.object(type(caches['default']), 'get_many', side_effect=ConnectionError('down')), \
+                        self.assertLogs('sensor.caching', 'ERROR'):
+                    first = self.client.get(path)
+                    ingest_frames([{'T': 2.0}])
+                    second = self.client.get(path, HTTP_IF_NONE_MATCH=first.get('ETag', '"x"'))
+                self.assertFalse(first.has_header('ETag'))
+                self.assertEqual(second.status_code, 200)
+
+
+class VoiceLLMTests(TestCase):
+    """voiceAssistant 의 LLM 경로를 manage.py fake_llm 과 같은 가짜 서버에 연결해 확인한다"""
+
+    def setUp(self):
+        caches['default'].clear()
+
+    @contextlib.asynccontextmanager
+    async def fake_server(self):
+        fake = fake_llm.Command()
+        fake.delay, fake.jitter = 0.05, 0
+        server = await asyncio.start_server(fake._handle, '127.0.0.1', 0)
+        base_url = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}/v1"
+        try:
+            with override_settings(LLM={**settings.LLM, 'base_url': base_url, 'max_retries': 0}), \
+                    mock.patch.dict(os.environ, {'OPENAI_API_KEY': 'fake'}):
+                yield
+        finally:
+            # keep-alive 연결을 닫아 가짜 서버의 연결 처리 task 가 끝나게 한다
+            state = llm._state.pop(asyncio.get_running_loop(), None)
+            if state is not None:
+                await state[0].close()
+            server.close()
+            await server.wait_closed()
+            await asyncio.sleep(0.01)
+
+    async def ask(self, message):
+        response = await self.async_client.post(
+            '/sensor/voiceAssistant', json.dumps({'message': message}), content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    async def test_llm_actions_are_queued(self):
+        # '?' 가 있으므로 규칙이 아닌 LLM 으로 처리된다
+        async with self.fake_server():
+            result = await self.ask('더운데 창문 좀 열어줄 수 있어?')
+        self.assertEqual(result['reply'], '알겠습니다.')
+        self.assertEqual(result['actionsQueued'], [{'device': 'WINDOW', 'command': 'OPEN'}])
+        self.assertEqual([cmd.command async for cmd in WindowCommand.objects.all()], ['OPEN'])
+
+    async def test_repeated_question_is_served_from_cache(self):
+        before = llm.metrics()
+        async with self.fake_server():
+            await self.ask('오늘 날씨 어때?')
+            await self.ask('오늘  날씨 어때?')
+        after = llm.metrics()
+        self.assertEqual(after['calls'] - before['calls'], 1)
+        self.assertEqual(after['cache_hits'] - before['cache_hits'], 1)
+
+    async def test_concurrent_same_question_makes_one_call(self):
+        before = llm.metrics()
+        async with self.fake_server():
+            results = await asyncio.gather(*[self.ask('습도는 어때?') for _ in range(3)])
+        after = llm.metrics()
+        self.assertEqual({result['reply'] for result in results}, {'알겠습니다.'})
+        self.assertEqual(after['calls'] - before['calls'], 1)
+        self.assertEqual(after['coalesced'] - before['coalesced'], 2)
+
+
+class SensorValueRangeTests(TestCase):
+    def test_out_of_range_integers_are_rejected(self):
+        for path in ['/sensor/setWDir', '/sensor/setBDir', '/sensor/WDir']:
+            for value in ['1e300', '99999999999999999999', '-1e19']:
+                with self.subTest(path=path, value=value):
+                    response = self.client.post(path, {'value': value})
+                    self.assertEqual(response.status_code, 400)
+                    self.assertEqual(response.json()['message'], 'INVALID_VALUE')
+
+    def test_large_in_range_integer_is_saved(self):
+        response = self.client.post('/sensor/setWDir', {'value': str(2 ** 53)})
+        self.assertEqual(response.status_code, 200)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'POSTGRES_DB 로 PostgreSQL 에서 실행할 때만')
+class PostgresPartitionTests(TestCase):
+    table = TemperatureSensor._meta.db_table
+
+    def partition_of(self, pk):
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT tableoid::regclass::text FROM {self.table} WHERE id = %s", [pk])
+            return cursor.fetchone()[0]
+
+    def test_tables_are_partitioned(self):
+        self.assertTrue(postgres.is_partitioned(self.table))
+        self.assertTrue(postgres.partitions(self.table))
+
+    def test_new_partition_takes_rows_from_default(self):
+        month = datetime(2090, 1, 1, tzinfo=dt_timezone.utc)
+        row = TemperatureSensor.objects.create(value=1.0, reg_date=month + timedelta(days=3))
+        self.assertEqual(self.partition_of(row.id), f"{self.table}_default")
+
+        self.assertEqual(postgres.ensure_partitions(self.table, month, month + timedelta(days=1)),
+                         [postgres.partition_name(self.table, month)])
+        self.assertEqual(self.partition_of(row.id), postgres.partition_name(self.table, month))
+        self.assertEqual(TemperatureSensor.objects.get(id=row.id).value, 1.0)
+
+    def test_partition_is_archived_in_time_order(self):
+        month = datetime(2089, 1, 1, tzinfo=dt_timezone.utc)
+        postgres.ensure_partitions(self.table, month, month + timedelta(days=1))
+        # id 순서와 reg_date 순서가 반대
+        for day in [20, 10, 1]:
+            TemperatureSensor.objects.create(value=float(day), reg_date=month + timedelta(days=day))
+        chunks = []
+        postgres.archive_partition(postgres.partition_name(self.table, month), chunks.append, chunk=2)
+        self.assertEqual([[row[2] for row in chunk] for chunk in chunks], [[1.0, 10.0], [20.0]])
+
+    def test_expired_partition_is_archived_and_dropped(self):
+        month = datetime(2001, 1, 1, tzinfo=dt_timezone.utc)
+        postgres.ensure_partitions(self.table, month, month + timedelta(days=1))
+        TemperatureSensor.objects.create(value=5.0, reg_date=month + timedelta(days=1))
+        archived = []
+        dropped = postgres.drop_expired_partitions(self.table, datetime(2001, 3, 1, tzinfo=dt_timezone.utc),
+                                                   archived.extend)
+        self.assertIn(postgres.partition_name(self.table, month), dropped)
+        self.assertEqual([row[2] for row in archived], [5.0])
+        self.assertFalse(TemperatureSensor.objects.filter(reg_date__year=2001).exists())
 
-# Create your tests here.
@@ -2,30 +2,30 @@ from django.urls import path
 
 from . import views
 
+# 예전 센서별 URL (getTemp/<cnt>, setTemp, ...) -> 공통 뷰
+LEGACY_SENSOR_URLS = ('Temp', 'Humi', 'Vib', 'Prox', 'Dust', 'Light', 'Rain', 'Dir', 'WDir', 'BDir')
+
 urlpatterns = [
     path('', views.index, name='index'),
-    path('getTemp/<int:cnt>', views.getTemp, name='getTemp'),
-    path('getHumi/<int:cnt>', views.getHumi, name='getHumi'),
-    path('getVib/<int:cnt>', views.getVib, name='getVib'),
-    path('getProx/<int:cnt>', views.getProx, name='getProx'),
-    path('getDust/<int:cnt>', views.getDust, name='getDust'),
-    path('getLight/<int:cnt>', views.getLight, name='getLight'),
-    path('getRain/<int:cnt>', views.getRain, name='getRain'),
-    path('getDir/<int:cnt>', views.getDir, name='getDir'),
-    path('getWDir/<int:cnt>', views.getWDir, name='getWDir'),
-    path('getBDir/<int:cnt>', views.getBDir, name='getBDir'),
+    path('snapshot', views.getSnapshot, name='snapshot'),
+    path('stream', views.stream, name='stream'),
+    path('<str:sensor>/series', views.getSeries, name='series'),
+    path('ingestStats', views.ingestStats, name='ingestStats'),
+    path('cacheStats', views.cacheStats, name='cacheStats'),
+    path('voiceStats', views.voiceStats, name='voiceStats'),
     path('getNextCommand', views.getNextCommand, name='getNextCommand'),
 
-    path('setTemp', views.setTemp, name='setTemp'),
-    path('setHumi', views.setHumi, name='setHumi'),
-    path('setVib', views.setVib, name='setVib'),
-    path('setProx', views.setProx, name='setProx'),
-    path('setDust', views.setDust, name='setDust'),
-    path('setLight', views.setLight, name='setLight'),
-    path('setRain', views.setRain, name='setRain'),
     path('setWindowCommand', views.setWindowCommand, name='setWindowCommand'),
-    path('setDir', views.setDir, name='setDir'),
-    path('setWDir', views.setWDir, name='setWDir'),
-    path('setBDir', views.setBDir, name='setBDir'),
+    path('setFrame', views.setFrame, name='setFrame'),
     path('voiceAssistant', views.voiceAssistant, name='voiceAssistant'),
 ]
+for name in LEGACY_SENSOR_URLS:
+    urlpatterns += [
+        path(f'get{name}/<int:cnt>', views.getLatest, {'sensor': name}, name=f'get{name}'),
+        path(f'set{name}', views.setSensor, {'sensor': name}, name=f'set{name}'),
+    ]
+# 센서 이름을 받는 경로는 위의 고정 경로들 뒤에 둔다
+urlpatterns += [
+    path('<str:sensor>/latest/<int:cnt>', views.getLatest, name='latest'),
+    path('<str:sensor>', views.setSensor, name='sensor'),
+]
@@ -1,28 +1,33 @@
-import os
+import asyncio
 from django.http import HttpResponse
 from .models import (
     TemperatureSensor as Temp,
-    HumiditySensor as Humi,
-    VibratorSensor as Vib,
-    ProximitySensor as Prox,
-    DustSensor as Dust,
-    LightSensor as Light,
-    RainSensor as Rain,
-    DirSensor as Dir,
-    BlindDirSensor as BDir,
     WindowCommand as WinCmd,
 )
+from .queries import latest_rows, readings, snapshot, resolve_sensor, data_version, SENSOR_NAMES
+from .rollup import rollup_resolution, rollup_series
+from .series import bucket_series_with_archive, downsample_series, MAX_BUCKETS, MAX_POINTS
+from .ingest import has_readings, ingest_frames, save_reading, FrameError
+from . import caching, intents, llm, writebehind
+from .responses import json_response, rows_response, response_format, FormatError
+from .stream import broadcaster, format_event
+from .commands import claim_next_command, notify_command_queued, CommandWaiter
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
 from django.shortcuts import render
 from django.core import serializers
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from datetime import datetime, timedelta, timezone as dt_timezone
+from asgiref.sync import sync_to_async
 from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.http import require_POST
-from openai import OpenAI
+from django.views.decorators.http import condition, require_POST
+from django.utils.cache import patch_cache_control
+import math
 import random
 import json
 
-OPENAI_KEY = os.getenv("OPENAI_API_KEY")
-openai_client = OpenAI(api_key=OPENAI_KEY) if OPENAI_KEY else None
 VOICE_SYSTEM_PROMPT = (
     "당신은 스마트 창문과 블라인드를 제어하는 친절한 가정용 비서입니다. "
     "반드시 2문장 이내의 간결한 한국어로 답변하고, 위험 상황에서는 주의 메시지를 우선 전달하세요. "
@@ -30,120 +35,253 @@ VOICE_SYSTEM_PROMPT = (
 )
 
 def index(request):
-    sensor_value_list = Temp.objects.all().order_by('-reg_date').values()[:5]
+    sensor_value_list = readings(Temp).order_by('-reg_date', '-id').values('id', 'reg_date', 'value')[:5]
     context = {
         'sensor_value_list': sensor_value_list,
     }
     return render(request, 'sensor/index.html', context)
 
-def getTemp(request, cnt):
-    results = list(Temp.objects.all().order_by('-reg_date').values())[:cnt][::-1]
-    return JsonResponse(results, safe=False)
-
-def getHumi(request, cnt):
-    results = list(Humi.objects.all().order_by('-reg_date').values())[:cnt][::-1]
-    return JsonResponse(results, safe=False)
-
-def getVib(request, cnt):
-    results = list(Vib.objects.all().order_by('-reg_date').values())[:cnt][::-1]
-    return JsonResponse(results, safe=False)
-
-def getProx(request, cnt):
-    results = list(Prox.objects.all().order_by('-reg_date').values())[:cnt][::-1]
-    return JsonResponse(results, safe=False)
-
-def getDust(request, cnt):
-    results = list(Dust.objects.all().order_by('-reg_date').values())[:cnt][::-1]
-    return JsonResponse(results, safe=False)
-
-def getLight(request, cnt):
-    results = list(Light.objects.all().order_by('-reg_date').values())[:cnt][::-1]
-    return JsonResponse(results, safe=False)
-
-def getRain(request, cnt):
-    results = list(Rain.objects.all().order_by('-reg_date').values())[:cnt][::-1]
-    return JsonResponse(results, safe=False)
-
-def getDir(request, cnt):
-    return getWDir(request, cnt)
-
-def getWDir(request, cnt):
-    results = list(Dir.objects.all().order_by('-reg_date').values())[:cnt][::-1]
-    return JsonResponse(results, safe=False)
-
-def getBDir(request, cnt):
-    results = list(BDir.objects.all().order_by('-reg_date').values())[:cnt][::-1]
-    return JsonResponse(results, safe=False)
-
-def setTemp(request):
+def _latest_etag(request, sensor, cnt):
+    # 저장된 행이 없으면 같은 ETag -> If-None-Match 가 맞으면 DB 조회 없이 304
+    # 캐시를 쓸 수 없어 버전을 모르면 ETag 를 붙이지 않는다 (항상 200)
+    model = resolve_sensor(sensor)
+    if model is None:
+        return None
+    version = data_version(model)
+    if version is None:
+        return None
+    return f"{SENSOR_NAMES[model]}.{cnt}.{request.GET.get('format', 'json')}.{version}"
+
+def _snapshot_etag(request):
+    version = data_version()
+    return None if version is None else f"snapshot.{version}"
+
+@condition(etag_func=_latest_etag)
+def getLatest(request, sensor, cnt):
+    # GET /sensor/<name>/latest/<cnt> (예전 getTemp/<cnt> 등도 여기로 연결됨)
+    model = resolve_sensor(sensor)
+    if model is None:
+        return JsonResponse({"message": "UNKNOWN_SENSOR"}, status=404)
     try:
-        Temp.objects.create(value = request.POST['value'])
-        return JsonResponse({"message": "OK"}, status=200)
-    except KeyError:
-        return JsonResponse({"message": "KEY_ERROR"}, status=400)
-
-def setHumi(request):
+        fmt = response_format(request)
+    except FormatError:
+        return JsonResponse({"message": "INVALID_PARAMETER"}, status=400)
+    name = SENSOR_NAMES[model]
+    rows = caching.cached(name, ('latest', cnt), lambda: latest_rows(model, cnt))
+    response = rows_response(fmt, rows, ROW_KEYS)
+    # 브라우저가 매번 ETag 로 재검증하도록 한다
+    patch_cache_control(response, no_cache=True)
+    return response
+
+@condition(etag_func=_snapshot_etag)
+def getSnapshot(request):
+    # 대시보드용: 모든 센서의 최신 값을 한 번에 반환 (프로세스 내 캐시 사용)
+    response = json_response(snapshot())
+    patch_cache_control(response, no_cache=True)
+    return response
+
+STREAM_KEEPALIVE = 15  # 초
+
+async def stream(request):
+    # SSE: 새 센서 값(reading)과 명령 상태 변경(command)을 푸시 (ASGI 로 실행해야 함)
+    # 여러 워커로 실행하면 다른 워커에서 저장된 값은 broadcaster 로 오지 않으므로
+    # SENSOR_WORKER_POLL 초마다 데이터 버전을 확인해 바뀌었으면 snapshot 을 다시 보낸다
+    if not isinstance(request, ASGIRequest):
+        # WSGI(runserver)는 끝나지 않는 스트림을 전부 모은 뒤에 보내려 하므로 요청이 멈춘다.
+        # 204 를 받으면 EventSource 는 재연결하지 않고, 대시보드는 snapshot 폴링으로 전환한다
+        return HttpResponse(status=204)
+    poll = settings.SENSOR_WORKER_POLL
+
+    async def events():
+        sub = broadcaster.subscribe()
+        try:
+            version = await sync_to_async(data_version)() if poll else None
+            yield format_event('snapshot', await sync_to_async(snapshot)())
+            idle = 0
+            while True:
+                try:
+                    message = await asyncio.wait_for(sub.queue.get(), poll or STREAM_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    if poll:
+                        current = await sync_to_async(data_version)()
+                        if current != version:
+                            version = current
+                            idle = 0
+                            yield format_event('snapshot', await sync_to_async(snapshot)())
+                            continue
+                        idle += poll
+                        if idle < STREAM_KEEPALIVE:
+                            continue
+                    idle = 0
+                    yield ": keepalive\n\n"
+                    continue
+                yield message
+        finally:
+            broadcaster.unsubscribe(sub)
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+# ?format=columns|f8 응답의 열 순서
+ROW_KEYS = ('id', 'reg_date', 'value')
+POINT_KEYS = ('t', 'value')
+BUCKET_KEYS = ('t', 'min', 'max', 'avg', 'count', 'sum')
+
+BUCKET_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+def _parse_time(raw):
+    # ISO 8601 문자열 또는 unix 초
     try:
-        Humi.objects.create(value = request.POST['value'])
-        return JsonResponse({"message": "OK"}, status=200)
-    except KeyError:
-        return JsonResponse({"message": "KEY_ERROR"}, status=400)
-
-def setVib(request):
+        return datetime.fromtimestamp(float(raw), tz=dt_timezone.utc)
+    except ValueError:
+        parsed = parse_datetime(raw)
+        if parsed is None:
+            raise
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed, dt_timezone.utc)
+        return parsed
+
+def _parse_bucket(raw):
+    # "60", "5m", "1h", "1d" 형식의 초 단위 구간
+    unit = BUCKET_UNITS.get(raw[-1:].lower())
+    seconds = int(raw[:-1]) * unit if unit else int(raw)
+    if seconds < 1:
+        raise ValueError(raw)
+    return seconds
+
+def _cached_series(request, model, parts, compute):
+    # 'to' 가 없으면 요청마다 구간이 달라지므로 캐시하지 않는다
+    if 'to' not in request.GET:
+        return compute()
+    return caching.cached(SENSOR_NAMES[model], ('series', *(
+        part.timestamp() if isinstance(part, datetime) else part for part in parts
+    )), compute)
+
+def getSeries(request, sensor):
+    # /sensor/<sensor>/series?from=&to=&bucket=  (또는 &points= 로 LTTB 다운샘플링)
+    model = resolve_sensor(sensor)
+    if model is None:
+        return JsonResponse({"message": "UNKNOWN_SENSOR"}, status=404)
     try:
-        Vib.objects.create(value = request.POST['value'])
-        return JsonResponse({"message": "OK"}, status=200)
-    except KeyError:
-        return JsonResponse({"message": "KEY_ERROR"}, status=400)
+        end = _parse_time(request.GET['to']) if 'to' in request.GET else timezone.now()
+        start = _parse_time(request.GET['from']) if 'from' in request.GET else end - timedelta(days=1)
+        bucket = _parse_bucket(request.GET['bucket']) if 'bucket' in request.GET else None
+        points = int(request.GET['points']) if 'points' in request.GET else None
+        fmt = response_format(request)
+    except (ValueError, OverflowError, OSError):
+        return JsonResponse({"message": "INVALID_PARAMETER"}, status=400)
+    if start >= end:
+        return JsonResponse({"message": "INVALID_RANGE"}, status=400)
+
+    result = {"sensor": sensor, "from": start, "to": end}
+    if points is not None:
+        if not 3 <= points <= MAX_POINTS:
+            return JsonResponse({"message": "INVALID_POINTS", "max": MAX_POINTS}, status=400)
+        rows = _cached_series(request, model, ('points', start, end, points), lambda: [
+            {"t": t, "value": v}
+            for t, v in downsample_series(model, SENSOR_NAMES[model], start, end, points)
+        ])
+        return rows_response(fmt, rows, POINT_KEYS, result, "points")
+
+    if bucket is None:
+        bucket = max(int((end - start).total_seconds()) // 500, 1)
+    if (end - start).total_seconds() / bucket > MAX_BUCKETS:
+        return JsonResponse({"message": "TOO_MANY_BUCKETS", "max": MAX_BUCKETS}, status=400)
+    result["bucket"] = bucket
+    # 구간 경계가 rollup 해상도에 맞으면 원본 행 대신 rollup 으로 계산
+    resolution = rollup_resolution(start, end, bucket)
+    if resolution:
+        result["source"] = "rollup"
+        buckets = _cached_series(request, model, ('rollup', start, end, bucket), lambda: rollup_series(
+            SENSOR_NAMES[model], start, end, bucket, resolution,
+        ))
+    else:
+        result["source"] = "raw"
+        buckets = _cached_series(request, model, ('raw', start, end, bucket), lambda: bucket_series_with_archive(
+            model, SENSOR_NAMES[model], start, end, bucket,
+        ))
+    return rows_response(fmt, buckets, BUCKET_KEYS, result, "buckets")
 
-def setProx(request):
+@require_POST
+def setSensor(request, sensor):
+    # POST /sensor/<name> (value=...) (예전 setTemp 등도 여기로 연결됨)
+    model = resolve_sensor(sensor)
+    if model is None:
+        return JsonResponse({"message": "UNKNOWN_SENSOR"}, status=404)
     try:
-        Prox.objects.create(value = request.POST['value'])
+        save_reading(model, request.POST['value'])
         return JsonResponse({"message": "OK"}, status=200)
     except KeyError:
         return JsonResponse({"message": "KEY_ERROR"}, status=400)
+    except FrameError as exc:
+        return JsonResponse({"message": "INVALID_VALUE", "detail": str(exc)}, status=400)
+    except writebehind.BufferFull:
+        # write-behind 버퍼가 가득 참: 잠시 후 다시 보내도록 한다
+        return JsonResponse({"message": "INGEST_BUSY"}, status=503, headers={"Retry-After": "1"})
+
+def _extract_frames(request):
+    if request.content_type == 'application/json' or (request.body and not request.POST):
+        payload = json.loads(request.body.decode('utf-8'))
+    else:
+        payload = request.POST.dict()
+    if isinstance(payload, dict) and 'frames' in payload:
+        payload = payload['frames']
+    if isinstance(payload, dict):
+        return [payload]
+    if isinstance(payload, list):
+        return payload
+    raise FrameError("frames must be an object or a list")
 
-def setDust(request):
+@require_POST
+def setFrame(request):
+    # 한 프레임(또는 프레임 목록)의 모든 센서 값을 한 트랜잭션으로 저장
     try:
-        Dust.objects.create(value = request.POST['value'])
-        return JsonResponse({"message": "OK"}, status=200)
-    except KeyError:
+        frames = _extract_frames(request)
+    except (json.JSONDecodeError, UnicodeDecodeError, FrameError):
+        return JsonResponse({"message": "INVALID_FRAME"}, status=400)
+    # 빈 목록, 빈 프레임, 센서 키가 하나도 없는 프레임은 저장할 값이 없다
+    if not has_readings(frames):
         return JsonResponse({"message": "KEY_ERROR"}, status=400)
-
-def setLight(request):
     try:
-        Light.objects.create(value = request.POST['value'])
-        return JsonResponse({"message": "OK"}, status=200)
-    except KeyError:
-        return JsonResponse({"message": "KEY_ERROR"}, status=400)
+        saved = ingest_frames(frames)
+    except FrameError as exc:
+        return JsonResponse({"message": "INVALID_VALUE", "detail": str(exc)}, status=400)
+    return JsonResponse({"message": "OK", "frames": len(frames), "saved": saved}, status=200)
 
-def setRain(request):
-    try:
-        Rain.objects.create(value = request.POST['value'])
-        return JsonResponse({"message": "OK"}, status=200)
-    except KeyError:
-        return JsonResponse({"message": "KEY_ERROR"}, status=400)
+def cacheStats(request):
+    # 조회 결과 캐시 적중률과 지연 시간
+    return JsonResponse(caching.metrics())
 
-def setDir(request):
-    return setWDir(request)
+def voiceStats(request):
+    # voiceAssistant 요청 중 규칙으로 처리한 비율, LLM 응답 캐시/공유 현황
+    return JsonResponse({**intents.metrics(), "llm": llm.metrics()})
 
-def setWDir(request):
-    try:
-        Dir.objects.create(value = request.POST['value'])
-        return JsonResponse({"message": "OK"}, status=200)
-    except KeyError:
-        return JsonResponse({"message": "KEY_ERROR"}, status=400)
-
-def setBDir(request):
-    try:
-        BDir.objects.create(value = request.POST['value'])
-        return JsonResponse({"message": "OK"}, status=200)
-    except KeyError:
-        return JsonResponse({"message": "KEY_ERROR"}, status=400)
+def ingestStats(request):
+    # write-behind 버퍼 상태 (큐 길이, flush 지연 시간 등)
+    if not writebehind.enabled():
+        return JsonResponse({"enabled": False})
+    return JsonResponse({"enabled": True, **writebehind.get_buffer().metrics()})
 
 ALLOWED_COMMANDS = {"OPEN", "CLOSE", "UP", "DOWN"}
 
 
+def _publish_command(cmd):
+    broadcaster.publish('command', {
+        'id': cmd.id,
+        'command': cmd.command,
+        'processed': cmd.processed,
+        'created_at': cmd.created_at,
+    })
+
+def _queue_command(command):
+    cmd = WinCmd.objects.create(command=command)
+    _publish_command(cmd)
+    notify_command_queued()
+    return cmd
+
+
 def setWindowCommand(request):
     command = request.POST.get('command')
     if not command and request.body:
@@ -157,14 +295,36 @@ def setWindowCommand(request):
     command = command.upper()
     if command not in ALLOWED_COMMANDS:
         return JsonResponse({"message": "INVALID_COMMAND"}, status=400)
-    WinCmd.objects.create(command=command)
+    _queue_command(command)
     return JsonResponse({"message": "QUEUED", "command": command}, status=200)
 
-def getNextCommand(request):
-    cmd = WinCmd.objects.filter(processed=False).order_by('created_at').first()
+MAX_COMMAND_WAIT = 30  # 초
+
+async def getNextCommand(request):
+    # ?wait=<초> 가 있으면 명령이 들어오거나 시간이 끝날 때까지 응답을 보류 (long-poll)
+    try:
+        wait = float(request.GET.get('wait', 0))
+    except ValueError:
+        return JsonResponse({"message": "INVALID_WAIT"}, status=400)
+    # nan/inf 는 min/max 로 걸러지지 않아 요청이 끝나지 않는다
+    if not math.isfinite(wait):
+        return JsonResponse({"message": "INVALID_WAIT"}, status=400)
+    wait = min(max(wait, 0), MAX_COMMAND_WAIT)
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + wait
+    with CommandWaiter() as waiter:
+        while True:
+            cmd = await sync_to_async(claim_next_command)()
+            remaining = deadline - loop.time()
+            if cmd or remaining <= 0:
+                break
+            # 다른 워커에서 들어온 명령은 알림이 오지 않으므로 SENSOR_WORKER_POLL 마다 다시 조회
+            poll = settings.SENSOR_WORKER_POLL
+            await waiter.wait(min(remaining, poll) if poll else remaining)
+
     if cmd:
-        cmd.processed = True
-        cmd.save(update_fields=['processed'])
+        _publish_command(cmd)
         return JsonResponse({"command": cmd.command})
     return JsonResponse({"command": "ACK"})
 
@@ -198,86 +358,83 @@ def _parse_voice_payload(raw_text):
             return None
 
 
+def _queue_voice_actions(actions):
+    queued_actions = []
+    for action in actions:
+        if not isinstance(action, dict):
+            continue
+        device = str(action.get("device", "")).upper()
+        command = str(action.get("command", "")).upper()
+
+        normalized = None
+        if device == "WINDOW" and command in {"OPEN", "CLOSE"}:
+            normalized = command
+        elif device == "BLIND" and command in {"UP", "DOWN"}:
+            normalized = command
+
+        if normalized and normalized in ALLOWED_COMMANDS:
+            _queue_command(normalized)
+            queued_actions.append({"device": device, "command": normalized})
+    return queued_actions
+
+
+def _voice_cacheable(raw_text):
+    # 명령을 실행하는 응답은 다시 보내면 명령이 또 실행되므로 캐시하지 않는다
+    parsed = _parse_voice_payload(raw_text)
+    return isinstance(parsed, dict) and not parsed.get("actions")
+
+
 @csrf_exempt
 @require_POST
-def voiceAssistant(request):
+async def voiceAssistant(request):
+    # LLM 응답을 기다리는 동안 워커를 점유하지 않도록 비동기 뷰로 처리 (ASGI 로 실행)
     message = _extract_voice_message(request)
     if not message:
         return JsonResponse({"message": "MESSAGE_REQUIRED"}, status=400)
-    if not openai_client:
-        return JsonResponse({"message": "OPENAI_KEY_MISSING"}, status=500)
-
-    try:
-        response = openai_client.responses.create(
-            model="gpt-4o-mini",
-            input=[
-                {
-                    "role": "system",
-                    "content": [
-                        {
-                            "type": "input_text",
-                            "text": VOICE_SYSTEM_PROMPT,
-                        }
-                    ],
-                },
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "input_text",
-                            "text": message,
-                        }
-                    ],
-                },
-            ],
-        )
-
-        raw_response = getattr(response, "output_text", None)
-        if not raw_response:
-            # responses.create 가 chunk 를 반환할 때 대비
-            chunks = []
-            for output in getattr(response, "output", []) or []:
-                for content in getattr(output, "content", []) or []:
-                    text_value = getattr(content, "text", None)
-                    if text_value:
-                        chunks.append(text_value)
-            raw_response = "".join(chunks)
-
-        parsed = _parse_voice_payload(raw_response)
-        if not parsed:
-            parsed = {"reply": raw_response or "응답을 해석할 수 없었습니다.", "actions": []}
-
-        reply_text = (parsed.get("reply") or "").strip()
-        actions = parsed.get("actions") if isinstance(parsed.get("actions"), list) else []
-
-        queued_actions = []
-        for action in actions:
-            if not isinstance(action, dict):
-                continue
-            device = str(action.get("device", "")).upper()
-            command = str(action.get("command", "")).upper()
-
-            normalized = None
-            if device == "WINDOW" and command in {"OPEN", "CLOSE"}:
-                normalized = command
-            elif device == "BLIND" and command in {"UP", "DOWN"}:
-                normalized = command
-
-            if normalized and normalized in ALLOWED_COMMANDS:
-                WinCmd.objects.create(command=normalized)
-                queued_actions.append({"device": device, "command": normalized})
 
+    # "창문 열어" 같은 자주 쓰는 명령은 규칙으로 바로 처리하고, 나머지만 LLM 에 보낸다
+    actions = intents.match(message)
+    intents.count(actions is not None)
+    if actions is not None:
+        queued_actions = await sync_to_async(_queue_voice_actions)(actions)
         return JsonResponse(
             {
-                "reply": reply_text or "요청을 처리했습니다.",
+                "reply": intents.reply_for(queued_actions),
                 "received": message,
                 "actionsQueued": queued_actions,
             }
         )
+
+    if not llm.available():
+        return JsonResponse({"message": "OPENAI_KEY_MISSING"}, status=500)
+
+    try:
+        raw_response, shared = await llm.complete(VOICE_SYSTEM_PROMPT, message, cacheable=_voice_cacheable)
+    except llm.LLMBusy:
+        return JsonResponse({"message": "OPENAI_BUSY"}, status=503, headers={"Retry-After": "1"})
+    except llm.LLMTimeout:
+        return JsonResponse({"message": "OPENAI_TIMEOUT"}, status=504)
     except Exception as exc:
         return JsonResponse(
             {"message": "OPENAI_REQUEST_FAILED", "detail": str(exc)},
             status=500,
         )
 
+    parsed = _parse_voice_payload(raw_response)
+    if not parsed:
+        parsed = {"reply": raw_response or "응답을 해석할 수 없었습니다.", "actions": []}
+
+    reply_text = (parsed.get("reply") or "").strip()
+    actions = parsed.get("actions") if isinstance(parsed.get("actions"), list) else []
+    # 동시에 들어온 같은 요청이 받은 응답이면 명령은 처음 요청에서만 큐에 넣는다
+    queued_actions = [] if shared else await sync_to_async(_queue_voice_actions)(actions)
+
+    return JsonResponse(
+        {
+            "reply": reply_text or "요청을 처리했습니다.",
+            "received": message,
+            "actionsQueued": queued_actions,
+        }
+    )
+
 # Create your views here.
@@ -0,0 +1,184 @@
+import atexit
+import logging
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.db import InterfaceError, OperationalError
+
+logger = logging.getLogger(__name__)
+
+# 다시 시도하면 성공할 수 있는 오류 (DB 연결 끊김, "database is locked" 등).
+# 그 외의 오류(IntegrityError, DataError, OverflowError ...)는 같은 행으로 몇 번을 시도해도 실패한다
+TRANSIENT_ERRORS = (OperationalError, InterfaceError)
+
+
+class BufferFull(Exception):
+    pass
+
+
+def enabled():
+    return settings.SENSOR_WRITE_BEHIND.get('enabled', False)
+
+
+class WriteBehindBuffer:
+    """set* 요청의 센서 값을 모았다가 flush_interval 마다 (또는 flush_rows 개가 차면) 한 번에 저장한다.
+
+    - 큐는 max_rows 로 제한되며 가득 차면 submit() 이 BufferFull 을 발생시킨다 (뷰에서 503).
+    - 일시적인 오류(TRANSIENT_ERRORS)로 저장에 실패한 행은 큐 앞쪽으로 되돌려 다음 flush 에서 다시 시도한다.
+      그 사이 큐가 차서 되돌릴 공간이 없는 행은 버리고 로그와 dropped_rows 로 남긴다.
+    - 그 외의 오류면 한 행씩 다시 저장해, 저장할 수 없는 행만 로그를 남기고 버린다 (invalid_rows).
+      이런 행을 되돌리면 이후의 모든 flush 가 같은 이유로 실패하고 큐가 계속 쌓인다.
+    - 프로세스 종료 시 atexit 으로 남은 행을 저장한다. DB 가 내려가 있어도 종료가 멈추지 않도록
+      close_timeout 초까지만 시도하고, 남은 행은 로그와 dropped_rows 로 남긴다.
+    """
+
+    def __init__(self, flush_interval=0.2, flush_rows=500, max_rows=10000, close_timeout=5.0):
+        self.flush_interval = flush_interval
+        self.flush_rows = flush_rows
+        self.max_rows = max_rows
+        self.close_timeout = close_timeout
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._closed = False
+        self._deadline = None
+        self.stats = {
+            'submitted': 0, 'rejected': 0, 'flushed_rows': 0, 'flushes': 0, 'flush_errors': 0, 'dropped_rows': 0,
+            'invalid_rows': 0,
+            'last_flush_ms': 0.0, 'max_flush_ms': 0.0, 'total_flush_ms': 0.0,
+        }
+
+    def submit(self, obj, model):
+        with self._cond:
+            if self._closed or len(self._queue) >= self.max_rows:
+                self.stats['rejected'] += 1
+                raise BufferFull()
+            self._queue.append((model, obj))
+            self.stats['submitted'] += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='sensor-write-behind', daemon=True)
+                self._thread.start()
+            if len(self._queue) >= self.flush_rows:
+                self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if len(self._queue) < self.flush_rows and not self._closed:
+                    self._cond.wait(self.flush_interval)
+                if self._closed and (not self._queue or time.monotonic() >= self._deadline):
+                    return
+            self.flush()
+
+    def flush(self):
+        from .ingest import write_rows
+
+        with self._cond:
+            batch = [self._queue.popleft() for _ in range(min(len(self._queue), self.flush_rows * 4))]
+        if not batch:
+            return
+
+        t0 = time.perf_counter()
+        try:
+            write_rows(_group(batch))
+            saved, retry = len(batch), []
+        except TRANSIENT_ERRORS:
+            logger.exception("write-behind flush failed (%d rows)", len(batch))
+            saved, retry = 0, batch
+        except Exception:
+            # 저장할 수 없는 행(범위 초과, 제약 위반 등)이 섞여 있다: 한 행씩 저장해 그 행만 버린다
+            logger.exception("write-behind flush failed (%d rows), retrying row by row", len(batch))
+            saved, retry = self._write_each(batch)
+        finally:
+            from django.db import connection
+            connection.close_if_unusable_or_obsolete()
+
+        elapsed = (time.perf_counter() - t0) * 1000
+        with self._cond:
+            self.stats['flushes'] += 1
+            self.stats['flushed_rows'] += saved
+            self.stats['last_flush_ms'] = elapsed
+            self.stats['max_flush_ms'] = max(self.stats['max_flush_ms'], elapsed)
+            self.stats['total_flush_ms'] += elapsed
+            if retry:
+                self.stats['flush_errors'] += 1
+                # 일시적인 오류: 공간이 남는 만큼 되돌려 다음 flush 에서 재시도
+                room = max(self.max_rows - len(self._queue), 0)
+                self._queue.extendleft(reversed(retry[:room]))
+                dropped = max(len(retry) - room, 0)
+                self.stats['dropped_rows'] += dropped
+        if retry:
+            if dropped:
+                logger.error("write-behind queue full, dropped %d rows", dropped)
+            time.sleep(self.flush_interval)
+
+    def _write_each(self, batch):
+        from .ingest import write_rows
+
+        saved, retry = 0, []
+        for model, obj in batch:
+            try:
+                write_rows({model: [obj]})
+                saved += 1
+            except TRANSIENT_ERRORS:
+                retry.append((model, obj))
+            except Exception as exc:
+                logger.error("write-behind dropped invalid %s row (value=%r): %s", model.__name__, obj.value, exc)
+                with self._cond:
+                    self.stats['invalid_rows'] += 1
+                    self.stats['dropped_rows'] += 1
+        return saved, retry
+
+    def close(self):
+        """남은 행을 저장하고 flusher 스레드를 멈춘다 (최대 close_timeout 초)."""
+        with self._cond:
+            self._closed = True
+            self._deadline = time.monotonic() + self.close_timeout
+            self._cond.notify()
+            thread = self._thread
+        if thread is not None:
+            # 저장 하나가 DB 에서 멈춰 있어도 기다리지 않는다 (daemon 스레드)
+            thread.join(self.close_timeout + 1)
+        with self._cond:
+            remaining = len(self._queue)
+            self._queue.clear()
+            self.stats['dropped_rows'] += remaining
+        if remaining:
+            logger.error("write-behind closed with %d unsaved rows", remaining)
+
+    def metrics(self):
+        with self._cond:
+            stats = dict(self.stats)
+            stats['queue_depth'] = len(self._queue)
+        stats['avg_flush_ms'] = stats.pop('total_flush_ms') / stats['flushes'] if stats['flushes'] else 0.0
+        return stats
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer():
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                config = settings.SENSOR_WRITE_BEHIND
+                _buffer = WriteBehindBuffer(
+                    flush_interval=config.get('flush_interval_ms', 200) / 1000,
+                    flush_rows=config.get('flush_rows', 500),
+                    max_rows=config.get('max_rows', 10000),
+                    close_timeout=config.get('close_timeout', 5.0),
+                )
+                atexit.register(_buffer.close)
+    return _buffer
+
+
+def _group(batch):
+    rows = {}
+    for model, obj in batch:
+        rows.setdefault(model, []).append(obj)
+    return rows
+
@@ -1,3 +1,128 @@
-from django.test import TestCase
+import asyncio
+import contextlib
+import json
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from . import views
+
+
+class FakeUpstream:
+    """OpenAI Responses API 를 흉내 내는 가짜 서버. 받은 요청의 input 을 기록하고 delay 초 뒤 응답한다"""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.inputs = []
+        self.tasks = set()
+        self.closing = asyncio.Event()
+
+    async def handle(self, reader, writer):
+        self.tasks.add(asyncio.current_task())
+        try:
+            while True:
+                if not await reader.readline():
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                request = json.loads(await reader.readexactly(int(headers.get("content-length", 0))))
+                self.inputs.append(request["input"])
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self.closing.wait(), self.delay)
+                data = json.dumps({
+                    "id": f"resp_{time.time_ns()}",
+                    "object": "response",
+                    "created_at": int(time.time()),
+                    "model": request["model"],
+                    "status": "completed",
+                    "output": [{
+                        "id": f"msg_{time.time_ns()}",
+                        "type": "message",
+                        "role": "assistant",
+                        "status": "completed",
+                        "content": [{"type": "output_text", "text": f"답변 {len(self.inputs)}", "annotations": []}],
+                    }],
+                    "parallel_tool_calls": False,
+                    "tool_choice": "auto",
+                    "tools": [],
+                }, ensure_ascii=False).encode("utf-8")
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    + f"Content-Length: {len(data)}\r\n\r\n".encode("latin-1") + data
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+class ChatApiTests(SimpleTestCase):
+    """chat_api 를 가짜 OpenAI 서버에 연결해 확인한다"""
+
+    def setUp(self):
+        cache.clear()
+
+    @contextlib.asynccontextmanager
+    async def upstream(self, delay=0.05, timeout=views.OPENAI_TIMEOUT):
+        fake = FakeUpstream(delay)
+        server = await asyncio.start_server(fake.handle, "127.0.0.1", 0)
+        base_url = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}/v1"
+        try:
+            with mock.patch.multiple(views, OPENAI_KEY="fake", OPENAI_BASE_URL=base_url, OPENAI_TIMEOUT=timeout):
+                yield fake
+        finally:
+            # 루프마다 만든 클라이언트의 keep-alive 연결을 닫고, 아직 응답 전인 연결 처리 task 가 끝나기를 기다린다
+            state = views._clients.pop(asyncio.get_running_loop(), None)
+            if state is not None:
+                await state[0].close()
+            server.close()
+            fake.closing.set()
+            await asyncio.gather(*fake.tasks)
+            await server.wait_closed()
+
+    async def ask(self, prompt):
+        return await self.async_client.post(
+            "/api/chat/", json.dumps({"prompt": prompt}), content_type="application/json"
+        )
+
+    async def test_reply_from_upstream(self):
+        async with self.upstream() as fake:
+            response = await self.ask("창문 열어줘")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"response": "답변 1"})
+        self.assertEqual(fake.inputs, ["사용자 요청: 창문 열어줘"])
+
+    async def test_timeout_returns_504(self):
+        async with self.upstream(delay=1, timeout=0.1) as fake:
+            response = await self.ask("창문 열어줘")
+        self.assertEqual(response.status_code, 504)
+        self.assertEqual(len(fake.inputs), 1)
+
+    async def test_cache_hit_skips_upstream(self):
+        await cache.aset(views._cache_key("창문 열어줘"), "캐시된 답변", 60)
+        async with self.upstream() as fake:
+            # 공백/대소문자/전각 차이는 같은 prompt 로 본다
+            response = await self.ask("  창문  열어줘 ")
+        self.assertEqual(response.json(), {"response": "캐시된 답변"})
+        self.assertEqual(fake.inputs, [])
+
+    async def test_repeated_prompt_is_cached(self):
+        async with self.upstream() as fake:
+            first = await self.ask("오늘 날씨 어때?")
+            second = await self.ask("오늘 날씨 어때?")
+        self.assertEqual(first.json(), second.json())
+        self.assertEqual(len(fake.inputs), 1)
+
+    async def test_concurrent_identical_prompts_share_one_call(self):
+        async with self.upstream(delay=0.2) as fake:
+            responses = await asyncio.gather(*(self.ask("오늘 날씨 어때?") for _ in range(5)))
+        self.assertEqual([response.json() for response in responses], [{"response": "답변 1"}] * 5)
+        self.assertEqual(len(fake.inputs), 1)
@@ -1,14 +1,124 @@
 import os
 import json
+import asyncio
+import hashlib
+import unicodedata
+import weakref
+from django.core.cache import cache
 from django.http import JsonResponse, HttpResponseBadRequest
 from django.shortcuts import render
 from django.views.decorators.http import require_POST
 from django.views.decorators.csrf import csrf_exempt
-from openai import OpenAI
+from openai import APITimeoutError, AsyncOpenAI
 
 # .env에 있는 OPENAI_API_KEY 사용
 OPENAI_KEY = os.getenv("OPENAI_API_KEY")
-client = OpenAI(api_key=OPENAI_KEY)
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL")  # 비우면 OpenAI, 테스트/부하 테스트에서는 가짜 서버 주소
+OPENAI_MODEL = "gpt-4o-mini"
+OPENAI_TIMEOUT = 20          # 호출 하나의 최대 시간(초)
+OPENAI_MAX_CONCURRENCY = 4   # 워커당 동시에 진행하는 호출 수
+OPENAI_QUEUE_TIMEOUT = 5     # 자리가 날 때까지 기다리는 최대 시간(초)
+OPENAI_CACHE_TIMEOUT = 600   # 같은 prompt 의 응답을 재사용하는 시간(초), 0 이면 캐시하지 않음
+
+# 이벤트 루프 -> (클라이언트, 세마포어, 진행 중인 호출). 루프마다 클라이언트를 하나 만들어 연결을 재사용한다
+_clients = weakref.WeakKeyDictionary()
+
+
+class ChatBusy(Exception):
+    pass
+
+
+def _client():
+    loop = asyncio.get_running_loop()
+    if loop not in _clients:
+        _clients[loop] = (
+            AsyncOpenAI(
+                api_key=OPENAI_KEY, base_url=OPENAI_BASE_URL, timeout=OPENAI_TIMEOUT, max_retries=1
+            ),
+            asyncio.Semaphore(OPENAI_MAX_CONCURRENCY),
+            {},
+        )
+    return _clients[loop]
+
+
+def _cache_key(prompt):
+    # 공백/대소문자/전각 차이는 같은 prompt 로 본다
+    normalized = " ".join(unicodedata.normalize("NFKC", prompt).split()).lower()
+    digest = hashlib.sha256(f"{OPENAI_MODEL}\0{normalized}".encode("utf-8")).hexdigest()
+    return f"chat:{digest}"
+
+
+async def _ask(prompt, key):
+    client, semaphore, _ = _client()
+    try:
+        await asyncio.wait_for(semaphore.acquire(), OPENAI_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise ChatBusy()
+    try:
+        # OpenAI 호출
+        response = await asyncio.wait_for(
+            client.responses.create(
+                model=OPENAI_MODEL,
+                input=f"사용자 요청: {prompt}"
+            ),
+            OPENAI_TIMEOUT,
+        )
+    finally:
+        semaphore.release()
+
+    # output_text attribute 우선
+    if hasattr(response, "output_text") and response.output_text:
+        output = response.output_text
+        if OPENAI_CACHE_TIMEOUT:
+            await cache.aset(key, output, OPENAI_CACHE_TIMEOUT)
+    else:
+        # 안전한 파싱 (캐시하지 않음)
+        output = str(response)
+    return output
+
+
+# _single_flight 는 iotProject/sensor/llm.py 와 같은 코드다 (두 프로젝트가 따로 배포되므로 복사해 둠). 고칠 때 함께 고친다
+async def _single_flight(inflight, key, factory):
+    """key 의 호출이 진행 중이면 그 결과를 함께 기다리고, 없으면 factory() 로 새로 시작한다.
+
+    inflight[key] 는 [task, 기다리는 요청 수] 이다. 기다리는 요청이 모두 취소되면 호출도 취소해
+    동시 호출 자리와 토큰을 낭비하지 않는다. key 가 None 이면 다른 요청과 공유하지 않는다.
+    """
+    entry = inflight.get(key) if key is not None else None
+    if entry is None:
+        task = asyncio.ensure_future(factory())
+        entry = [task, 0]
+        if key is not None:
+            inflight[key] = entry
+
+        def finished(done):
+            if inflight.get(key) is entry:
+                del inflight[key]
+            # 취소되지 않은 호출의 예외가 로그에 "never retrieved" 로 남지 않게 한다
+            if not done.cancelled():
+                done.exception()
+
+        task.add_done_callback(finished)
+    entry[1] += 1
+    try:
+        # 이 요청이 취소되어도 같은 호출을 기다리는 다른 요청에는 영향을 주지 않는다
+        return await asyncio.shield(entry[0])
+    finally:
+        entry[1] -= 1
+        if entry[1] == 0 and not entry[0].done():
+            entry[0].cancel()
+
+
+async def _complete(prompt):
+    # 캐시에 있으면 바로 반환하고, 같은 prompt 호출이 진행 중이면 새로 호출하지 않고 함께 기다린다
+    key = _cache_key(prompt)
+    if OPENAI_CACHE_TIMEOUT:
+        output = await cache.aget(key)
+        if output is not None:
+            return output
+
+    _, _, inflight = _client()
+    return await _single_flight(inflight, key, lambda: _ask(prompt, key))
 
 def index(request):
     # 개발용 페이지 (React 개발 시 여기는 사용 안함)
@@ -16,7 +126,8 @@ def index(request):
 
 @csrf_exempt   # 개발 환경에서는 편의를 위해 사용 (배포 시 제거)
 @require_POST
-def chat_api(request):
+async def chat_api(request):
+    # OpenAI 응답을 기다리는 동안 워커를 점유하지 않도록 비동기 뷰로 처리 (ASGI 로 실행)
 
     if request.content_type != "application/json":
         return JsonResponse({'error': 'Content-Type must be application/json'}, status=400)
@@ -34,20 +145,12 @@ def chat_api(request):
         return JsonResponse({'error': 'OpenAI API key not found'}, status=500)
 
     try:
-        # OpenAI 호출
-        response = client.responses.create(
-            model="gpt-4o-mini",
-            input=f"사용자 요청: {prompt}"
-        )
-
-        # output_text attribute 우선
-        if hasattr(response, "output_text") and response.output_text:
-            output = response.output_text
-        else:
-            # 안전한 파싱
-            output = str(response)
-
+        output = await _complete(prompt)
         return JsonResponse({'response': output})
 
+    except ChatBusy:
+        return JsonResponse({'error': 'too many requests'}, status=503, headers={'Retry-After': '1'})
+    except (asyncio.TimeoutError, APITimeoutError):
+        return JsonResponse({'error': 'OpenAI request timed out'}, status=504)
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
@@ -0,0 +1,77 @@
+import math
+
+from django.db import migrations, models
+
+
+def _numeric(raw):
+    # sensor/serializer.py 의 _numeric 과 같은 규칙: 유한한 숫자만, '1_000' 같은 표기는 숫자로 보지 않음
+    # (마이그레이션은 이후 코드 변경에 영향받지 않도록 복사해 둔다)
+    if "_" in raw:
+        return None
+    try:
+        number = float(raw)
+    except ValueError:
+        return None
+    return number if math.isfinite(number) else None
+
+
+def split_values(apps, schema_editor):
+    # 기존 문자열 값 중 숫자로 변환되는 것은 value 로 옮기고 raw_value 는 비운다.
+    # 숫자가 아닌 값('nan', 'inf' 포함)은 원문을 raw_value 에 그대로 둔다
+    SensorData = apps.get_model("sensor", "SensorData")
+    batch = []
+    for row in SensorData.objects.only("id", "raw_value").iterator(chunk_size=2000):
+        value = _numeric(row.raw_value)
+        if value is None:
+            continue
+        row.value = value
+        row.raw_value = ""
+        batch.append(row)
+        if len(batch) >= 2000:
+            SensorData.objects.bulk_update(batch, ["value", "raw_value"])
+            batch = []
+    if batch:
+        SensorData.objects.bulk_update(batch, ["value", "raw_value"])
+
+
+def join_values(apps, schema_editor):
+    SensorData = apps.get_model("sensor", "SensorData")
+    batch = []
+    for row in SensorData.objects.filter(value__isnull=False).only("id", "value").iterator(chunk_size=2000):
+        row.raw_value = str(row.value)
+        batch.append(row)
+        if len(batch) >= 2000:
+            SensorData.objects.bulk_update(batch, ["raw_value"])
+            batch = []
+    if batch:
+        SensorData.objects.bulk_update(batch, ["raw_value"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sensor", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name="sensordata",
+            old_name="value",
+            new_name="raw_value",
+        ),
+        migrations.AlterField(
+            model_name="sensordata",
+            name="raw_value",
+            field=models.CharField(blank=True, default="", max_length=100),
+        ),
+        migrations.AddField(
+            model_name="sensordata",
+            name="value",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.RunPython(split_values, join_values),
+        migrations.AddIndex(
+            model_name="sensordata",
+            index=models.Index(fields=["sensor_type", "timestamp"], name="sensordata_type_ts_idx"),
+        ),
+    ]
@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sensor", "0002_numeric_value"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="sensordata",
+            index=models.Index(fields=["timestamp", "id"], name="sensordata_ts_id_idx"),
+        ),
+    ]
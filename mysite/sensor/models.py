@@ -2,10 +2,19 @@ from django.db import models
 
 class SensorData(models.Model):
     sensor_type = models.CharField(max_length=50)
-    value = models.CharField(max_length=100)
+    # 숫자로 변환되는 값은 value 에, 숫자가 아닌 값(예: "OPEN")은 raw_value 에 원문 그대로 저장
+    value = models.FloatField(null=True, blank=True)
+    raw_value = models.CharField(max_length=100, blank=True, default="")
     timestamp = models.BigIntegerField()
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["sensor_type", "timestamp"], name="sensordata_type_ts_idx"),
+            # type 없이 조회/내보내기할 때 (timestamp, id) 순서로 읽기 위함
+            models.Index(fields=["timestamp", "id"], name="sensordata_ts_id_idx"),
+        ]
+
     def __str__(self):
-        return f"{self.sensor_type}: {self.value}"
+        return f"{self.sensor_type}: {self.raw_value if self.value is None else self.value}"
@@ -1,3 +1,5 @@
+import math
+
 from rest_framework import serializers
 from .models import SensorData
 
@@ -5,3 +7,87 @@ class SensorDataSerializer(serializers.ModelSerializer):
     class Meta:
         model = SensorData
         fields = '__all__'
+
+
+MAX_READINGS = 5000
+BIGINT_MAX = 2 ** 63 - 1
+TYPE_MAX_LENGTH = SensorData._meta.get_field("sensor_type").max_length
+RAW_MAX_LENGTH = SensorData._meta.get_field("raw_value").max_length
+
+
+class ReadingsError(ValueError):
+    def __init__(self, errors):
+        super().__init__(errors)
+        self.errors = errors
+
+
+def _numeric(value):
+    # 숫자 또는 숫자 문자열이면 float, 아니면 None (bool 은 숫자로 보지 않음)
+    # float() 는 '1_000' 도 받지만 센서 값 표기로 보지 않는다 (migrations/0002 의 _numeric 과 같은 규칙)
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, str) and "_" in value:
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    except OverflowError:
+        # float 로 나타낼 수 없는 큰 정수 (JSON 정수는 자릿수 제한이 없다)
+        raise serializers.ValidationError("number out of range")
+    return number if math.isfinite(number) else None
+
+
+def parse_readings(items):
+    """측정값 목록을 한 번에 검증해 저장 전 SensorData 목록으로 만든다.
+
+    각 항목: {"type" (또는 "sensor_type"), "value", "timestamp"}
+    하나라도 잘못되면 저장하지 않고 ReadingsError(항목별 에러 목록)를 발생시킨다.
+    (행마다 ModelSerializer 를 거치지 않는다)
+    """
+    if len(items) > MAX_READINGS:
+        raise ReadingsError([{"error": f"too many readings (max {MAX_READINGS})"}])
+    objs = []
+    errors = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors.append({"index": index, "error": "reading must be an object"})
+            continue
+        sensor_type = item.get("type", item.get("sensor_type"))
+        raw = item.get("value")
+        timestamp = item.get("timestamp")
+
+        item_errors = {}
+        if not isinstance(sensor_type, str) or not sensor_type or len(sensor_type) > TYPE_MAX_LENGTH:
+            item_errors["type"] = f"required string (max {TYPE_MAX_LENGTH})"
+        if raw is None or raw == "":
+            item_errors["value"] = "required"
+        if isinstance(timestamp, bool) or not isinstance(timestamp, (int, str)):
+            item_errors["timestamp"] = "required integer"
+        else:
+            try:
+                timestamp = int(timestamp)
+                if not -BIGINT_MAX <= timestamp <= BIGINT_MAX:
+                    raise ValueError
+            except ValueError:
+                item_errors["timestamp"] = "required integer"
+
+        try:
+            value = _numeric(raw)
+        except serializers.ValidationError as exc:
+            value = None
+            item_errors.setdefault("value", exc.detail[0])
+        if value is None and "value" not in item_errors and len(str(raw)) > RAW_MAX_LENGTH:
+            item_errors["value"] = f"non-numeric value too long (max {RAW_MAX_LENGTH})"
+        if item_errors:
+            errors.append({"index": index, **item_errors})
+            continue
+        objs.append(SensorData(
+            sensor_type=sensor_type,
+            value=value,
+            raw_value="" if value is not None else str(raw),
+            timestamp=timestamp,
+        ))
+    if errors:
+        raise ReadingsError(errors)
+    return objs
@@ -1,3 +1,113 @@
+import importlib
+import json
+
+from django.apps import apps
 from django.test import TestCase
+from rest_framework import serializers
+
+from .models import SensorData
+from .serializer import _numeric
+
+numeric_value = importlib.import_module("sensor.migrations.0002_numeric_value")
+
+
+class NumericValueTests(TestCase):
+    def test_numeric_rules(self):
+        self.assertEqual(_numeric("12.5"), 12.5)
+        self.assertEqual(_numeric(3), 3.0)
+        for raw in ["nan", "inf", "-Infinity", "1_000", "OPEN", True, None]:
+            with self.subTest(raw=raw):
+                self.assertIsNone(_numeric(raw))
+        with self.assertRaises(serializers.ValidationError):
+            _numeric(10 ** 400)
+
+    def test_migration_keeps_non_numeric_originals(self):
+        for raw in ["12.5", "nan", "inf", "1_000", "OPEN"]:
+            SensorData.objects.create(sensor_type="t", raw_value=raw, timestamp=1)
+        numeric_value.split_values(apps, None)
+        self.assertEqual(
+            sorted(SensorData.objects.values_list("raw_value", "value")),
+            [("", 12.5), ("1_000", None), ("OPEN", None), ("inf", None), ("nan", None)],
+        )
+
+
+class BulkPostTests(TestCase):
+    def post(self, body):
+        return self.client.post("/sensor/", body, content_type="application/json")
+
+    def test_array_saves_all_readings(self):
+        response = self.post('[{"type": "temp", "value": 21.5, "timestamp": 1},'
+                             ' {"sensor_type": "door", "value": "OPEN", "timestamp": 2}]')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["count"], 2)
+        self.assertEqual(
+            sorted(SensorData.objects.values_list("sensor_type", "value", "raw_value", "timestamp")),
+            [("door", None, "OPEN", 2), ("temp", 21.5, "", 1)],
+        )
+
+    def test_invalid_item_saves_nothing(self):
+        response = self.post('[{"type": "temp", "value": 1, "timestamp": 1},'
+                             ' {"type": "temp", "timestamp": "x"}]')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["errors"][0]["index"], 1)
+        self.assertFalse(SensorData.objects.exists())
+
+    def test_huge_integer_is_rejected(self):
+        huge = "9" * 400
+        response = self.post(f'{{"type": "temp", "value": {huge}, "timestamp": 1}}')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("value", response.json())
+        response = self.post(f'[{{"type": "temp", "value": {huge}, "timestamp": 1}}]')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["errors"][0]["index"], 0)
+        self.assertFalse(SensorData.objects.exists())
+
+
+class SensorQueryTests(TestCase):
+    def setUp(self):
+        # timestamp 가 같은 행이 여러 개여도 (timestamp, id) 커서로 빠짐없이 넘어가야 한다
+        for timestamp in [1, 2, 2, 2, 2, 3, 3]:
+            SensorData.objects.create(sensor_type="temp", value=timestamp, timestamp=timestamp)
+        SensorData.objects.create(sensor_type="door", raw_value="OPEN", timestamp=2)
+
+    def test_cursor_pages_cover_every_row_once(self):
+        seen = []
+        url = "/sensor/?type=temp&limit=2"
+        while True:
+            body = self.client.get(url).json()
+            self.assertLessEqual(len(body["results"]), 2)
+            seen += [row["id"] for row in body["results"]]
+            if body["next"] is None:
+                break
+            url = f"/sensor/?type=temp&limit=2&cursor={body['next']}"
+        expected = list(SensorData.objects.filter(sensor_type="temp").order_by("timestamp", "id")
+                        .values_list("id", flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_malformed_cursor(self):
+        for cursor in ["abc", "5", "1.x", "."]:
+            with self.subTest(cursor=cursor):
+                response = self.client.get(f"/sensor/?cursor={cursor}")
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {"message": "INVALID_PARAMETER"})
+
+    def test_export_csv(self):
+        response = self.client.get("/sensor/export/?format=csv&from=2&to=3")
+        self.assertEqual(response["Content-Type"], "text/csv")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], "id,sensor_type,value,raw_value,timestamp")
+        self.assertEqual(len(lines), 1 + 5)
+        self.assertIn(",door,,OPEN,2", lines[-1])
+
+    def test_export_ndjson(self):
+        response = self.client.get("/sensor/export/?format=ndjson&type=door")
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        rows = [json.loads(line) for line in b"".join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(
+            {key: rows[0][key] for key in ("sensor_type", "value", "raw_value", "timestamp")},
+            {"sensor_type": "door", "value": None, "raw_value": "OPEN", "timestamp": 2},
+        )
 
-# Create your tests here.
+    def test_export_invalid_format(self):
+        self.assertEqual(self.client.get("/sensor/export/?format=xml").status_code, 400)
@@ -1,6 +1,7 @@
 from django.urls import path
-from .views import SensorAPI
+from .views import SensorAPI, export_sensor_data
 
 urlpatterns = [
     path('sensor/', SensorAPI.as_view(), name='sensor_api'),
+    path('sensor/export/', export_sensor_data, name='sensor_export'),
 ]
@@ -1,21 +1,124 @@
+import csv
+import json
+
+from django.db import transaction
+from django.db.models import Q
+from django.http import JsonResponse, StreamingHttpResponse
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from .serializer import SensorDataSerializer
+from .models import SensorData
+from .serializer import SensorDataSerializer, ReadingsError, parse_readings
+
+PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+EXPORT_FIELDS = ("id", "sensor_type", "value", "raw_value", "timestamp")
+
+
+def _filtered(params):
+    """?type=&from=&to= (timestamp 범위, to 는 포함하지 않음) 로 거른 QuerySet. 잘못된 값이면 ValueError"""
+    queryset = SensorData.objects.all()
+    sensor_type = params.get("type") or params.get("sensor_type")
+    if sensor_type:
+        queryset = queryset.filter(sensor_type=sensor_type)
+    if params.get("from"):
+        queryset = queryset.filter(timestamp__gte=int(params["from"]))
+    if params.get("to"):
+        queryset = queryset.filter(timestamp__lt=int(params["to"]))
+    return queryset.order_by("timestamp", "id")
+
+
+def _after(queryset, cursor):
+    # keyset 페이지네이션: (timestamp, id) 가 cursor 보다 뒤인 행부터 (OFFSET 을 쓰지 않음)
+    timestamp, _, row_id = cursor.partition(".")
+    timestamp, row_id = int(timestamp), int(row_id)
+    return queryset.filter(Q(timestamp__gt=timestamp) | Q(timestamp=timestamp, id__gt=row_id))
+
 
 class SensorAPI(APIView):
+    def get(self, request):
+        # ?type=&from=&to=&limit=&cursor= -> {"results": [...], "next": 다음 페이지 cursor 또는 null}
+        params = request.query_params
+        try:
+            limit = min(max(int(params.get("limit", PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+            queryset = _filtered(params)
+            if params.get("cursor"):
+                queryset = _after(queryset, params["cursor"])
+        except ValueError:
+            return Response({"message": "INVALID_PARAMETER"}, status=status.HTTP_400_BAD_REQUEST)
+
+        rows = list(queryset.values(*EXPORT_FIELDS, "created_at")[:limit + 1])
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = f"{rows[-1]['timestamp']}.{rows[-1]['id']}"
+        return Response({"results": rows, "next": next_cursor})
+
     def post(self, request):
-        # 받은 데이터 JSON에서 type 이라는 키를 sensor_type으로 바꿔줌
-        data = request.data.copy()
-        data['sensor_type'] = data.pop('type', None)
+        # 한 개({...}) 또는 여러 개([...] 또는 {"readings": [...]})의 측정값을 받는다
+        # JSON의 type 키는 sensor_type 으로 저장
+        data = request.data
+        single = isinstance(data, dict) and "readings" not in data
+        if single:
+            items = [data]
+        elif isinstance(data, dict):
+            items = data["readings"]
+        else:
+            items = data
+        if not isinstance(items, list) or not items:
+            return Response({"message": "INVALID_READINGS"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            objs = parse_readings(items)
+        except ReadingsError as exc:
+            if single:
+                # 한 개만 보낸 경우는 예전처럼 {필드: 에러} 형식
+                errors = {key: value for key, value in exc.errors[0].items() if key != "index"}
+            else:
+                errors = {"errors": exc.errors}
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
 
-        serializer = SensorDataSerializer(data=data)
+        with transaction.atomic():
+            objs = SensorData.objects.bulk_create(objs, batch_size=500)
 
-        if serializer.is_valid():
-            serializer.save()
+        if single:
             return Response(
-                {"message": "OK", "data": serializer.data},
+                {"message": "OK", "data": SensorDataSerializer(objs[0]).data},
                 status=status.HTTP_201_CREATED
             )
+        return Response({"message": "OK", "count": len(objs)}, status=status.HTTP_201_CREATED)
+
+
+class _Echo:
+    # csv.writer 가 쓴 한 줄을 그대로 돌려준다 (StreamingHttpResponse 용)
+    def write(self, value):
+        return value
+
+
+def export_sensor_data(request):
+    # GET /sensor/export/?format=csv|ndjson&type=&from=&to=
+    # 서버 측 커서(iterator)로 조금씩 읽어 바로 내보내므로 기간이 길어도 메모리 사용량이 일정하다
+    export_format = request.GET.get("format", "csv")
+    if export_format not in ("csv", "ndjson"):
+        return JsonResponse({"message": "INVALID_FORMAT"}, status=400)
+    try:
+        queryset = _filtered(request.GET)
+    except ValueError:
+        return JsonResponse({"message": "INVALID_PARAMETER"}, status=400)
+    rows = queryset.values_list(*EXPORT_FIELDS).iterator(chunk_size=2000)
+
+    if export_format == "csv":
+        def csv_lines():
+            writer = csv.writer(_Echo())
+            yield writer.writerow(EXPORT_FIELDS)
+            for row in rows:
+                yield writer.writerow(row)
+        content = csv_lines()
+        content_type = "text/csv"
+    else:
+        content = (json.dumps(dict(zip(EXPORT_FIELDS, row)), ensure_ascii=False) + "\n" for row in rows)
+        content_type = "application/x-ndjson"
 
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    response = StreamingHttpResponse(content, content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="sensor_data.{export_format}"'
+    return response